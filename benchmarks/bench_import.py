@@ -0,0 +1,64 @@
+"""Время импорта точек входа (python -X importtime)."""
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJ_PATH = Path(__file__).parents[1]
+
+# Точка входа -> модули, которые она не должна загружать
+ENTRY_POINTS: Dict[str, Tuple[str, ...]] = {
+    'src.cli': ('requests', 'openpyxl', 'pydantic_xml', 'fastapi'),
+    'src.processors.generator.generator': ('openpyxl', 'pydantic_xml', 'requests'),
+    'src.processors.checker': ('openpyxl', 'requests'),
+    'src.processors.excel': ('requests',),
+    'src.main': ('openpyxl', 'pydantic_xml', 'requests'),
+}
+
+
+def import_time(module: str) -> Tuple[int, List[str]]:
+    """Замер импорта модуля в отдельном процессе.
+
+    :arg module: Имя модуля
+    :return: Время импорта в мкс, загруженные лишние модули
+    """
+    forbidden = ENTRY_POINTS.get(module, ())
+    code = (
+        f'import sys, {module}\n'
+        f'print(",".join(m for m in {forbidden!r} if m in sys.modules))'
+    )
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True,
+        text=True,
+        cwd=PROJ_PATH,
+        check=True,
+    )
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative = int(parts[1])
+    loaded = [m for m in result.stdout.strip().split(',') if m]
+    return cumulative, loaded
+
+
+def main() -> int:
+    """Замер и вывод результатов.
+
+    :return: Код возврата (1 - загружены лишние модули)
+    """
+    status = 0
+    for module in ENTRY_POINTS:
+        cumulative, loaded = import_time(module)
+        note = f'  лишние: {", ".join(loaded)}' if loaded else ''
+        print(f'{module:40} {cumulative / 1000:8.1f} мс{note}')
+        if loaded:
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
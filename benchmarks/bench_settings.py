@@ -0,0 +1,39 @@
+"""Сравнение разбора настроек: pydantic_xml и потоковый разбор."""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+import src.parsers.settings as settings  # noqa: E402
+import src.processors.generator.structures as struct  # noqa: E402
+
+SETTINGS_PATH = (
+    Path(__file__).parents[1].joinpath('tests', 'test_files', 'settings.xml')
+)
+
+
+def strict_fill(content: str):
+    """Разбор через pydantic_xml и заполнение данных генератора."""
+    struct.GeneratorData().fill_from_source(settings.parse_settings(content))
+
+
+def fast_fill(content: bytes):
+    """Потоковый разбор и заполнение данных генератора."""
+    struct.GeneratorData().fill_from_source(settings.parse_settings_fast(content))
+
+
+def main(path: Path = SETTINGS_PATH, number: int = 200):
+    """Замер и вывод результатов."""
+    content = path.read_bytes()
+    text = content.decode('utf-8')
+    strict = min(timeit.repeat(lambda: strict_fill(text), number=number, repeat=5))
+    fast = min(timeit.repeat(lambda: fast_fill(content), number=number, repeat=5))
+    print(f'pydantic_xml: {strict / number * 1000:.3f} мс')
+    print(f'потоковый:    {fast / number * 1000:.3f} мс')
+    print(f'ускорение:    {strict / fast:.1f}x')
+
+
+if __name__ == '__main__':
+    main(Path(sys.argv[1]) if len(sys.argv) > 1 else SETTINGS_PATH)
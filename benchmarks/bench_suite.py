@@ -0,0 +1,238 @@
+"""Набор замеров на синтетических настройках с выводом в JSON.
+
+Пример сравнения двух коммитов:
+
+    python benchmarks/bench_suite.py --scale medium -o before.json
+    python benchmarks/bench_suite.py --scale medium -o after.json -c before.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, replace
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from benchmarks.synthetic import SyntheticParams, make_settings  # noqa: E402
+
+# Готовые наборы параметров
+SCALES: Dict[str, SyntheticParams] = {
+    'small': SyntheticParams(grades=3, groups_per_grade=2, teachers=6),
+    'medium': SyntheticParams(grades=5, groups_per_grade=4, teachers=12),
+    'large': SyntheticParams(
+        grades=9,
+        groups_per_grade=8,
+        teachers=40,
+        subjects=10,
+        combinations=14,
+    ),
+}
+
+
+def measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Замер времени выполнения.
+
+    :arg func: Замеряемая функция
+    :arg repeat: Количество запусков
+    :return: Показатели в миллисекундах
+    """
+    runs: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        runs.append((time.perf_counter() - started) * 1000)
+    return {
+        'min_ms': round(min(runs), 3),
+        'median_ms': round(statistics.median(runs), 3),
+        'mean_ms': round(statistics.fmean(runs), 3),
+        'max_ms': round(max(runs), 3),
+        'repeat': repeat,
+    }
+
+
+def peak_memory(func: Callable[[], object]) -> int:
+    """Пик выделенной памяти Python за один запуск.
+
+    :arg func: Замеряемая функция
+    :return: Пик в КиБ
+    """
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024)
+
+
+def git_commit() -> str | None:
+    """Текущий коммит (если запуск из рабочей копии git).
+
+    :return: Хэш коммита
+    """
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_suite(params: SyntheticParams, repeat: int) -> Dict[str, object]:
+    """Замеры всех этапов на одном наборе настроек.
+
+    :arg params: Параметры синтетических настроек
+    :arg repeat: Количество запусков каждого замера
+    :return: Результаты
+    """
+    import src.parsers.schedule as schedule
+    import src.parsers.settings as settings
+    from src.parsers.serializer import seralizer
+    from src.processors.checker import Checker
+    from src.processors.excel import Excel
+    from src.processors.generator.generator import Generator
+
+    content = make_settings(params)
+    results: Dict[str, Dict[str, float]] = {}
+    with TemporaryDirectory() as temp_dir:
+        settings_path = Path(temp_dir).joinpath('settings.xml')
+        settings_path.write_text(content, encoding='utf-8')
+        schedule_path = Path(temp_dir).joinpath('schedule.xml')
+        xlsx_path = Path(temp_dir).joinpath('schedule.xlsx')
+
+        # Генерация случайна: фиксируем начальное значение для сравнимости
+        random.seed(params.seed)
+        results['generator_process'] = measure(
+            lambda: Generator().process(settings_path, schedule_path),
+            repeat,
+        )
+        schedule_content = schedule_path.read_text(encoding='utf-8')
+        results['checker_process'] = measure(
+            lambda: Checker().process(schedule_path),
+            repeat,
+        )
+        results['excel_process'] = measure(
+            lambda: Excel().process(None, schedule_path, xlsx_path),
+            repeat,
+        )
+        results['parse_settings'] = measure(
+            lambda: settings.parse_settings(content),
+            repeat,
+        )
+        results['parse_settings_fast'] = measure(
+            lambda: settings.parse_settings_fast(content),
+            repeat,
+        )
+        model = schedule.parse_schedule(schedule_content)
+        results['seralizer'] = measure(lambda: seralizer(model), repeat)
+        random.seed(params.seed)
+        memory = {
+            'generator_peak_kib': peak_memory(
+                lambda: Generator().process(settings_path, schedule_path),
+            ),
+            'checker_peak_kib': peak_memory(
+                lambda: Checker().process(schedule_path),
+            ),
+        }
+        sizes = {
+            'settings_bytes': len(content.encode('utf-8')),
+            'schedule_bytes': len(schedule_content.encode('utf-8')),
+            'xlsx_bytes': xlsx_path.stat().st_size,
+        }
+    return {
+        'params': asdict(params),
+        'sizes': sizes,
+        'memory': memory,
+        'results': results,
+    }
+
+
+def compare(report: Dict, baseline: Dict):
+    """Вывод изменения медианы относительно прошлого запуска.
+
+    :arg report: Текущие результаты
+    :arg baseline: Результаты для сравнения
+    """
+    for scale, suite in report['suites'].items():
+        base_suite = baseline['suites'].get(scale)
+        if base_suite is None:
+            continue
+        for name, result in suite['results'].items():
+            base = base_suite['results'].get(name)
+            if base is None:
+                continue
+            ratio = result['median_ms'] / base['median_ms']
+            print(
+                f'{scale:8} {name:20} {base["median_ms"]:10.3f} -> '
+                f'{result["median_ms"]:10.3f} мс ({ratio:.2f}x)',
+                file=sys.stderr,
+            )
+        for name, peak in suite['memory'].items():
+            base_peak = base_suite.get('memory', {}).get(name)
+            if base_peak:
+                print(
+                    f'{scale:8} {name:20} {base_peak:10} -> {peak:10} КиБ '
+                    f'({peak / base_peak:.2f}x)',
+                    file=sys.stderr,
+                )
+
+
+def main():
+    """Запуск замеров и запись результатов."""
+    parser = argparse.ArgumentParser(description='Замеры производительности')
+    parser.add_argument(
+        '--scale',
+        choices=list(SCALES),
+        action='append',
+        help='Набор параметров (можно указать несколько)',
+    )
+    parser.add_argument('--repeat', type=int, default=5, help='Запусков замера')
+    for name, value in vars(SyntheticParams()).items():
+        parser.add_argument(
+            f'--{name.replace("_", "-")}',
+            type=type(value),
+            help='Переопределение параметра набора',
+        )
+    parser.add_argument('-o', '--output', help='Файл JSON с результатами')
+    parser.add_argument('-c', '--compare', help='Файл JSON прошлого запуска')
+    args = parser.parse_args()
+
+    overrides = {
+        name: getattr(args, name)
+        for name in vars(SyntheticParams())
+        if getattr(args, name) is not None
+    }
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'suites': {
+            scale: run_suite(replace(SCALES[scale], **overrides), args.repeat)
+            for scale in args.scale or ['small']
+        },
+    }
+    if args.compare:
+        compare(report, json.loads(Path(args.compare).read_text(encoding='utf-8')))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding='utf-8')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
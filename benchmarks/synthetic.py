@@ -0,0 +1,167 @@
+"""Генератор синтетических файлов настроек для замеров."""
+
+import argparse
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+from xml.sax.saxutils import quoteattr
+
+# Дни недели в формате атрибута ДниНедели
+DAYS = ('Пн', 'Вт', 'Ср', 'Чт', 'Пт')
+
+# Наибольшее количество уроков в смене (столько размечено в шаблоне Excel)
+MAX_LESSONS = 5
+
+
+@dataclass
+class SyntheticParams:
+    """Параметры синтетических настроек."""
+
+    grades: int = 5  # Количество классов (1..9: класс - первая цифра группы)
+    groups_per_grade: int = 4  # Групп в каждом классе
+    teachers: int = 12  # Преподавателей всего
+    subjects: int = 6  # Количество предметов
+    combinations: int = 9  # Количество расстановок
+    any_groups_share: float = 0.2  # Доля преподавателей с ЛюбыеГруппы='Да'
+    tightness: float = 0.3  # Жесткость ограничений, 0..1
+    seed: int = 0  # Начальное значение генератора случайных чисел
+
+
+def day_plan(rnd: random.Random, subjects: List[str]) -> List[str]:
+    """Расстановка на смену: 3-5 уроков по одному-двум предметам.
+
+    :arg rnd: Генератор случайных чисел
+    :arg subjects: Предметы
+    :return: Предметы по порядку уроков
+    """
+    length = rnd.randint(3, MAX_LESSONS)
+    first, second = rnd.sample(subjects, 2) if len(subjects) > 1 else subjects * 2
+    split = rnd.randint(1, length - 1)
+    return [first] * split + [second] * (length - split)
+
+
+def allowed_days(rnd: random.Random, tightness: float) -> str:
+    """Дни недели для предмета: чем жестче ограничения, тем их меньше.
+
+    :arg rnd: Генератор случайных чисел
+    :arg tightness: Жесткость ограничений
+    :return: Значение атрибута ДниНедели
+    """
+    count = len(DAYS) - round(tightness * (len(DAYS) - 2))
+    return ''.join(sorted(rnd.sample(DAYS, count), key=DAYS.index))
+
+
+def yesno(rnd: random.Random, probability: float) -> str:
+    """Случайное Да/Нет.
+
+    :arg rnd: Генератор случайных чисел
+    :arg probability: Вероятность Да
+    :return: Да/Нет
+    """
+    return 'Да' if rnd.random() < probability else 'Нет'
+
+
+def make_settings(params: SyntheticParams) -> str:
+    """Синтетический файл настроек.
+
+    Часы учебного плана каждого класса складываются из нескольких
+    расстановок, поэтому без учета занятости преподавателей план выполним.
+    Жесткость ограничений сужает дни недели и чаще включает флаги
+    НеРазделятьПоДням/ОднаГруппаЗаСмену.
+
+    :arg params: Параметры
+    :return: Текст XML
+    """
+    if not 1 <= params.grades <= 9:
+        raise Exception('Количество классов должно быть от 1 до 9')
+    rnd = random.Random(params.seed)
+    subjects = [f'Предмет {n}' for n in range(1, params.subjects + 1)]
+    combinations = [day_plan(rnd, subjects) for _ in range(params.combinations)]
+
+    lines = ['<Настройки>', '\t<Предметы>']
+    for subject in subjects:
+        lines.append(
+            f'\t\t<Предмет Название={quoteattr(subject)} '
+            f"НеРазделятьПоДням='{yesno(rnd, params.tightness)}' "
+            f"ОднаГруппаЗаСмену='{yesno(rnd, params.tightness / 2)}'/>"
+        )
+    lines += ['\t</Предметы>', '\t<Расстановки>']
+    lines += [
+        f'\t\t<Расстановка>{",".join(plan)}</Расстановка>' for plan in combinations
+    ]
+    lines += ['\t</Расстановки>', '\t<Программа>']
+
+    taught = set()
+    for grade in range(1, params.grades + 1):
+        hours: Dict[str, int] = {}
+        # Три дня занятий из разных расстановок
+        for plan in rnd.sample(combinations, min(3, len(combinations))):
+            for subject in plan:
+                hours[subject] = hours.get(subject, 0) + 1
+        taught.update(hours)
+        lines.append(f"\t\t<Класс Номер='{grade}'>")
+        lines += [
+            f'\t\t\t<Предмет Название={quoteattr(subject)} '
+            f"ЧасовВНеделю='{count}' "
+            f"ДниНедели='{allowed_days(rnd, params.tightness)}'/>"
+            for subject, count in hours.items()
+        ]
+        lines.append('\t\t</Класс>')
+    lines += ['\t</Программа>', '\t<Преподаватели>']
+
+    groups = [
+        f'{grade}{number}'
+        for grade in range(1, params.grades + 1)
+        for number in range(1, params.groups_per_grade + 1)
+    ]
+    pool_count = round(params.teachers * params.any_groups_share)
+    masters_count = max(params.teachers - pool_count, 1)
+    # Предметы, которые ведут преподаватели из общего пула
+    pool_subjects = sorted(taught)[-max(1, len(taught) // 3) :] if pool_count else []
+    for number in range(masters_count):
+        own_groups = groups[number::masters_count]
+        morning = own_groups[::2]
+        afternoon = own_groups[1::2]
+        lines.append(f"\t\t<Преподаватель ФИО='Преподаватель {number + 1}'>")
+        if morning:
+            lines.append(f'\t\t\t<ГруппыУтро>{",".join(morning)}</ГруппыУтро>')
+        if afternoon:
+            lines.append(f'\t\t\t<ГруппыВечер>{",".join(afternoon)}</ГруппыВечер>')
+        lines += [
+            f'\t\t\t<Предмет Название={quoteattr(subject)}/>'
+            for subject in subjects
+            if subject not in pool_subjects
+        ]
+        lines.append('\t\t</Преподаватель>')
+    for number in range(masters_count, masters_count + pool_count):
+        lines.append(f"\t\t<Преподаватель ФИО='Преподаватель {number + 1}'>")
+        lines += [
+            f"\t\t\t<Предмет Название={quoteattr(subject)} ЛюбыеГруппы='Да'/>"
+            for subject in pool_subjects
+        ]
+        lines.append('\t\t</Преподаватель>')
+    lines += ['\t</Преподаватели>', '</Настройки>', '']
+    return '\n'.join(lines)
+
+
+def main():
+    """Запись синтетических настроек в файл или на экран."""
+    parser = argparse.ArgumentParser(description='Синтетические настройки')
+    defaults = SyntheticParams()
+    for name, value in vars(defaults).items():
+        parser.add_argument(
+            f'--{name.replace("_", "-")}', type=type(value), default=value
+        )
+    parser.add_argument('-o', '--output', help='Файл для записи')
+    args = vars(parser.parse_args())
+    output = args.pop('output')
+    content = make_settings(SyntheticParams(**args))
+    if output:
+        Path(output).write_text(content, encoding='utf-8')
+    else:
+        print(content)
+
+
+if __name__ == '__main__':
+    main()
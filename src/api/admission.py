@@ -0,0 +1,100 @@
+"""Ограничение одновременных запросов к тяжелым методам API."""
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+from fastapi import HTTPException
+
+from src.common.constants import ADMISSION_LIMITS
+
+
+class AdmissionLimiter:
+    """Полоса выполнения: ограниченное число запросов и очередь ожидания.
+
+    Если очередь заполнена, запрос сразу отклоняется с кодом 429.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue_size: int):
+        """Инициализация.
+
+        :arg name: Имя полосы (метода API)
+        :arg concurrency: Количество одновременно выполняемых запросов
+        :arg queue_size: Количество запросов, ожидающих в очереди
+        """
+        self.name = name
+        self.concurrency = max(concurrency, 1)
+        self.queue_size = queue_size
+        self.__semaphore = asyncio.Semaphore(self.concurrency)
+        self.active = 0  # Выполняются
+        self.waiting = 0  # Ждут в очереди
+        self.admitted = 0  # Всего принято
+        self.rejected = 0  # Всего отклонено
+        self.wait_seconds = 0.0  # Суммарное ожидание в очереди
+        self.max_wait_seconds = 0.0  # Наибольшее ожидание в очереди
+        self.busy_seconds = 0.0  # Суммарное время выполнения
+
+    def retry_after(self) -> int:
+        """Оценка времени до освобождения места, с.
+
+        :return: Значение заголовка Retry-After
+        """
+        average = self.busy_seconds / self.admitted if self.admitted else 1.0
+        return max(1, math.ceil(average * (self.waiting + 1) / self.concurrency))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Место для выполнения запроса.
+
+        :return: Контекст, на время которого место занято
+        """
+        if self.active >= self.concurrency and self.waiting >= self.queue_size:
+            self.rejected += 1
+            raise HTTPException(
+                429,
+                headers={'Retry-After': str(self.retry_after())},
+            )
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self.__semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        waited = time.perf_counter() - started
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.admitted += 1
+        self.active += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+            self.active -= 1
+            self.__semaphore.release()
+
+    def stats(self) -> Dict[str, float]:
+        """Показатели полосы для мониторинга.
+
+        :return: Имя показателя -> значение
+        """
+        return {
+            'concurrency': self.concurrency,
+            'queue_size': self.queue_size,
+            'active': self.active,
+            'waiting': self.waiting,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'wait_seconds': self.wait_seconds,
+            'max_wait_seconds': self.max_wait_seconds,
+            'busy_seconds': self.busy_seconds,
+        }
+
+
+# Полосы процесса по методам API
+limiters: Dict[str, AdmissionLimiter] = {
+    name: AdmissionLimiter(name, concurrency, queue_size)
+    for name, (concurrency, queue_size) in ADMISSION_LIMITS.items()
+}
@@ -0,0 +1,196 @@
+"""Сжатие ответов и распаковка сжатых запросов."""
+
+import zlib
+from typing import Callable, List
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость
+    brotli = None
+
+# Ответы меньше этого размера не сжимаются
+MINIMUM_SIZE = 500
+
+# Предельный размер распакованного тела запроса
+MAX_REQUEST_SIZE = 64 * 1024 * 1024
+
+# Распаковка части тела: (сжатые данные, предел длины результата) -> данные
+type Inflate = Callable[[bytes, int], bytes]
+
+
+class RequestBodyError(Exception):
+    """Тело запроса невозможно распаковать."""
+
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """Кодировки из заголовка Accept-Encoding (без q=0).
+
+    :arg accept_encoding: Значение заголовка
+    :return: Кодировки
+    """
+    encodings = []
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        if name:
+            encodings.append(name.strip().lower())
+    return encodings
+
+
+def zlib_inflate() -> Inflate:
+    """Распаковка gzip/deflate с ограничением длины результата.
+
+    :return: Функция распаковки
+    """
+    # wbits=47: автоопределение заголовка gzip или zlib
+    return zlib.decompressobj(wbits=47).decompress
+
+
+def brotli_inflate() -> Inflate | None:
+    """Распаковка brotli с ограничением длины результата.
+
+    Ограничение (output_buffer_limit) есть в brotli начиная с 1.2.
+
+    :return: Функция распаковки или None, если brotli его не поддерживает
+    """
+    if brotli is None:
+        return None
+    decompressor = brotli.Decompressor()
+    try:
+        decompressor.process(b'', output_buffer_limit=1)
+    except TypeError:
+        return None
+
+    def inflate(data: bytes, max_length: int) -> bytes:
+        inflated: bytes = decompressor.process(data, output_buffer_limit=max_length)
+        return inflated
+
+    return inflate
+
+
+class BrotliResponder(IdentityResponder):
+    """Сжатие ответа brotli."""
+
+    content_encoding = 'br'
+
+    def __init__(self, app: ASGIApp, minimum_size: int):
+        """Инициализация.
+
+        :arg app: Приложение
+        :arg minimum_size: Минимальный размер для сжатия
+        """
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=5)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        """Сжатие очередной части тела.
+
+        :arg body: Часть тела
+        :arg more_body: Будут еще части
+        :return: Сжатые данные
+        """
+        compressed: bytes = self.compressor.process(body)
+        if not more_body:
+            compressed += self.compressor.finish()
+        return compressed
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Согласованное сжатие ответов: brotli (если установлен) или gzip."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = MINIMUM_SIZE):
+        """Инициализация.
+
+        :arg app: Приложение
+        :arg minimum_size: Минимальный размер для сжатия
+        """
+        # Средний уровень: XML сжимается хорошо и без максимального уровня
+        super().__init__(app, minimum_size=minimum_size, compresslevel=6)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Выбор способа сжатия по заголовку Accept-Encoding."""
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        encodings = accepted_encodings(Headers(scope=scope).get('Accept-Encoding', ''))
+        responder: ASGIApp
+        if brotli is not None and 'br' in encodings:
+            responder = BrotliResponder(self.app, self.minimum_size)
+        elif 'gzip' in encodings:
+            responder = GZipResponder(
+                self.app,
+                self.minimum_size,
+                compresslevel=self.compresslevel,
+            )
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class DecompressRequestMiddleware:
+    """Распаковка тела запроса с Content-Encoding gzip/deflate/br."""
+
+    def __init__(self, app: ASGIApp, max_size: int = MAX_REQUEST_SIZE):
+        """Инициализация.
+
+        :arg app: Приложение
+        :arg max_size: Предельный размер распакованного тела
+        """
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Подмена receive на распаковывающий."""
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        encoding = Headers(scope=scope).get('Content-Encoding', '').strip().lower()
+        if encoding in ('', 'identity'):
+            await self.app(scope, receive, send)
+            return
+        inflate: Inflate | None = None
+        if encoding in ('gzip', 'deflate'):
+            inflate = zlib_inflate()
+        elif encoding == 'br':
+            inflate = brotli_inflate()
+        if inflate is None:
+            response = PlainTextResponse('Unsupported Content-Encoding', 415)
+            await response(scope, receive, send)
+            return
+
+        # Длина и кодировка тела после распаковки меняются
+        scope['headers'] = [
+            (name, value)
+            for name, value in scope['headers']
+            if name not in (b'content-encoding', b'content-length')
+        ]
+        received = 0
+
+        async def receive_decompressed() -> Message:
+            nonlocal received
+            message = await receive()
+            if message['type'] != 'http.request':
+                return message
+            # Распаковывается не больше одного байта сверх предела:
+            # маленькая сжатая часть не раздувается в памяти целиком
+            remaining = self.max_size - received
+            try:
+                body = inflate(message.get('body', b''), remaining + 1)
+            except Exception as err:  # zlib.error или brotli.error
+                raise RequestBodyError('Тело запроса повреждено') from err
+            if len(body) > remaining:
+                raise RequestBodyError('Тело запроса слишком большое')
+            received += len(body)
+            return {**message, 'body': body}
+
+        try:
+            await self.app(scope, receive_decompressed, send)
+        except RequestBodyError as err:
+            response = PlainTextResponse(str(err), 400)
+            await response(scope, receive, send)
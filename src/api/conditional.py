@@ -0,0 +1,61 @@
+"""Условные ответы API: ETag по хэшу входных данных."""
+
+import hashlib
+from typing import Iterable, Mapping
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def input_etag(
+    endpoint: str,
+    contents: Iterable[bytes],
+    params: Mapping[str, object] | None = None,
+) -> str:
+    """ETag по входным данным метода API.
+
+    Одинаковые входные данные дают одинаковый ETag, поэтому клиент,
+    уже получивший результат, может не ждать повторного расчета.
+
+    :arg endpoint: Имя метода API
+    :arg contents: Содержимое загруженных файлов
+    :arg params: Параметры запроса, влияющие на результат
+    :return: Значение заголовка ETag
+    """
+    digest = hashlib.sha256(endpoint.encode('utf-8'))
+    for key, value in sorted((params or {}).items()):
+        digest.update(f'\0{key}={value}'.encode('utf-8'))
+    for content in contents:
+        # Длина отделяет файлы друг от друга
+        digest.update(len(content).to_bytes(8, 'little'))
+        digest.update(content)
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Проверка заголовка If-None-Match.
+
+    :arg request: Запрос
+    :arg etag: ETag текущих входных данных
+    :return: У клиента уже есть актуальный результат
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        # Слабое сравнение: сжатие ответа не меняет его смысла.
+        # '*' не учитывается: результат рассчитывается заново по входным
+        # данным, совпадать должен конкретный ETag
+        if tag.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """Ответ 304 без тела.
+
+    :arg etag: ETag входных данных
+    :return: Ответ
+    """
+    return Response(status_code=304, headers={'ETag': etag})
@@ -0,0 +1,390 @@
+"""Метрики API в текстовом формате Prometheus и заголовок Server-Timing."""
+
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.api.admission import limiters
+from src.common.timing import PhaseTimer
+
+# Значения меток метрики
+type Labels = Tuple[str, ...]
+
+# Границы корзин гистограммы времени, с
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Границы корзин гистограммы размера, байт
+SIZE_BUCKETS = tuple(1024 * 4**n for n in range(9))  # 1 КБ .. 64 МБ
+
+# Этапы обработки -> имена в заголовке Server-Timing
+SERVER_TIMING_NAMES: Dict[str, str] = {
+    'upload': 'upload',
+    'parse': 'parse',
+    'fill': 'parse',
+    'solve': 'compute',
+    'compute': 'compute',
+    'serialize': 'render',
+    'render': 'render',
+    'write': 'write',
+}
+
+
+def escape_label(value: str) -> str:
+    """Экранирование значения метки.
+
+    :arg value: Значение
+    :return: Экранированное значение
+    """
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    """Метки в формате {имя="значение",...}.
+
+    :arg names: Имена меток
+    :arg values: Значения меток
+    :return: Текст меток (пустой, если меток нет)
+    """
+    pairs = [
+        f'{name}="{escape_label(value)}"'
+        for name, value in zip(names, values, strict=True)
+    ]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric(ABC):
+    """Метрика с метками."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, label_names: Labels = ()):
+        """Инициализация.
+
+        :arg name: Имя метрики
+        :arg documentation: Описание
+        :arg label_names: Имена меток
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+
+    def header(self) -> List[str]:
+        """Строки HELP и TYPE.
+
+        :return: Строки
+        """
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+
+    @abstractmethod
+    def lines(self) -> List[str]:
+        """Строки значений.
+
+        :return: Строки
+        """
+
+
+class Counter(Metric):
+    """Счетчик (только растет)."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, label_names: Labels = ()):
+        """Инициализация.
+
+        :arg name: Имя метрики
+        :arg documentation: Описание
+        :arg label_names: Имена меток
+        """
+        super().__init__(name, documentation, label_names)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        """Увеличение счетчика.
+
+        :arg labels: Значения меток
+        :arg amount: Приращение
+        """
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def lines(self) -> List[str]:
+        """Строки значений.
+
+        :return: Строки
+        """
+        return [
+            f'{self.name}{format_labels(self.label_names, labels)} {value}'
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class Gauge(Counter):
+    """Текущее значение (растет и убывает)."""
+
+    kind = 'gauge'
+
+    def set(self, labels: Labels, value: float) -> None:
+        """Установка значения.
+
+        :arg labels: Значения меток
+        :arg value: Значение
+        """
+        self.values[labels] = value
+
+
+class Histogram(Metric):
+    """Гистограмма с накопительными корзинами."""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Labels = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        """Инициализация.
+
+        :arg name: Имя метрики
+        :arg documentation: Описание
+        :arg label_names: Имена меток
+        :arg buckets: Верхние границы корзин
+        """
+        super().__init__(name, documentation, label_names)
+        self.buckets = buckets
+        # Метки -> (количество по корзинам, сумма, количество)
+        self.values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        """Учет наблюдения.
+
+        :arg labels: Значения меток
+        :arg value: Значение
+        """
+        counts, totals = self.values.setdefault(
+            labels,
+            ([0] * (len(self.buckets) + 1), [0.0, 0]),
+        )
+        counts[bisect_left(self.buckets, value)] += 1
+        totals[0] += value
+        totals[1] += 1
+
+    def lines(self) -> List[str]:
+        """Строки значений.
+
+        :return: Строки
+        """
+        result = []
+        names = (*self.label_names, 'le')
+        for labels, (counts, totals) in sorted(self.values.items()):
+            cumulative = 0
+            bounds = (*map(str, self.buckets), '+Inf')
+            for bound, count in zip(bounds, counts, strict=True):
+                cumulative += count
+                result.append(
+                    f'{self.name}_bucket'
+                    f'{format_labels(names, (*labels, bound))} {cumulative}'
+                )
+            label_text = format_labels(self.label_names, labels)
+            result.append(f'{self.name}_sum{label_text} {totals[0]}')
+            result.append(f'{self.name}_count{label_text} {totals[1]}')
+        return result
+
+
+class MetricsRegistry:
+    """Метрики API процесса."""
+
+    def __init__(self) -> None:
+        """Инициализация."""
+        self.duration = Histogram(
+            'http_request_duration_seconds',
+            'Время обработки запроса',
+            ('endpoint', 'method'),
+        )
+        self.request_size = Histogram(
+            'http_request_size_bytes',
+            'Размер тела запроса',
+            ('endpoint',),
+            SIZE_BUCKETS,
+        )
+        self.response_size = Histogram(
+            'http_response_size_bytes',
+            'Размер тела ответа',
+            ('endpoint',),
+            SIZE_BUCKETS,
+        )
+        self.in_flight = Gauge(
+            'http_requests_in_flight',
+            'Запросы в обработке',
+            ('endpoint',),
+        )
+        self.requests = Counter(
+            'http_requests_total',
+            'Обработано запросов',
+            ('endpoint', 'method', 'status'),
+        )
+        self.errors = Counter(
+            'http_request_errors_total',
+            'Запросы, завершившиеся ошибкой сервера',
+            ('endpoint',),
+        )
+
+    def admission_metrics(self) -> List[Metric]:
+        """Показатели полос выполнения (очереди запросов).
+
+        :return: Метрики
+        """
+        gauges = {
+            'active': Gauge('admission_active', 'Выполняются', ('lane',)),
+            'waiting': Gauge('admission_waiting', 'Ждут в очереди', ('lane',)),
+        }
+        counters = {
+            'admitted': Counter('admission_admitted_total', 'Принято', ('lane',)),
+            'rejected': Counter('admission_rejected_total', 'Отклонено', ('lane',)),
+            'wait_seconds': Counter(
+                'admission_wait_seconds_total',
+                'Суммарное ожидание в очереди',
+                ('lane',),
+            ),
+        }
+        for name, limiter in limiters.items():
+            stats = limiter.stats()
+            for key, metric in (gauges | counters).items():
+                metric.inc((name,), stats[key])
+        return [*gauges.values(), *counters.values()]
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus.
+
+        :return: Текст
+        """
+        metrics: List[Metric] = [
+            self.duration,
+            self.request_size,
+            self.response_size,
+            self.in_flight,
+            self.requests,
+            self.errors,
+            *self.admission_metrics(),
+        ]
+        lines = []
+        for metric in metrics:
+            lines += metric.header() + metric.lines()
+        return '\n'.join(lines) + '\n'
+
+
+# Метрики процесса
+registry = MetricsRegistry()
+
+
+def server_timing(phases: Dict[str, float]) -> str:
+    """Значение заголовка Server-Timing.
+
+    :arg phases: Этап -> время, с
+    :return: Значение заголовка
+    """
+    durations: Dict[str, float] = {}
+    for phase, seconds in phases.items():
+        name = SERVER_TIMING_NAMES.get(phase, phase)
+        durations[name] = durations.get(name, 0.0) + seconds
+    return ', '.join(
+        f'{name};dur={seconds * 1000:.3f}' for name, seconds in durations.items()
+    )
+
+
+def endpoint_label(scope: Scope) -> str:
+    """Метка метода API: шаблон пути маршрута, а не сам путь.
+
+    :arg scope: Область запроса
+    :return: Шаблон пути (unmatched - маршрут не найден)
+    """
+    for route in getattr(scope.get('app'), 'routes', ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            path: str = route.path
+            return path
+    return 'unmatched'
+
+
+class MetricsMiddleware:
+    """Сбор метрик запросов и заголовок Server-Timing.
+
+    Обработчик может положить замер этапов в request.state.timer,
+    тогда его этапы попадут в заголовок Server-Timing.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """Инициализация.
+
+        :arg app: Приложение
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Замер запроса."""
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        upload_started = 0.0
+        upload_seconds = 0.0
+        request_size = 0
+        response_size = 0
+        status = 500
+
+        async def receive_measured() -> Message:
+            nonlocal upload_started, upload_seconds, request_size
+            if not upload_started:
+                upload_started = time.perf_counter()
+            message = await receive()
+            if message['type'] == 'http.request':
+                request_size += len(message.get('body', b''))
+                if not message.get('more_body', False):
+                    upload_seconds = time.perf_counter() - upload_started
+            return message
+
+        async def send_measured(message: Message) -> None:
+            nonlocal status, response_size
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                timer = PhaseTimer()
+                timer.add('upload', upload_seconds)
+                request_timer = scope.get('state', {}).get('timer')
+                if request_timer is not None:
+                    for phase, seconds in request_timer.phases.items():
+                        timer.add(phase, seconds)
+                timer.add('total', time.perf_counter() - started)
+                headers = list(message.get('headers', []))
+                headers.append(
+                    (b'server-timing', server_timing(timer.phases).encode('latin-1')),
+                )
+                message = {**message, 'headers': headers}
+            elif message['type'] == 'http.response.body':
+                response_size += len(message.get('body', b''))
+            await send(message)
+
+        endpoint = endpoint_label(scope)
+        registry.in_flight.inc((endpoint,))
+        try:
+            await self.app(scope, receive_measured, send_measured)
+        except Exception:
+            status = 500
+            raise
+        finally:
+            registry.in_flight.inc((endpoint,), -1)
+            registry.duration.observe(
+                (endpoint, scope['method']),
+                time.perf_counter() - started,
+            )
+            registry.request_size.observe((endpoint,), request_size)
+            registry.response_size.observe((endpoint,), response_size)
+            registry.requests.inc((endpoint, scope['method'], str(status)))
+            if status >= 500:
+                registry.errors.inc((endpoint,))
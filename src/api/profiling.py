@@ -0,0 +1,76 @@
+"""Профилирование запросов API по требованию."""
+
+import cProfile
+import hmac
+import re
+import uuid
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse
+
+import src.common.constants as constants
+from src.common.profiling import save
+
+# Имя файла с результатом профилирования
+_PROFILE_ID = re.compile(r'[a-z]+-[0-9a-f]{32}')
+
+router = APIRouter()
+
+
+def authorize(request: Request):
+    """Проверка токена профилирования.
+
+    :arg request: Запрос
+    """
+    token = request.headers.get('X-Profile-Token', '')
+    if not constants.PROFILE_TOKEN or not hmac.compare_digest(
+        token.encode('utf-8'),
+        constants.PROFILE_TOKEN.encode('utf-8'),
+    ):
+        raise HTTPException(403)
+
+
+def requested_profile(request: Request) -> cProfile.Profile | None:
+    """Профилировщик, если запрос просит профилирование.
+
+    Профилирование включается заголовком X-Profile: 1 или параметром
+    profile=true и требует токена в заголовке X-Profile-Token.
+
+    :arg request: Запрос
+    :return: Профилировщик (None - профилирование не запрошено)
+    """
+    flag = request.headers.get('X-Profile') or request.query_params.get('profile')
+    if flag not in ('1', 'true'):
+        return None
+    authorize(request)
+    return cProfile.Profile()
+
+
+def store_profile(profile: cProfile.Profile, endpoint: str) -> str:
+    """Сохранение результата профилирования на сервере.
+
+    :arg profile: Профилировщик
+    :arg endpoint: Имя метода API
+    :return: Идентификатор результата (для заголовка X-Profile-Id)
+    """
+    constants.PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    profile_id = f'{endpoint}-{uuid.uuid4().hex}'
+    save(profile, constants.PROFILE_DIR.joinpath(profile_id + '.prof'))
+    return profile_id
+
+
+@router.get('/api/v1/profile/{profile_id}', response_class=FileResponse)
+async def api_profile(request: Request, profile_id: str):
+    """Выгрузка результата профилирования (формат pstats).
+
+    :arg request: Запрос
+    :arg profile_id: Идентификатор из заголовка X-Profile-Id
+    """
+    authorize(request)
+    if not _PROFILE_ID.fullmatch(profile_id):
+        raise HTTPException(404)
+    path = Path(constants.PROFILE_DIR).joinpath(profile_id + '.prof')
+    if not path.is_file():
+        raise HTTPException(404)
+    return FileResponse(path, media_type='application/octet-stream')
@@ -0,0 +1,111 @@
+"""API опубликованных расписаний: выборки по преподавателю и группе."""
+
+from typing import Dict, List
+
+from fastapi import APIRouter, HTTPException, Request, Response, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+import src.common.constants as constants
+from src.api.admission import limiters
+from src.api.conditional import etag_matches, not_modified
+from src.processors.published import DAY_ORDER, QueryKind, published_schedules
+
+router = APIRouter()
+
+
+@router.put('/api/v1/schedule/{schedule_id}')
+async def api_publish(
+    schedule_id: str,
+    files: List[UploadFile],
+) -> Dict[str, str | int]:
+    """Публикация расписания (замена, если идентификатор уже занят).
+
+    :arg schedule_id: Идентификатор расписания
+    :arg files: Файл расписания XML
+    :return: Версия и размеры опубликованного расписания
+    """
+    content = None
+    for file in files:
+        filename = str(file.filename)
+        if file.content_type == constants.FILE_MIME_TYPE and filename.endswith(
+            constants.FILE_EXTENSION,
+        ):
+            content = await file.read()
+    if content is None:
+        raise HTTPException(415)
+    async with limiters['check'].slot():
+        index = await run_in_threadpool(
+            published_schedules.publish, schedule_id, content
+        )
+    return {
+        'id': schedule_id,
+        'version': index.version,
+        'teachers': len(index.lessons[QueryKind.TEACHER]),
+        'groups': len(index.lessons[QueryKind.GROUP]),
+    }
+
+
+def answer(
+    request: Request,
+    schedule_id: str,
+    kind: QueryKind,
+    key: str,
+    day: str | None,
+) -> Response:
+    """Выборка из опубликованного расписания.
+
+    :arg request: Запрос
+    :arg schedule_id: Идентификатор расписания
+    :arg kind: Разрез расписания
+    :arg key: ФИО преподавателя или группа
+    :arg day: День недели (None - вся неделя)
+    :return: Ответ
+    """
+    if day is not None and day not in DAY_ORDER:
+        raise HTTPException(422, f'Неизвестный день недели: {day}')
+    index = published_schedules.get(schedule_id)
+    if index is None:
+        raise HTTPException(404, 'Расписание не опубликовано')
+    rendered = index.render(kind, key, day)
+    if rendered is None:
+        raise HTTPException(404)
+    body, etag = rendered
+    # Клиент перепроверяет ответ: расписание может быть заменено
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return Response(body, media_type='application/json', headers=headers)
+
+
+@router.get('/api/v1/schedule/{schedule_id}/group/{group}')
+async def api_group_lessons(
+    request: Request,
+    schedule_id: str,
+    group: str,
+    day: str | None = None,
+) -> Response:
+    """Уроки группы.
+
+    :arg request: Запрос
+    :arg schedule_id: Идентификатор расписания
+    :arg group: Группа
+    :arg day: День недели (Понедельник...Воскресенье), без него - вся неделя
+    """
+    return answer(request, schedule_id, QueryKind.GROUP, group, day)
+
+
+@router.get('/api/v1/schedule/{schedule_id}/teacher/{name}')
+async def api_teacher_lessons(
+    request: Request,
+    schedule_id: str,
+    name: str,
+    day: str | None = None,
+) -> Response:
+    """Уроки преподавателя.
+
+    :arg request: Запрос
+    :arg schedule_id: Идентификатор расписания
+    :arg name: ФИО преподавателя
+    :arg day: День недели (Понедельник...Воскресенье), без него - вся неделя
+    """
+    return answer(request, schedule_id, QueryKind.TEACHER, name, day)
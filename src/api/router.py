@@ -2,7 +2,15 @@
 
 from fastapi import APIRouter
 
+from src.api.profiling import router as profiling_router
+from src.api.published import router as published_router
 from src.api.schedule import router as schedule_router
+from src.api.status import router as status_router
+from src.api.stored import router as stored_router
 
 api_router = APIRouter()
 api_router.include_router(schedule_router, tags=['schedule'])
+api_router.include_router(published_router, tags=['published'])
+api_router.include_router(stored_router, tags=['stored'])
+api_router.include_router(status_router, tags=['status'])
+api_router.include_router(profiling_router, tags=['profiling'])
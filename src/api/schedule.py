@@ -1,14 +1,17 @@
 """API генерации расписания."""
 
+import hashlib
+import json
 import shutil
+from functools import partial
 from pathlib import Path
 
 # Для создания временной папки
 from tempfile import TemporaryDirectory
-from typing import List
+from typing import TYPE_CHECKING, Annotated, List, Tuple
 
 # Для загрузки файлов на сервер
-from fastapi import APIRouter, HTTPException, UploadFile
+from fastapi import APIRouter, HTTPException, Query, Request, Response, UploadFile
 
 # Для выгрузки файлов с сервера
 from fastapi.responses import FileResponse
@@ -16,49 +19,155 @@ from fastapi.responses import FileResponse
 # Фоновое задание
 from starlette.background import BackgroundTasks
 
+# Расчеты выполняются в пуле потоков, чтобы не блокировать цикл событий
+from starlette.concurrency import run_in_threadpool
+
 import src.common.constants as constants
-from src.processors.checker import Checker
-from src.processors.excel import Excel
-from src.processors.generator.generator import Generator
+from src.api.admission import limiters
+from src.api.conditional import etag_matches, input_etag, not_modified
+from src.api.profiling import requested_profile, store_profile
+from src.common.profiling import call
+from src.common.repository import repository
+from src.common.timing import PhaseTimer
+from src.parsers.exporter import (
+    EXPORT_EXTENSIONS,
+    EXPORT_MIME_TYPES,
+    ExportFormat,
+    missing_requirement,
+)
+
+# Обработчики импортируются при первом обращении к методу API:
+# запуск сервера не загружает openpyxl и pydantic_xml
+
+if TYPE_CHECKING:
+    from src.processors.excel import ExcelTemplate
+    from src.processors.generator.generator import Generator
 
 router = APIRouter()
 
 
+def store_generated(source_content: bytes, gen: 'Generator') -> Tuple[int, int]:
+    """Сохранение настроек и рассчитанного расписания.
+
+    :arg source_content: Файл настроек или снимок
+    :arg gen: Генератор после расчета
+    :return: Идентификаторы версии настроек и расписания
+    """
+    settings_id = repository.save_settings(source_content)
+    return settings_id, repository.save_schedule(gen.lesson_rows(), settings_id)
+
+
 @router.post('/api/v1/generate/', response_class=FileResponse)
-async def api_generate(files: List[UploadFile], background_tasks: BackgroundTasks):
+async def api_generate(
+    request: Request,
+    files: List[UploadFile],
+    background_tasks: BackgroundTasks,
+    export_format: Annotated[ExportFormat, Query(alias='format')] = ExportFormat.XML,
+    strict: bool = False,
+    stats: bool = False,
+    store: bool = False,
+    starts: Annotated[int, Query(ge=1, le=constants.MAX_GENERATOR_STARTS)] = 1,
+):
     """Генерация текстового файла расписания.
 
+    Если у клиента уже есть расписание для тех же входных данных
+    (If-None-Match), возвращается 304 без повторной генерации.
+    С store=true настройки и расписание сохраняются в хранилище,
+    их идентификаторы - в заголовках X-Settings-Id и X-Schedule-Id.
+    Расчет идет в пуле процессов генератора, если он запущен; starts
+    запусков выполняются параллельно, возвращается лучший результат.
+
+    :arg request: Запрос
     :arg files: Исходный файл
     :arg background_tasks: Фоновое задание по очистке временной папки
+    :arg export_format: Формат файла расписания
+    :arg strict: Полная проверка файла настроек
+    :arg stats: Вернуть показатели генератора в заголовке X-Generator-Stats
+    :arg store: Сохранить настройки и расписание в хранилище
+    :arg starts: Количество запусков генератора (пул процессов)
     """
+    message = missing_requirement(export_format)
+    if message is not None:
+        raise HTTPException(400, message)
+    profile = requested_profile(request)
     with TemporaryDirectory(delete=False) as temp_dir:
-        source_file_name = Path(temp_dir).joinpath('source' + constants.FILE_EXTENSION)
         destination_file_name = Path(temp_dir).joinpath(
-            'destination' + constants.FILE_EXTENSION,
+            'destination' + EXPORT_EXTENSIONS[export_format],
         )
-        source_file_found = False
+        source_content = None
         for file in files:
             filename = str(file.filename)
-            if file.content_type == constants.FILE_MIME_TYPE and filename.endswith(
-                constants.FILE_EXTENSION,
+            if (
+                file.content_type == constants.FILE_MIME_TYPE
+                and filename.endswith(constants.FILE_EXTENSION)
+            ) or (
+                file.content_type == constants.SNAPSHOT_MIME_TYPE
+                and filename.endswith(constants.SNAPSHOT_EXTENSION)
             ):
-                with Path.open(source_file_name, 'wb') as source_file:
-                    source_file.write(await file.read())
-                    source_file_found = True
-        if not source_file_found:
+                source_content = await file.read()
+        if source_content is None:
             raise HTTPException(415)
-        gen = Generator()
-        gen.process(source_file_name, destination_file_name)
+        etag = input_etag(
+            'generate',
+            [source_content],
+            {'format': export_format, 'strict': strict, 'starts': starts},
+        )
+        if profile is None and not store and etag_matches(request, etag):
+            background_tasks.add_task(shutil.rmtree, temp_dir, ignore_errors=True)
+            return not_modified(etag)
+        from src.processors.generator.generator import Generator
+        from src.processors.generator.pool import generator_pool
+        from src.processors.generator.snapshot import snapshot_cache
+        from src.processors.generator.stats import SolverStats
+
+        # Показатели собираются по запросу: без них перебор не тратит
+        # время на счетчики. Этапы генерации попадают в Server-Timing
+        solver_stats = SolverStats() if stats or constants.SOLVER_STATS else None
+        request.state.timer = solver_stats
+        async with limiters['generate'].slot():
+            # Повторные настройки не разбираются: данные берутся из снимка
+            data = await run_in_threadpool(
+                call, profile, snapshot_cache.get, source_content, strict, solver_stats
+            )
+            gen = Generator(data, solver_stats)
+            if profile is None and generator_pool.running:
+                # Перебор - в процессах пула, в потоке сервера только запись
+                await run_in_threadpool(generator_pool.solve, gen, starts)
+                await run_in_threadpool(gen.write, destination_file_name, export_format)
+            else:
+                await run_in_threadpool(
+                    call,
+                    profile,
+                    gen.process_data,
+                    destination_file_name,
+                    export_format,
+                )
+        if store:
+            stored = await run_in_threadpool(store_generated, source_content, gen)
         background_tasks.add_task(shutil.rmtree, temp_dir, ignore_errors=True)
-    return destination_file_name
+    headers = {'ETag': etag}
+    if store:
+        headers['X-Settings-Id'], headers['X-Schedule-Id'] = map(str, stored)
+    if stats and solver_stats is not None:
+        headers['X-Generator-Stats'] = json.dumps(solver_stats.summary())
+    if profile is not None:
+        headers['X-Profile-Id'] = store_profile(profile, 'generate')
+    return FileResponse(
+        destination_file_name,
+        media_type=EXPORT_MIME_TYPES[export_format],
+        headers=headers,
+    )
 
 
 @router.post('/api/v1/check/')
-async def api_check(files: List[UploadFile]):
+async def api_check(request: Request, response: Response, files: List[UploadFile]):
     """Проверка текстового файла расписания.
 
+    :arg request: Запрос
+    :arg response: Заголовки ответа
     :arg files: Исходный файл
     """
+    profile = requested_profile(request)
     with TemporaryDirectory(delete=True) as temp_dir:
         source_file_name = Path(temp_dir).joinpath('source' + constants.FILE_EXTENSION)
         source_file_found = False
@@ -72,44 +181,134 @@ async def api_check(files: List[UploadFile]):
                     source_file_found = True
         if not source_file_found:
             raise HTTPException(415)
+        from src.processors.checker import Checker
+
         chk = Checker()
-        return chk.process(source_file_name)
+        timer = PhaseTimer()
+        request.state.timer = timer
+        async with limiters['check'].slot():
+            result = await run_in_threadpool(
+                call, profile, chk.process, source_file_name, timer
+            )
+        if profile is not None:
+            response.headers['X-Profile-Id'] = store_profile(profile, 'check')
+        return result
+
+
+@router.post('/api/v1/diff/')
+async def api_diff(request: Request, files: List[UploadFile]):
+    """Сравнение двух текстовых файлов расписания.
+
+    :arg request: Запрос
+    :arg files: Прежнее и новое расписание (в этом порядке)
+    """
+    with TemporaryDirectory(delete=True) as temp_dir:
+        source_file_names: List[Path] = []
+        for file in files:
+            filename = str(file.filename)
+            if file.content_type == constants.FILE_MIME_TYPE and filename.endswith(
+                constants.FILE_EXTENSION,
+            ):
+                source_file_name = Path(temp_dir).joinpath(
+                    f'source{len(source_file_names)}' + constants.FILE_EXTENSION,
+                )
+                with Path.open(source_file_name, 'wb') as source_file:
+                    source_file.write(await file.read())
+                source_file_names.append(source_file_name)
+        if len(source_file_names) != 2:
+            raise HTTPException(415)
+        old_path, new_path = source_file_names
+        from src.processors.diff import Differ
+
+        differ = Differ()
+        timer = PhaseTimer()
+        request.state.timer = timer
+        # Сравнение дешевое, как и проверка
+        async with limiters['check'].slot():
+            return await run_in_threadpool(
+                differ.process, old_path=old_path, new_path=new_path, timer=timer
+            )
 
 
 @router.post('/api/v1/excel/', response_class=FileResponse)
-async def api_excel(files: List[UploadFile], background_tasks: BackgroundTasks):
+async def api_excel(
+    request: Request,
+    files: List[UploadFile],
+    background_tasks: BackgroundTasks,
+):
     """Преобразование текстового файла расписания в MS Excel.
 
-    :arg files: Исходный файл + файл шаблона XLSX
+    Если шаблон XLSX не передан, используется шаблон сервера.
+    Если у клиента уже есть книга для тех же входных данных
+    (If-None-Match), возвращается 304 без повторного преобразования.
+
+    :arg request: Запрос
+    :arg files: Исходный файл + файл шаблона XLSX (необязательно)
     :arg background_tasks: Фоновое задание по очистке временной папки
     """
+    profile = requested_profile(request)
     with TemporaryDirectory(delete=False) as temp_dir:
+        from src.processors.excel import template_cache
+
         source_file_name = Path(temp_dir).joinpath('source' + constants.FILE_EXTENSION)
-        xlsx_template_name = Path(temp_dir).joinpath('template.xlsx')
         xlsx_result_name = Path(temp_dir).joinpath('result.xlsx')
-        source_file_found = False
-        template_found = False
+        source_content = None
+        template_content = None
         for file in files:
             filename = str(file.filename)
             if file.content_type == constants.FILE_MIME_TYPE and filename.endswith(
                 constants.FILE_EXTENSION,
             ):
-                with Path.open(source_file_name, 'wb') as source_file_file:
-                    source_file_file.write(await file.read())
-                    source_file_found = True
+                source_content = await file.read()
             elif file.content_type == constants.XLSX_MIME_TYPE and filename.endswith(
                 '.xlsx'
             ):
-                with Path.open(xlsx_template_name, 'wb') as xlsx_file:
-                    xlsx_file.write(await file.read())
-                    template_found = True
-        if not source_file_found or not template_found:
+                template_content = await file.read()
+        if source_content is None:
             raise HTTPException(415)
+        # Разобранный шаблон сервера или содержимое шаблона клиента
+        template: ExcelTemplate | bytes
+        if template_content is None:
+            # Шаблон сервера разбирается один раз за время работы
+            template = await run_in_threadpool(template_cache.default)
+            template_digest = template.digest
+        else:
+            template = template_content
+            template_digest = hashlib.sha256(template_content).hexdigest()
+        etag = input_etag('excel', [source_content], {'template': template_digest})
+        if profile is None and etag_matches(request, etag):
+            background_tasks.add_task(shutil.rmtree, temp_dir, ignore_errors=True)
+            return not_modified(etag)
+        with Path.open(source_file_name, 'wb') as source_file:
+            source_file.write(source_content)
+        from src.processors.excel import Excel
+
         ex = Excel()
-        ex.process(
-            template_path=xlsx_template_name,
-            src_path=source_file_name,
-            dst_path=xlsx_result_name,
-        )
+        timer = PhaseTimer()
+        request.state.timer = timer
+        async with limiters['excel'].slot():
+            if isinstance(template, bytes):
+                # Шаблон разбирается один раз для одинакового содержимого
+                template = await run_in_threadpool(
+                    partial(call, profile, template_cache.get, template)
+                )
+            await run_in_threadpool(
+                partial(
+                    call,
+                    profile,
+                    ex.process_template,
+                    template=template,
+                    src_path=source_file_name,
+                    dst_path=xlsx_result_name,
+                    timer=timer,
+                ),
+            )
         background_tasks.add_task(shutil.rmtree, temp_dir, ignore_errors=True)
-    return xlsx_result_name
+    headers = {'ETag': etag}
+    if profile is not None:
+        headers['X-Profile-Id'] = store_profile(profile, 'excel')
+    return FileResponse(
+        xlsx_result_name,
+        media_type=constants.XLSX_MIME_TYPE,
+        headers=headers,
+    )
@@ -0,0 +1,32 @@
+"""API состояния сервера."""
+
+from typing import Dict
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.api.admission import limiters
+from src.api.metrics import registry
+
+router = APIRouter()
+
+
+@router.get('/api/v1/status/')
+async def api_status() -> Dict[str, Dict[str, float]]:
+    """Загрузка полос выполнения: очередь, ожидание, отказы.
+
+    :return: Метод API -> показатели
+    """
+    return {name: limiter.stats() for name, limiter in limiters.items()}
+
+
+@router.get('/metrics', response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Метрики в текстовом формате Prometheus.
+
+    :return: Метрики
+    """
+    return PlainTextResponse(
+        registry.render(),
+        media_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -0,0 +1,220 @@
+"""API хранилища: обращение к сохраненным настройкам и расписаниям по id."""
+
+import shutil
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Annotated, Dict, List
+
+from fastapi import APIRouter, HTTPException, Query, Request, UploadFile
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTasks
+from starlette.concurrency import run_in_threadpool
+
+import src.common.constants as constants
+from src.api.admission import limiters
+from src.common.repository import repository
+from src.common.timing import PhaseTimer
+from src.parsers.exporter import (
+    EXPORT_EXTENSIONS,
+    EXPORT_MIME_TYPES,
+    ExportFormat,
+    missing_requirement,
+    row_to_dict,
+)
+
+router = APIRouter()
+
+
+async def read_upload(files: List[UploadFile], allow_snapshot: bool) -> bytes:
+    """Содержимое загруженного файла XML (или снимка настроек).
+
+    :arg files: Загруженные файлы
+    :arg allow_snapshot: Принимать снимок настроек
+    :return: Содержимое
+    """
+    for file in files:
+        filename = str(file.filename)
+        if (
+            file.content_type == constants.FILE_MIME_TYPE
+            and filename.endswith(constants.FILE_EXTENSION)
+        ) or (
+            allow_snapshot
+            and file.content_type == constants.SNAPSHOT_MIME_TYPE
+            and filename.endswith(constants.SNAPSHOT_EXTENSION)
+        ):
+            return await file.read()
+    raise HTTPException(415)
+
+
+def store_schedule(content: bytes) -> int:
+    """Разбор и сохранение расписания XML.
+
+    :arg content: Файл расписания
+    :return: Идентификатор расписания
+    """
+    import src.parsers.schedule as schedule
+
+    src_data = schedule.parse_schedule(content.decode('utf-8'))
+    return repository.save_schedule(schedule.schedule_rows(src_data))
+
+
+async def existing_schedule(schedule_id: int):
+    """Проверка, что расписание сохранено.
+
+    :arg schedule_id: Идентификатор расписания
+    """
+    if not await run_in_threadpool(repository.schedule_exists, schedule_id):
+        raise HTTPException(404, 'Расписание не найдено')
+
+
+@router.post('/api/v1/stored/settings/')
+async def api_store_settings(files: List[UploadFile]) -> Dict[str, int]:
+    """Сохранение версии настроек.
+
+    :arg files: Файл настроек или снимок
+    :return: Идентификатор версии
+    """
+    content = await read_upload(files, allow_snapshot=True)
+    return {'id': await run_in_threadpool(repository.save_settings, content)}
+
+
+@router.post(
+    '/api/v1/stored/settings/{settings_id}/generate', response_class=FileResponse
+)
+async def api_generate_stored(
+    request: Request,
+    settings_id: int,
+    background_tasks: BackgroundTasks,
+    export_format: Annotated[ExportFormat, Query(alias='format')] = ExportFormat.XML,
+    strict: bool = False,
+    starts: Annotated[int, Query(ge=1, le=constants.MAX_GENERATOR_STARTS)] = 1,
+):
+    """Генерация по сохраненным настройкам, расписание сохраняется.
+
+    Идентификатор расписания возвращается в заголовке X-Schedule-Id.
+
+    :arg request: Запрос
+    :arg settings_id: Идентификатор версии настроек
+    :arg background_tasks: Фоновое задание по очистке временной папки
+    :arg export_format: Формат файла расписания
+    :arg strict: Полная проверка файла настроек
+    :arg starts: Количество запусков генератора (пул процессов)
+    """
+    message = missing_requirement(export_format)
+    if message is not None:
+        raise HTTPException(400, message)
+    content = await run_in_threadpool(repository.settings, settings_id)
+    if content is None:
+        raise HTTPException(404, 'Версия настроек не найдена')
+    from src.processors.generator.generator import Generator
+    from src.processors.generator.pool import generator_pool
+    from src.processors.generator.snapshot import snapshot_cache
+    from src.processors.generator.stats import SolverStats
+
+    with TemporaryDirectory(delete=False) as temp_dir:
+        destination_file_name = Path(temp_dir).joinpath(
+            'destination' + EXPORT_EXTENSIONS[export_format],
+        )
+        solver_stats = SolverStats() if constants.SOLVER_STATS else None
+        request.state.timer = solver_stats
+        async with limiters['generate'].slot():
+            data = await run_in_threadpool(
+                snapshot_cache.get, content, strict, solver_stats
+            )
+            gen = Generator(data, solver_stats)
+            if generator_pool.running:
+                await run_in_threadpool(generator_pool.solve, gen, starts)
+                await run_in_threadpool(gen.write, destination_file_name, export_format)
+            else:
+                await run_in_threadpool(
+                    gen.process_data, destination_file_name, export_format
+                )
+            schedule_id = await run_in_threadpool(
+                repository.save_schedule, gen.lesson_rows(), settings_id
+            )
+        background_tasks.add_task(shutil.rmtree, temp_dir, ignore_errors=True)
+    return FileResponse(
+        destination_file_name,
+        media_type=EXPORT_MIME_TYPES[export_format],
+        headers={'X-Schedule-Id': str(schedule_id)},
+    )
+
+
+@router.post('/api/v1/stored/schedules/')
+async def api_store_schedule(files: List[UploadFile]) -> Dict[str, int]:
+    """Сохранение расписания XML.
+
+    :arg files: Файл расписания
+    :return: Идентификатор расписания
+    """
+    content = await read_upload(files, allow_snapshot=False)
+    async with limiters['check'].slot():
+        return {'id': await run_in_threadpool(store_schedule, content)}
+
+
+@router.get('/api/v1/stored/schedules/{schedule_id}/lessons')
+async def api_stored_lessons(
+    schedule_id: int,
+    teacher: str | None = None,
+    group: str | None = None,
+    day: str | None = None,
+) -> List[Dict[str, str | int]]:
+    """Уроки сохраненного расписания с отбором.
+
+    :arg schedule_id: Идентификатор расписания
+    :arg teacher: ФИО преподавателя
+    :arg group: Группа
+    :arg day: День недели (Понедельник...Воскресенье)
+    :return: Уроки
+    """
+    await existing_schedule(schedule_id)
+    rows = await run_in_threadpool(repository.lessons, schedule_id, teacher, group, day)
+    return [row_to_dict(row) for row in rows]
+
+
+@router.get('/api/v1/stored/schedules/{schedule_id}/check')
+async def api_check_stored(request: Request, schedule_id: int):
+    """Проверка сохраненного расписания.
+
+    :arg request: Запрос
+    :arg schedule_id: Идентификатор расписания
+    """
+    await existing_schedule(schedule_id)
+    from src.processors.checker import Checker
+
+    chk = Checker()
+    timer = PhaseTimer()
+    request.state.timer = timer
+    async with limiters['check'].slot():
+        return await run_in_threadpool(chk.process_stored, schedule_id, timer)
+
+
+@router.get('/api/v1/stored/schedules/{schedule_id}/excel', response_class=FileResponse)
+async def api_excel_stored(
+    request: Request,
+    schedule_id: int,
+    background_tasks: BackgroundTasks,
+):
+    """Книга Excel по сохраненному расписанию и шаблону сервера.
+
+    Книга строится один раз и дальше берется из хранилища.
+
+    :arg request: Запрос
+    :arg schedule_id: Идентификатор расписания
+    :arg background_tasks: Фоновое задание по очистке временной папки
+    """
+    await existing_schedule(schedule_id)
+    from src.processors.excel import Excel, template_cache
+
+    with TemporaryDirectory(delete=False) as temp_dir:
+        xlsx_result_name = Path(temp_dir).joinpath('result.xlsx')
+        ex = Excel()
+        timer = PhaseTimer()
+        request.state.timer = timer
+        async with limiters['excel'].slot():
+            template = await run_in_threadpool(template_cache.default)
+            await run_in_threadpool(
+                ex.process_stored, template, schedule_id, xlsx_result_name, timer
+            )
+        background_tasks.add_task(shutil.rmtree, temp_dir, ignore_errors=True)
+    return FileResponse(xlsx_result_name, media_type=constants.XLSX_MIME_TYPE)
@@ -1,20 +1,29 @@
 """Консольный клиент."""
 
 import argparse
+import json
+import os
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import requests
-
+import src.clients.batch as batch
 from src.common.constants import (
     FILE_EXTENSION,
     FILE_MIME_TYPE,
     PROJ_DESCR,
+    SNAPSHOT_EXTENSION,
+    SNAPSHOT_MIME_TYPE,
     XLSX_MIME_TYPE,
 )
-from src.processors.checker import Checker
-from src.processors.excel import Excel
-from src.processors.generator.generator import Generator
+from src.parsers.exporter import ExportFormat
+
+# Обработчики и HTTP-клиент импортируются в момент использования:
+# каждый режим загружает только свои зависимости
+
+if TYPE_CHECKING:
+    from src.processors.generator.generator import Generator
+    from src.processors.generator.stats import SolverStats
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -52,129 +61,427 @@ def parse_arguments() -> argparse.Namespace:
         action='store_true',
         help='вывод в excel',
     )
+    parser.add_argument(
+        '--diff',
+        action='store_true',
+        help='сравнение расписания с прежней версией (--base)',
+    )
+    parser.add_argument(
+        '-k',
+        '--compile',
+        action='store_true',
+        help='компиляция настроек в снимок для быстрой загрузки',
+    )
     parser.add_argument(
         '-s',
         '--source',
         type=str,
-        help='исходный файл XML',
+        help='исходный файл XML, папка или маска (пакетная обработка)',
+    )
+    parser.add_argument(
+        '-b',
+        '--base',
+        type=str,
+        help='прежняя версия расписания XML для сравнения',
+    )
+    parser.add_argument(
+        '--warm-from',
+        type=str,
+        help='прежнее расписание XML, уроки которого остаются на месте при расчете',
+    )
+    parser.add_argument(
+        '--pin',
+        type=str,
+        choices=['all', 'teachers', 'groups'],
+        default='all',
+        help='какие уроки из --warm-from закрепить: все, '
+        'преподавателей или групп из --pin-name',
+    )
+    parser.add_argument(
+        '--pin-name',
+        type=str,
+        action='append',
+        default=[],
+        help='ФИО преподавателя или группа для --pin (можно указать несколько)',
+    )
+    parser.add_argument(
+        '-i',
+        '--schedule-id',
+        type=int,
+        help='сохраненное расписание вместо исходного файла (проверка, excel)',
+    )
+    parser.add_argument(
+        '--store',
+        action='store_true',
+        help='сохранить настройки и расписание в хранилище (расчет)',
+    )
+    parser.add_argument(
+        '--starts',
+        type=int,
+        default=1,
+        help='количество параллельных запусков генератора, берется лучший (расчет)',
     )
     parser.add_argument(
         '-t',
         '--template',
         type=str,
-        help='файл шаблона Excel',
+        help='файл шаблона Excel (по умолчанию - шаблон сервера)',
     )
     parser.add_argument(
         '-d',
         '--destination',
         type=str,
-        help='целевой файл XML или XLSX',
+        help='целевой файл XML или XLSX (папка при пакетной обработке)',
+    )
+    parser.add_argument(
+        '-f',
+        '--format',
+        type=ExportFormat,
+        choices=list(ExportFormat),
+        default=ExportFormat.XML,
+        help='формат сгенерированного расписания',
+    )
+    parser.add_argument(
+        '--strict',
+        action='store_true',
+        help='полная проверка файла настроек',
+    )
+    parser.add_argument(
+        '--stats',
+        action='store_true',
+        help='вывести показатели генератора (локальный режим)',
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='профилировать обработку (локальный режим): результат в файле .prof',
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=10,
+        help='время ожидания ответа сервера, с',
+    )
+    parser.add_argument(
+        '--connect-timeout',
+        type=float,
+        default=5,
+        help='время ожидания соединения с сервером, с',
+    )
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=3,
+        help='количество повторов запроса при сбое сети или перегрузке сервера',
+    )
+    parser.add_argument(
+        '-z',
+        '--gzip',
+        action='store_true',
+        help='сжимать отправляемые файлы (gzip)',
+    )
+    parser.add_argument(
+        '-n',
+        '--no-input',
+        action='store_true',
+        help='не задавать вопросов (для запуска из скриптов)',
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=1,
+        help='число процессов при обработке папки или маски файлов',
+    )
+    parser.add_argument(
+        '-r',
+        '--report',
+        type=str,
+        help='файл JSON с отчетом пакетной обработки',
     )
     arg_val = parser.parse_args()
+    if arg_val.warm_from and arg_val.starts > 1:
+        # Расчет от прежнего расписания идет одним запуском в текущем процессе
+        parser.error('--starts больше 1 несовместимо с --warm-from')
     return arg_val
 
 
-def check_arguments(arg_val: argparse.Namespace):
+def ask(arg_val: argparse.Namespace, prompt: str) -> str:
+    """Вопрос пользователю.
+
+    :param arg_val: Аргументы командной строки
+    :param prompt: Текст вопроса
+    :return: Ответ (пустой без интерактивного режима)
+    """
+    if arg_val.no_input:
+        return ''
+    return input(prompt)
+
+
+def check_arguments(arg_val: argparse.Namespace) -> None:
     """Проверка аргументов.
 
     :param arg_val: Аргументы командной строки
     """
-    if not arg_val.generate and not arg_val.check and not arg_val.excel:
-        wanna_gen = input('Хотите сгенерировать расписание(Да/Нет)?')
+    if (
+        not arg_val.generate
+        and not arg_val.check
+        and not arg_val.excel
+        and not arg_val.diff
+        and not arg_val.compile
+    ):
+        wanna_gen = ask(arg_val, 'Хотите сгенерировать расписание(Да/Нет)?')
         arg_val.generate = wanna_gen.upper() == 'ДА'
         if not arg_val.generate:
-            wanna_chk = input('Хотите проверить расписание(Да/Нет)?')
+            wanna_chk = ask(arg_val, 'Хотите проверить расписание(Да/Нет)?')
             arg_val.check = wanna_chk.upper() == 'ДА'
         if not arg_val.generate and not arg_val.check:
-            wanna_excel = input('Хотите сформировать Excel-файл(Да/Нет)?')
+            wanna_excel = ask(arg_val, 'Хотите сформировать Excel-файл(Да/Нет)?')
             arg_val.excel = wanna_excel.upper() == 'ДА'
 
-    if not arg_val.generate and not arg_val.check and not arg_val.excel:
+    if (
+        not arg_val.generate
+        and not arg_val.check
+        and not arg_val.excel
+        and not arg_val.diff
+        and not arg_val.compile
+    ):
         raise Exception('Не выбран режим работы (справка --help)')
 
+    # Компиляция и расчет с закреплением уроков выполняются только локально
+    if arg_val.compile or (arg_val.generate and arg_val.warm_from):
+        arg_val.local = True
+
     if not arg_val.url and not arg_val.local:
-        arg_val.url = input('Введите адрес сервера')
+        arg_val.url = ask(arg_val, 'Введите адрес сервера')
 
     if not arg_val.url:
         arg_val.local = True
 
-    if not arg_val.source:
-        arg_val.source = input('Введите путь к исходному файлу')
+    # Сохраненное расписание заменяет исходный файл
+    stored = arg_val.schedule_id is not None and (arg_val.check or arg_val.excel)
+    if not arg_val.source and not stored:
+        arg_val.source = ask(arg_val, 'Введите путь к исходному файлу')
 
     if not arg_val.template and arg_val.excel:
-        arg_val.template = input('Введите путь к файлу шаблона')
+        arg_val.template = ask(
+            arg_val,
+            'Введите путь к файлу шаблона (пусто - шаблон по умолчанию)',
+        )
+
+    if arg_val.diff and not arg_val.base:
+        arg_val.base = ask(arg_val, 'Введите путь к прежней версии расписания')
 
-    if not arg_val.check and not arg_val.destination:
-        arg_val.destination = input('Введите путь к целевому файлу')
+    # Результат проверки и сравнения выводится на экран
+    prints_result = arg_val.check or arg_val.diff
+    if not prints_result and not arg_val.destination:
+        arg_val.destination = ask(arg_val, 'Введите путь к целевому файлу')
 
-    if not arg_val.source:
+    if not arg_val.source and not stored:
         raise Exception('Не указан исходный файл (справка --help)')
 
-    if arg_val.excel and not arg_val.template:
-        raise Exception('Не указан файл шаблона (справка --help)')
+    if arg_val.diff and not arg_val.base:
+        raise Exception('Не указана прежняя версия расписания (справка --help)')
 
-    if not arg_val.check and not arg_val.destination:
+    if not prints_result and not arg_val.destination:
         raise Exception('Не указан целевой файл (справка --help)')
 
 
-def local_client(arg_val: argparse.Namespace):
-    """Клиент для локальной проверки программы."""
+def local_client(arg_val: argparse.Namespace) -> str | None:
+    """Клиент для локальной проверки программы.
+
+    С --profile обработка выполняется под cProfile, результат сохраняется
+    рядом с целевым (или исходным) файлом с расширением .prof.
+
+    :return: Результат проверки или сравнения расписания
+    """
+    if not arg_val.profile:
+        return local_process(arg_val)
+
+    import cProfile
+
+    from src.common.profiling import save, summary
+
+    profile = cProfile.Profile()
+    result = profile.runcall(local_process, arg_val)
+    profile_path = Path(
+        arg_val.destination or arg_val.source or 'schedule'
+    ).with_suffix('.prof')
+    save(profile, profile_path)
+    print(summary(profile))
+    print(f'Профиль сохранен: {profile_path}')
+    return result
+
+
+def solve_in_pool(
+    arg_val: argparse.Namespace, stats: 'SolverStats | None'
+) -> 'Generator':
+    """Расчет несколькими запусками генератора в пуле процессов.
+
+    :param arg_val: Аргументы командной строки
+    :param stats: Показатели генератора (None - не собираются)
+    :return: Генератор с лучшим из рассчитанных расписаний
+    """
+    from src.processors.generator.generator import Generator
+    from src.processors.generator.pool import GeneratorPool
+    from src.processors.generator.snapshot import read_source
+
+    content = Path(arg_val.source).read_bytes()
+    gen = Generator(read_source(content, arg_val.strict, stats), stats)
+    pool = GeneratorPool(min(arg_val.starts, os.cpu_count() or 1))
+    pool.start()
+    try:
+        pool.solve(gen, arg_val.starts)
+    finally:
+        pool.shutdown()
+    gen.write(Path(arg_val.destination), arg_val.format)
+    return gen
+
+
+def local_process(arg_val: argparse.Namespace) -> str | None:
+    """Обработка файла в текущем процессе.
+
+    :return: Результат проверки или сравнения расписания
+    """
     if arg_val.generate:
-        gen = Generator()
-        gen.process(src_path=Path(arg_val.source), dst_path=Path(arg_val.destination))
+        from src.processors.generator.generator import Generator
+        from src.processors.generator.stats import SolverStats
+
+        stats = SolverStats() if arg_val.stats else None
+        if arg_val.starts > 1:
+            gen = solve_in_pool(arg_val, stats)
+        else:
+            from src.processors.generator.structures import PinMode, PinPolicy
+
+            gen = Generator(stats=stats)
+            gen.process(
+                src_path=Path(arg_val.source),
+                dst_path=Path(arg_val.destination),
+                export_format=arg_val.format,
+                strict=arg_val.strict,
+                base_path=Path(arg_val.warm_from) if arg_val.warm_from else None,
+                pin=PinPolicy(PinMode(arg_val.pin), set(arg_val.pin_name)),
+            )
+        if gen.stats is not None:
+            print(json.dumps(gen.stats.to_dict(), ensure_ascii=False, indent=2))
+        if arg_val.store:
+            from src.common.repository import repository
+
+            settings_id = repository.save_settings(Path(arg_val.source).read_bytes())
+            schedule_id = repository.save_schedule(gen.lesson_rows(), settings_id)
+            print(f'Сохранено: настройки {settings_id}, расписание {schedule_id}')
     elif arg_val.check:
+        from src.processors.checker import Checker
+
         chk = Checker()
-        print(chk.process(src_path=Path(arg_val.source)))
-    elif arg_val.excel:
-        ex = Excel()
-        ex.process(
-            template_path=Path(arg_val.template),
-            src_path=Path(arg_val.source),
-            dst_path=Path(arg_val.destination),
+        if arg_val.schedule_id is not None:
+            return chk.process_stored(arg_val.schedule_id)
+        return chk.process(src_path=Path(arg_val.source))
+    elif arg_val.diff:
+        from src.processors.diff import Differ
+
+        differ = Differ()
+        return differ.process(
+            old_path=Path(arg_val.base), new_path=Path(arg_val.source)
         )
+    elif arg_val.excel:
+        from src.processors.excel import Excel
 
+        ex = Excel()
+        if arg_val.schedule_id is not None:
+            from src.processors.excel import template_cache
 
-def http_client(arg_val: argparse.Namespace):
-    """Клиент для работы с программой через http."""
-    files_to_upload = [
-        (
-            'files',
-            (
-                'source' + FILE_EXTENSION,
-                Path.open(arg_val.source, 'rb'),
-                FILE_MIME_TYPE,
-            ),
-        )
-    ]
-    if arg_val.excel:
-        files_to_upload.append(
-            (
-                'files',
-                ('template.xlsx', Path.open(arg_val.template, 'rb'), XLSX_MIME_TYPE),
+            template = (
+                template_cache.load(Path(arg_val.template))
+                if arg_val.template
+                else template_cache.default()
             )
-        )
+            ex.process_stored(
+                template=template,
+                schedule_id=arg_val.schedule_id,
+                dst_path=Path(arg_val.destination),
+            )
+        else:
+            ex.process(
+                template_path=Path(arg_val.template) if arg_val.template else None,
+                src_path=Path(arg_val.source),
+                dst_path=Path(arg_val.destination),
+            )
+    elif arg_val.compile:
+        from src.processors.generator.snapshot import compile_settings, dump_snapshot
+
+        with Path.open(arg_val.source, 'rb') as file:
+            data = compile_settings(file.read(), strict=arg_val.strict)
+        with Path.open(arg_val.destination, 'wb') as file:
+            file.write(dump_snapshot(data))
+    return None
+
+
+def http_client(arg_val: argparse.Namespace) -> str | None:
+    """Клиент для работы с программой через http.
+
+    :return: Результат проверки или сравнения расписания
+    """
+    import src.clients.http as http
+
     api_url = arg_val.url
     if ':' not in api_url:
         api_url += ':8000'
+    client = http.get_client(
+        timeout=arg_val.timeout,
+        connect_timeout=arg_val.connect_timeout,
+        retries=arg_val.retries,
+        gzip_upload=arg_val.gzip,
+    )
+    destination = Path(arg_val.destination) if arg_val.destination else None
+    if arg_val.schedule_id is not None and (arg_val.check or arg_val.excel):
+        # Сохраненное расписание: файлы не отправляются (шаблон - сервера)
+        action = 'check' if arg_val.check else 'excel'
+        api_url += f'/api/v1/stored/schedules/{arg_val.schedule_id}/{action}'
+        content = client.get(api_url, destination)
+        if not arg_val.check:
+            return None
+        # Сервер отдает отчет строкой JSON
+        report: str = json.loads(content)
+        return report
+
+    if arg_val.source.endswith(SNAPSHOT_EXTENSION):
+        source_name, source_type = 'source' + SNAPSHOT_EXTENSION, SNAPSHOT_MIME_TYPE
+    else:
+        source_name, source_type = 'source' + FILE_EXTENSION, FILE_MIME_TYPE
+    parts = [http.UploadPart(source_name, Path(arg_val.source), source_type)]
+    if arg_val.diff:
+        # Прежняя версия передается первой
+        parts.insert(
+            0,
+            http.UploadPart(
+                'base' + FILE_EXTENSION, Path(arg_val.base), FILE_MIME_TYPE
+            ),
+        )
+    if arg_val.excel and arg_val.template:
+        parts.append(
+            http.UploadPart('template.xlsx', Path(arg_val.template), XLSX_MIME_TYPE),
+        )
     if arg_val.generate:
-        api_url += '/api/v1/generate/'
+        api_url += f'/api/v1/generate/?format={arg_val.format}'
+        if arg_val.strict:
+            api_url += '&strict=true'
+        if arg_val.store:
+            api_url += '&store=true'
+        if arg_val.starts > 1:
+            api_url += f'&starts={arg_val.starts}'
     elif arg_val.check:
         api_url += '/api/v1/check/'
+    elif arg_val.diff:
+        api_url += '/api/v1/diff/'
     elif arg_val.excel:
         api_url += '/api/v1/excel/'
 
-    response = requests.post(
-        api_url,
-        files=files_to_upload,
-        timeout=10,
-    )
-
-    if response.status_code == 200:
-        if arg_val.destination:
-            with Path.open(arg_val.destination, 'wb') as file:
-                file.write(response.content)
-    else:
-        raise Exception(f'Ошибка HTTP, статус {response.status_code}')
+    content = client.post_files(api_url, parts, destination)
+    if arg_val.check or arg_val.diff:
+        report = json.loads(content)
+        return report
+    return None
 
 
 def cli_main() -> None:
@@ -182,11 +489,19 @@ def cli_main() -> None:
     arg_val = parse_arguments()
     try:
         check_arguments(arg_val)
+        client = local_client if arg_val.local else http_client
 
-        if arg_val.local:
-            local_client(arg_val)
+        if arg_val.source and batch.is_batch_source(arg_val.source):
+            results = batch.run_batch(client, arg_val)
+            batch.print_summary(results)
+            if arg_val.report:
+                batch.write_report(results, Path(arg_val.report))
+            if any(r.status != batch.STATUS_OK for r in results):
+                sys.exit(1)
         else:
-            http_client(arg_val)
+            check_result = client(arg_val)
+            if check_result:
+                print(check_result)
     except Exception as err:
         print(err)
         sys.exit(1)
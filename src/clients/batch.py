@@ -0,0 +1,172 @@
+"""Пакетная обработка файлов консольным клиентом."""
+
+import argparse
+import glob
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, List
+
+from src.common.constants import FILE_EXTENSION, SNAPSHOT_EXTENSION
+from src.parsers.exporter import EXPORT_EXTENSIONS
+
+# Обработка одного файла: аргументы -> результат проверки (или None)
+type FileHandler = Callable[[argparse.Namespace], str | None]
+
+# Статусы обработки файла
+STATUS_OK = 'ok'
+STATUS_INVALID = 'invalid'  # Проверка нашла ошибки в расписании
+STATUS_FAILED = 'failed'
+
+
+@dataclass
+class BatchResult:
+    """Результат обработки одного файла."""
+
+    source: str  # Исходный файл
+    destination: str | None  # Целевой файл
+    status: str  # Статус
+    seconds: float  # Время обработки
+    message: str = ''  # Ошибка или результат проверки
+
+
+def is_batch_source(source: str) -> bool:
+    """Исходный файл задан папкой или маской.
+
+    :arg source: Путь из командной строки
+    :return: Нужна пакетная обработка
+    """
+    return glob.has_magic(source) or Path(source).is_dir()
+
+
+def expand_sources(source: str) -> List[Path]:
+    """Список исходных файлов по папке или маске.
+
+    :arg source: Папка или маска
+    :return: Файлы в алфавитном порядке
+    """
+    if Path(source).is_dir():
+        return sorted(
+            p
+            for p in Path(source).iterdir()
+            if p.is_file() and p.suffix in (FILE_EXTENSION, SNAPSHOT_EXTENSION)
+        )
+    # glob.glob понимает и абсолютные маски, в отличие от Path.glob
+    matches = glob.glob(source)  # noqa: PTH207
+    return sorted(Path(p) for p in matches if Path(p).is_file())
+
+
+def destination_for(source: Path, arg_val: argparse.Namespace) -> str | None:
+    """Целевой файл для исходного.
+
+    :arg source: Исходный файл
+    :arg arg_val: Аргументы командной строки
+    :return: Путь в целевой папке (None для проверки и сравнения)
+    """
+    if arg_val.check or arg_val.diff:
+        return None
+    if arg_val.generate:
+        extension = EXPORT_EXTENSIONS[arg_val.format]
+    elif arg_val.excel:
+        extension = '.xlsx'
+    else:
+        extension = SNAPSHOT_EXTENSION
+    return str(Path(arg_val.destination).joinpath(source.stem + extension))
+
+
+def process_file(
+    handler: FileHandler,
+    arg_val: argparse.Namespace,
+) -> BatchResult:
+    """Обработка одного файла (выполняется в процессе пула).
+
+    :arg handler: Клиент (локальный или http)
+    :arg arg_val: Аргументы для этого файла
+    :return: Результат
+    """
+    started = time.perf_counter()
+    try:
+        result = handler(arg_val)
+    except Exception as err:
+        return BatchResult(
+            source=arg_val.source,
+            destination=arg_val.destination,
+            status=STATUS_FAILED,
+            seconds=time.perf_counter() - started,
+            message=str(err),
+        )
+    status = STATUS_OK
+    if result and 'Ошибки' in json.loads(result):
+        status = STATUS_INVALID
+    return BatchResult(
+        source=arg_val.source,
+        destination=arg_val.destination,
+        status=status,
+        seconds=time.perf_counter() - started,
+        message=result or '',
+    )
+
+
+def run_batch(handler: FileHandler, arg_val: argparse.Namespace) -> List[BatchResult]:
+    """Пакетная обработка.
+
+    :arg handler: Клиент (локальный или http)
+    :arg arg_val: Аргументы командной строки (source - папка или маска)
+    :return: Результаты по файлам в порядке исходных файлов
+    """
+    sources = expand_sources(arg_val.source)
+    if not sources:
+        raise Exception(f'Нет файлов для обработки: {arg_val.source}')
+    if arg_val.destination:
+        Path(arg_val.destination).mkdir(parents=True, exist_ok=True)
+
+    file_args = []
+    for source in sources:
+        file_arg = argparse.Namespace(**vars(arg_val))
+        file_arg.source = str(source)
+        file_arg.destination = destination_for(source, arg_val)
+        file_args.append(file_arg)
+
+    if arg_val.jobs <= 1:
+        return [process_file(handler, file_arg) for file_arg in file_args]
+    with ProcessPoolExecutor(max_workers=arg_val.jobs) as pool:
+        return list(
+            pool.map(process_file, [handler] * len(file_args), file_args),
+        )
+
+
+def print_summary(results: List[BatchResult]):
+    """Вывод сводной таблицы.
+
+    :arg results: Результаты по файлам
+    """
+    width = max(len(r.source) for r in results)
+    print(f'{"Файл":{width}}  {"Статус":8}  {"Время, с":>9}')
+    for r in results:
+        print(f'{r.source:{width}}  {r.status:8}  {r.seconds:9.3f}')
+        if r.status == STATUS_FAILED:
+            print(f'{"":{width}}  {r.message}')
+    failed = sum(r.status != STATUS_OK for r in results)
+    total_seconds = sum(r.seconds for r in results)
+    print(
+        f'Всего: {len(results)}, успешно: {len(results) - failed}, '
+        f'с ошибками: {failed}, время обработки: {total_seconds:.3f} с'
+    )
+
+
+def write_report(results: List[BatchResult], report_path: Path):
+    """Сохранение отчета в JSON.
+
+    :arg results: Результаты по файлам
+    :arg report_path: Путь к отчету
+    """
+    report = {
+        'total': len(results),
+        'ok': sum(r.status == STATUS_OK for r in results),
+        'failures': [asdict(r) for r in results if r.status != STATUS_OK],
+        'results': [asdict(r) for r in results],
+    }
+    with Path.open(report_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
@@ -0,0 +1,241 @@
+"""HTTP-клиент для работы с сервером расписания."""
+
+import time
+import uuid
+import zlib
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from typing import Iterable, Iterator, List
+
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+# Размер блока при чтении и записи файлов
+CHUNK_SIZE = 64 * 1024
+
+# Статусы, при которых запрос стоит повторить
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Статусы, при которых сервер точно не выполнял запрос (повтор POST)
+REJECTED_STATUSES = frozenset({429, 503})
+
+
+@dataclass(frozen=True)
+class UploadPart:
+    """Файл для выгрузки на сервер."""
+
+    filename: str  # Имя файла для сервера
+    path: Path  # Путь к локальному файлу
+    content_type: str  # MIME-тип
+
+
+def multipart_body(
+    parts: Iterable[UploadPart],
+    boundary: str,
+    field: str = 'files',
+) -> Iterator[bytes]:
+    """Тело multipart/form-data, читаемое с диска по частям.
+
+    :arg parts: Файлы
+    :arg boundary: Разделитель частей
+    :arg field: Имя поля формы
+    :return: Блоки тела запроса
+    """
+    for part in parts:
+        yield (
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="{field}"; '
+            f'filename="{part.filename}"\r\n'
+            f'Content-Type: {part.content_type}\r\n\r\n'
+        ).encode('utf-8')
+        with Path.open(part.path, 'rb') as file:
+            while chunk := file.read(CHUNK_SIZE):
+                yield chunk
+        yield b'\r\n'
+    yield f'--{boundary}--\r\n'.encode('utf-8')
+
+
+def not_sent(err: requests.RequestException) -> bool:
+    """Ошибка возникла до отправки запроса (соединение не установлено).
+
+    :arg err: Ошибка запроса
+    :return: Сервер не получал запрос
+    """
+    if isinstance(err, requests.ConnectTimeout):
+        return True
+    if isinstance(err, requests.Timeout):
+        # Ответ не дождались, а запрос мог уже выполняться
+        return False
+    cause = err.args[0] if err.args else None
+    if isinstance(cause, MaxRetryError):
+        cause = cause.reason
+    return isinstance(cause, NewConnectionError)
+
+
+def gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Потоковое сжатие gzip.
+
+    :arg chunks: Исходные блоки
+    :return: Сжатые блоки
+    """
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class HttpClient:
+    """Клиент с пулом соединений, потоковой передачей и повторами."""
+
+    def __init__(
+        self,
+        timeout: float = 10,
+        connect_timeout: float = 5,
+        retries: int = 3,
+        backoff: float = 0.5,
+        gzip_upload: bool = False,
+    ):
+        """Инициализация.
+
+        :arg timeout: Время ожидания ответа, с
+        :arg connect_timeout: Время ожидания соединения, с
+        :arg retries: Количество повторов при сбое
+        :arg backoff: Начальная пауза между повторами, с (удваивается)
+        :arg gzip_upload: Сжимать тело запроса
+        """
+        self.timeout = (connect_timeout, timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.gzip_upload = gzip_upload
+        self.session = requests.Session()
+        # Ответы сервера могут приходить сжатыми
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+
+    def post_files(
+        self,
+        url: str,
+        parts: List[UploadPart],
+        destination: Path | None = None,
+    ) -> bytes:
+        """Отправка файлов на сервер.
+
+        Запрос может изменять данные сервера (store=true) и долго
+        выполняться, поэтому повторяется, только если сервер его точно
+        не выполнял: соединение не установлено или ответ 429/503.
+
+        :arg url: Адрес метода API
+        :arg parts: Файлы
+        :arg destination: Файл для ответа (None - ответ возвращается)
+        :return: Тело ответа (пустое, если оно записано в файл)
+        """
+        return self.__fetch(url, parts, destination)
+
+    def get(self, url: str, destination: Path | None = None) -> bytes:
+        """Получение результата с сервера (например, по сохраненному id).
+
+        :arg url: Адрес метода API
+        :arg destination: Файл для ответа (None - ответ возвращается)
+        :return: Тело ответа (пустое, если оно записано в файл)
+        """
+        return self.__fetch(url, None, destination)
+
+    def __fetch(
+        self,
+        url: str,
+        parts: List[UploadPart] | None,
+        destination: Path | None,
+    ) -> bytes:
+        """Запрос с повторами.
+
+        GET повторяется при любом сбое сети и временной ошибке сервера,
+        POST - только если запрос не дошел до обработки.
+
+        :arg url: Адрес метода API
+        :arg parts: Файлы (None - запрос GET)
+        :arg destination: Файл для ответа (None - ответ возвращается)
+        :return: Тело ответа (пустое, если оно записано в файл)
+        """
+        idempotent = parts is None
+        retry_statuses = RETRY_STATUSES if idempotent else REJECTED_STATUSES
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                response = self.__send(url, parts)
+            except (requests.ConnectionError, requests.Timeout) as err:
+                if last_attempt or not (idempotent or not_sent(err)):
+                    raise
+                self.__pause(attempt)
+                continue
+            with response:
+                if response.status_code in retry_statuses and not last_attempt:
+                    self.__pause(attempt, response.headers.get('Retry-After'))
+                    continue
+                if response.status_code != 200:
+                    raise Exception(f'Ошибка HTTP, статус {response.status_code}')
+                if destination is None:
+                    return response.content
+                with Path.open(destination, 'wb') as file:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        file.write(chunk)
+                return b''
+        return b''
+
+    def __send(self, url: str, parts: List[UploadPart] | None) -> requests.Response:
+        """Одна попытка запроса.
+
+        :arg url: Адрес метода API
+        :arg parts: Файлы (None - запрос GET)
+        :return: Ответ (тело еще не прочитано)
+        """
+        if parts is None:
+            return self.session.get(url, timeout=self.timeout, stream=True)
+        boundary = uuid.uuid4().hex
+        headers = {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+        body = multipart_body(parts, boundary)
+        if self.gzip_upload:
+            headers['Content-Encoding'] = 'gzip'
+            body = gzip_stream(body)
+        return self.session.post(
+            url,
+            data=body,
+            headers=headers,
+            timeout=self.timeout,
+            stream=True,
+        )
+
+    def __pause(self, attempt: int, retry_after: str | None = None):
+        """Пауза перед повтором.
+
+        :arg attempt: Номер попытки
+        :arg retry_after: Значение заголовка Retry-After
+        """
+        delay = self.backoff * 2**attempt
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        time.sleep(delay)
+
+
+@cache
+def get_client(
+    timeout: float,
+    connect_timeout: float,
+    retries: int,
+    gzip_upload: bool,
+) -> HttpClient:
+    """Общий клиент процесса: соединения переиспользуются между запросами.
+
+    :arg timeout: Время ожидания ответа, с
+    :arg connect_timeout: Время ожидания соединения, с
+    :arg retries: Количество повторов при сбое
+    :arg gzip_upload: Сжимать тело запроса
+    :return: Клиент
+    """
+    return HttpClient(
+        timeout=timeout,
+        connect_timeout=connect_timeout,
+        retries=retries,
+        gzip_upload=gzip_upload,
+    )
@@ -1,7 +1,9 @@
 """Переиспользуемые константы."""
 
+import os
+import tempfile
 from pathlib import Path
-from typing import Final
+from typing import Dict, Final, Tuple
 
 PROJ_NAME: Final[str] = 'ART_SCHOOL_SCHEDULE'
 PROJ_DESCR: Final[str] = 'Генератор расписания школы дополнительного образования'
@@ -9,8 +11,51 @@ PROJ_PATH: Final[Path] = [
     p for p in Path(__file__).parents if p.parts[-1] == PROJ_NAME
 ][0]
 TESTFILE_PATH: Final[Path] = PROJ_PATH.joinpath('tests').joinpath('test_files')
+# Файлы, поставляемые вместе с пакетом
+RESOURCE_PATH: Final[Path] = Path(__file__).parents[1].joinpath('resources')
+# Шаблон Excel на сервере (используется, если клиент не передал свой)
+DEFAULT_TEMPLATE_PATH: Final[Path] = Path(
+    os.environ.get('SCHEDULE_TEMPLATE', RESOURCE_PATH.joinpath('Template.xlsx')),
+)
 FILE_EXTENSION: Final[str] = '.xml'
 FILE_MIME_TYPE: Final[str] = 'application/xml'
+SNAPSHOT_EXTENSION: Final[str] = '.sched'
+SNAPSHOT_MIME_TYPE: Final[str] = 'application/octet-stream'
 XLSX_MIME_TYPE: Final[str] = (
     'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
 )
+# Количество разобранных шаблонов Excel в кэше
+TEMPLATE_CACHE_SIZE: Final[int] = 8
+# Количество скомпилированных снимков настроек в кэше
+SNAPSHOT_CACHE_SIZE: Final[int] = 32
+# Количество расстановок по дням, запоминаемых для класса и смены
+DAY_PLAN_CACHE_SIZE: Final[int] = 8
+# Попыток найти перестановку дней запомненной расстановки для новой группы
+DAY_PLAN_SHUFFLES: Final[int] = 30
+# Ограничения одновременных запросов к API: метод -> (выполняются, ждут в очереди)
+ADMISSION_LIMITS: Final[Dict[str, Tuple[int, int]]] = {
+    'generate': (int(os.environ.get('SCHEDULE_GENERATE_CONCURRENCY', 2)), 8),
+    'excel': (int(os.environ.get('SCHEDULE_EXCEL_CONCURRENCY', 2)), 8),
+    # Проверка дешевая и идет отдельной полосой, чтобы генерация ее не задерживала
+    'check': (int(os.environ.get('SCHEDULE_CHECK_CONCURRENCY', 4)), 32),
+}
+# Профилирование запросов API: токен доступа (без него профилирование выключено)
+PROFILE_TOKEN: Final[str] = os.environ.get('SCHEDULE_PROFILE_TOKEN', '')
+# Папка для результатов профилирования запросов API
+PROFILE_DIR: Final[Path] = Path(
+    os.environ.get(
+        'SCHEDULE_PROFILE_DIR',
+        Path(tempfile.gettempdir()).joinpath('schedule_profiles'),
+    ),
+)
+# Показатели генератора во всех запросах API (этапы попадают в Server-Timing);
+# без этого они собираются только по запросу клиента (stats=true)
+SOLVER_STATS: Final[bool] = os.environ.get('SCHEDULE_SOLVER_STATS', '0') == '1'
+# Хранилище SQLite: настройки, расписания, книги Excel
+REPOSITORY_PATH: Final[Path] = Path(
+    os.environ.get('SCHEDULE_DB', PROJ_PATH.joinpath('schedule.sqlite3')),
+)
+# Процессы генератора, запускаемые вместе с сервером (0 - расчет в потоках сервера)
+GENERATOR_WORKERS: Final[int] = int(os.environ.get('SCHEDULE_GENERATOR_WORKERS', 2))
+# Максимальное количество запусков генератора в одном запросе
+MAX_GENERATOR_STARTS: Final[int] = 16
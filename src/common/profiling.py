@@ -0,0 +1,56 @@
+"""Профилирование обработчиков по запросу."""
+
+import cProfile
+import io
+import pstats
+import threading
+from pathlib import Path
+from typing import Callable
+
+# Профилировщик в процессе может работать только один: с Python 3.12
+# второй runcall падает с ValueError, пока первый не закончился
+_profile_lock = threading.Lock()
+
+
+def call[**P, R](
+    profile: cProfile.Profile | None,
+    func: Callable[P, R],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> R:
+    """Вызов функции, под профилировщиком, если он передан.
+
+    Профилируемые вызовы выполняются по очереди.
+
+    :arg profile: Профилировщик (None - обычный вызов)
+    :arg func: Функция
+    :return: Результат функции
+    """
+    if profile is None:
+        return func(*args, **kwargs)
+    with _profile_lock:
+        return profile.runcall(func, *args, **kwargs)
+
+
+def save(profile: cProfile.Profile, path: Path):
+    """Сохранение результата в формате pstats.
+
+    Файл открывается через python -m pstats, snakeviz и подобные средства.
+
+    :arg profile: Профилировщик
+    :arg path: Путь к файлу
+    """
+    profile.dump_stats(path)
+
+
+def summary(profile: cProfile.Profile, limit: int = 20) -> str:
+    """Самые затратные функции по суммарному времени.
+
+    :arg profile: Профилировщик
+    :arg limit: Количество строк
+    :return: Текст таблицы
+    """
+    stream = io.StringIO()
+    stats = pstats.Stats(profile, stream=stream)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return stream.getvalue()
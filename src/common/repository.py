@@ -0,0 +1,269 @@
+"""Хранилище SQLite: версии настроек, расписания и книги Excel."""
+
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+import src.common.constants as constants
+import src.parsers.tags as tags
+from src.parsers.exporter import LessonRow
+
+# День недели и смена хранятся номерами в порядке вывода
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    id INTEGER PRIMARY KEY,
+    digest TEXT NOT NULL UNIQUE,
+    content BLOB NOT NULL,
+    created TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS schedules (
+    id INTEGER PRIMARY KEY,
+    settings_id INTEGER REFERENCES settings (id),
+    created TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS lessons (
+    schedule_id INTEGER NOT NULL REFERENCES schedules (id) ON DELETE CASCADE,
+    teacher TEXT NOT NULL,
+    grp TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    part INTEGER NOT NULL,
+    npp INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lessons_teacher
+    ON lessons (schedule_id, teacher, day, part, npp);
+CREATE INDEX IF NOT EXISTS lessons_group
+    ON lessons (schedule_id, grp, day, part, npp);
+CREATE INDEX IF NOT EXISTS lessons_slot
+    ON lessons (schedule_id, day, part, npp);
+CREATE TABLE IF NOT EXISTS workbooks (
+    schedule_id INTEGER NOT NULL REFERENCES schedules (id) ON DELETE CASCADE,
+    template_digest TEXT NOT NULL,
+    content BLOB NOT NULL,
+    created TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (schedule_id, template_digest)
+);
+"""
+
+# Номер дня недели и смены по тегу
+DAY_NUMBERS = {tag: n for n, tag in enumerate(tags.DAYS)}
+PART_NUMBERS = {tag: n for n, tag in enumerate(tags.PARTS)}
+
+# Пересечение уроков группы: (группа, номер дня, номер смены, номер урока)
+type GroupConflict = Tuple[str, int, int, int]
+
+
+class Repository:
+    """Хранилище.
+
+    Соединение открывается на каждую операцию: методы можно вызывать
+    из пула потоков и из процессов пакетной обработки.
+    """
+
+    def __init__(self, path: Path):
+        """Инициализация (файл базы создается при первом обращении).
+
+        :arg path: Путь к файлу базы
+        """
+        self.path = path
+        # Файл базы, в котором уже созданы таблицы
+        self.__schema_path: Path | None = None
+        self.__schema_lock = threading.Lock()
+
+    def __ensure_schema(self, connection: sqlite3.Connection):
+        """Создание таблиц при первом обращении к файлу базы.
+
+        :arg connection: Соединение
+        """
+        if self.__schema_path == self.path:
+            return
+        with self.__schema_lock:
+            if self.__schema_path != self.path:
+                connection.executescript(SCHEMA)
+                self.__schema_path = self.path
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """Соединение с базой в транзакции.
+
+        :return: Соединение
+        """
+        connection = sqlite3.connect(self.path)
+        try:
+            connection.execute('PRAGMA foreign_keys = ON')
+            self.__ensure_schema(connection)
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def save_settings(self, content: bytes) -> int:
+        """Сохранение версии настроек (повторная версия не дублируется).
+
+        :arg content: Файл настроек или снимок
+        :return: Идентификатор версии
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        with self.connect() as connection:
+            connection.execute(
+                'INSERT OR IGNORE INTO settings (digest, content) VALUES (?, ?)',
+                (digest, content),
+            )
+            (settings_id,) = connection.execute(
+                'SELECT id FROM settings WHERE digest = ?',
+                (digest,),
+            ).fetchone()
+        return settings_id
+
+    def settings(self, settings_id: int) -> bytes | None:
+        """Версия настроек.
+
+        :arg settings_id: Идентификатор версии
+        :return: Файл настроек или снимок (None - нет такой версии)
+        """
+        with self.connect() as connection:
+            row = connection.execute(
+                'SELECT content FROM settings WHERE id = ?',
+                (settings_id,),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def save_schedule(
+        self,
+        rows: Iterable[LessonRow],
+        settings_id: int | None = None,
+    ) -> int:
+        """Сохранение расписания строками уроков.
+
+        :arg rows: Уроки
+        :arg settings_id: Версия настроек, по которой построено расписание
+        :return: Идентификатор расписания
+        """
+        with self.connect() as connection:
+            schedule_id = connection.execute(
+                'INSERT INTO schedules (settings_id) VALUES (?)',
+                (settings_id,),
+            ).lastrowid
+            if schedule_id is None:
+                raise Exception('Не удалось сохранить расписание')
+            connection.executemany(
+                'INSERT INTO lessons (schedule_id, teacher, grp, subject, day, part, npp)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (
+                    (
+                        schedule_id,
+                        teacher,
+                        group,
+                        subject,
+                        DAY_NUMBERS[day],
+                        PART_NUMBERS[part],
+                        npp,
+                    )
+                    for teacher, group, subject, day, part, npp in rows
+                ),
+            )
+        return schedule_id
+
+    def schedule_exists(self, schedule_id: int) -> bool:
+        """Расписание сохранено.
+
+        :arg schedule_id: Идентификатор расписания
+        :return: Расписание есть в хранилище
+        """
+        with self.connect() as connection:
+            row = connection.execute(
+                'SELECT 1 FROM schedules WHERE id = ?',
+                (schedule_id,),
+            ).fetchone()
+        return row is not None
+
+    def lessons(
+        self,
+        schedule_id: int,
+        teacher: str | None = None,
+        group: str | None = None,
+        day: str | None = None,
+    ) -> List[LessonRow]:
+        """Уроки расписания по индексам таблицы.
+
+        Без отбора уроки идут в порядке сохранения (по учителям),
+        с отбором - по дню недели, смене и номеру урока.
+
+        :arg schedule_id: Идентификатор расписания
+        :arg teacher: ФИО преподавателя
+        :arg group: Группа
+        :arg day: День недели
+        :return: Уроки
+        """
+        conditions = ['schedule_id = ?']
+        params: List[object] = [schedule_id]
+        for column, value in (
+            ('teacher', teacher),
+            ('grp', group),
+            ('day', None if day is None else DAY_NUMBERS.get(day, -1)),
+        ):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        order = 'rowid' if len(params) == 1 else 'day, part, npp'
+        # В текст запроса попадают только имена колонок, значения - параметрами
+        with self.connect() as connection:
+            rows = connection.execute(
+                'SELECT teacher, grp, subject, day, part, npp FROM lessons'  # noqa: S608
+                f' WHERE {" AND ".join(conditions)} ORDER BY {order}',
+                params,
+            ).fetchall()
+        return [
+            (teacher, group, subject, tags.DAYS[day], tags.PARTS[part], npp)
+            for teacher, group, subject, day, part, npp in rows
+        ]
+
+    def group_conflicts(self, schedule_id: int) -> List[GroupConflict]:
+        """Уроки одной группы в одно время у разных преподавателей.
+
+        :arg schedule_id: Идентификатор расписания
+        :return: Пересечения
+        """
+        with self.connect() as connection:
+            return connection.execute(
+                'SELECT grp, day, part, npp FROM lessons WHERE schedule_id = ?'
+                ' GROUP BY grp, day, part, npp HAVING COUNT(*) > 1'
+                ' ORDER BY day, part, npp, grp',
+                (schedule_id,),
+            ).fetchall()
+
+    def save_workbook(self, schedule_id: int, template_digest: str, content: bytes):
+        """Сохранение книги Excel, построенной по расписанию.
+
+        :arg schedule_id: Идентификатор расписания
+        :arg template_digest: Хэш шаблона
+        :arg content: Книга XLSX
+        """
+        with self.connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO workbooks (schedule_id, template_digest, content)'
+                ' VALUES (?, ?, ?)',
+                (schedule_id, template_digest, content),
+            )
+
+    def workbook(self, schedule_id: int, template_digest: str) -> bytes | None:
+        """Сохраненная книга Excel.
+
+        :arg schedule_id: Идентификатор расписания
+        :arg template_digest: Хэш шаблона
+        :return: Книга XLSX (None - еще не строилась)
+        """
+        with self.connect() as connection:
+            row = connection.execute(
+                'SELECT content FROM workbooks'
+                ' WHERE schedule_id = ? AND template_digest = ?',
+                (schedule_id, template_digest),
+            ).fetchone()
+        return None if row is None else row[0]
+
+
+# Хранилище процесса
+repository = Repository(constants.REPOSITORY_PATH)
@@ -0,0 +1,92 @@
+"""Упакованное время урока: день недели, смена и номер урока в одном int.
+
+Ключ-число хэшируется и сравнивается без вызова методов Python,
+а порядок чисел совпадает с порядком уроков (день, смена, номер).
+"""
+
+from typing import Final, Tuple
+
+# Время урока
+type Slot = int
+
+# Разряды под номер урока и смену
+_NPP_BITS: Final[int] = 6
+_PART_BITS: Final[int] = 2
+_NPP_MASK: Final[int] = (1 << _NPP_BITS) - 1
+_PART_MASK: Final[int] = (1 << _PART_BITS) - 1
+_DAY_SHIFT: Final[int] = _NPP_BITS + _PART_BITS
+# Наибольший номер урока, который помещается в ключ
+MAX_NPP: Final[int] = _NPP_MASK
+# Наибольший номер смены и дня недели
+MAX_PART: Final[int] = _PART_MASK
+MAX_DAY: Final[int] = 6
+
+
+def make_slot(day: int, part: int, npp: int) -> Slot:
+    """Упаковка времени урока.
+
+    :arg day: День недели (0 - понедельник)
+    :arg part: Смена (0..3)
+    :arg npp: Номер урока (0..MAX_NPP)
+    :return: Время урока
+    """
+    # Значение вне разрядов попало бы во время другой смены или дня
+    if not (0 <= day <= MAX_DAY and 0 <= part <= MAX_PART and 0 <= npp <= MAX_NPP):
+        raise Exception(
+            f'Время урока вне диапазона: день {day}, смена {part}, урок {npp}'
+        )
+    return (day << _DAY_SHIFT) | (part << _NPP_BITS) | npp
+
+
+def day_slots(day: int) -> range:
+    """Все значения времени уроков одного дня (для проверки slot in ...).
+
+    :arg day: День недели
+    :return: Диапазон значений
+    """
+    return range(day << _DAY_SHIFT, (day + 1) << _DAY_SHIFT)
+
+
+def slot_day(slot: Slot) -> int:
+    """День недели.
+
+    :arg slot: Время урока
+    :return: День недели
+    """
+    return slot >> _DAY_SHIFT
+
+
+def slot_part(slot: Slot) -> int:
+    """Смена.
+
+    :arg slot: Время урока
+    :return: Смена
+    """
+    return (slot >> _NPP_BITS) & _PART_MASK
+
+
+def slot_shift(slot: Slot) -> Slot:
+    """Начало смены урока: время с нулевым номером урока.
+
+    :arg slot: Время урока
+    :return: Время начала смены
+    """
+    return slot & ~_NPP_MASK
+
+
+def slot_npp(slot: Slot) -> int:
+    """Номер урока.
+
+    :arg slot: Время урока
+    :return: Номер урока
+    """
+    return slot & _NPP_MASK
+
+
+def unpack_slot(slot: Slot) -> Tuple[int, int, int]:
+    """Распаковка времени урока.
+
+    :arg slot: Время урока
+    :return: День недели, смена, номер урока
+    """
+    return slot >> _DAY_SHIFT, (slot >> _NPP_BITS) & _PART_MASK, slot & _NPP_MASK
@@ -0,0 +1,46 @@
+"""Замер времени этапов обработки."""
+
+import time
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, Iterator
+
+
+@dataclass
+class PhaseTimer:
+    """Время этапов обработки (время повторных этапов суммируется)."""
+
+    phases: Dict[str, float] = field(default_factory=dict)  # Этап -> время, с
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Замер времени этапа.
+
+        :arg name: Этап
+        :return: Контекст замера
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name: str, seconds: float):
+        """Добавление времени этапа.
+
+        :arg name: Этап
+        :arg seconds: Время, с
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+def measure(timer: PhaseTimer | None, name: str) -> AbstractContextManager[None]:
+    """Замер этапа, если время замеряется.
+
+    :arg timer: Замер (None - время не замеряется)
+    :arg name: Этап
+    :return: Контекст замера
+    """
+    if timer is None:
+        return nullcontext()
+    return timer.phase(name)
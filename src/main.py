@@ -1,8 +1,35 @@
 """Запуск FastAPI-приложения."""
 
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
 
+from src.api.compression import CompressionMiddleware, DecompressRequestMiddleware
+from src.api.metrics import MetricsMiddleware
 from src.api.router import api_router
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:  # noqa: ARG001
+    """Запуск пула процессов генератора вместе с сервером.
+
+    :arg app: Приложение
+    """
+    from src.processors.generator.pool import generator_pool
+
+    await run_in_threadpool(generator_pool.start)
+    try:
+        yield
+    finally:
+        await run_in_threadpool(generator_pool.shutdown)
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(api_router)
+# Сжатие ответов по Accept-Encoding и распаковка сжатых запросов
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(DecompressRequestMiddleware)
+# Метрики снаружи: учитываются размеры сжатых тел и полное время
+app.add_middleware(MetricsMiddleware)
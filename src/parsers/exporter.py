@@ -0,0 +1,163 @@
+"""Плоские форматы выгрузки расписания."""
+
+import csv
+import json
+from enum import StrEnum
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Dict, Final, Iterable, List, Tuple
+
+# Урок: (учитель, группа, предмет, день недели, смена, номер урока)
+type LessonRow = Tuple[str, str, str, str, str, int]
+
+# Колонки плоской таблицы
+LESSON_COLUMNS: Final[Tuple[str, ...]] = (
+    'Преподаватель',
+    'Группа',
+    'Предмет',
+    'День',
+    'Смена',
+    'Номер',
+)
+
+
+class ExportFormat(StrEnum):
+    """Формат выгрузки."""
+
+    XML = 'xml'  # Вложенный XML (Расписание)
+    JSONL = 'jsonl'  # Строка JSON на урок
+    CSV = 'csv'  # Таблица CSV
+    COLUMNS = 'columns'  # JSON по колонкам
+    PARQUET = 'parquet'  # Apache Parquet (нужен pyarrow)
+
+
+# Расширения файлов
+EXPORT_EXTENSIONS: Final[Dict[ExportFormat, str]] = {
+    ExportFormat.XML: '.xml',
+    ExportFormat.JSONL: '.jsonl',
+    ExportFormat.CSV: '.csv',
+    ExportFormat.COLUMNS: '.json',
+    ExportFormat.PARQUET: '.parquet',
+}
+
+# MIME-типы
+EXPORT_MIME_TYPES: Final[Dict[ExportFormat, str]] = {
+    ExportFormat.XML: 'application/xml',
+    ExportFormat.JSONL: 'application/x-ndjson',
+    ExportFormat.CSV: 'text/csv',
+    ExportFormat.COLUMNS: 'application/json',
+    ExportFormat.PARQUET: 'application/vnd.apache.parquet',
+}
+
+
+# Форматы, которым нужен необязательный пакет: формат -> пакет
+EXPORT_REQUIREMENTS: Final[Dict[ExportFormat, str]] = {
+    ExportFormat.PARQUET: 'pyarrow',
+}
+
+
+def missing_requirement(export_format: ExportFormat) -> str | None:
+    """Проверка, что пакет для формата установлен.
+
+    :arg export_format: Формат выгрузки
+    :return: Сообщение об ошибке или None, если формат доступен
+    """
+    package = EXPORT_REQUIREMENTS.get(export_format)
+    if package is None or find_spec(package) is not None:
+        return None
+    return f'Для формата {export_format} требуется пакет {package}'
+
+
+def row_to_dict(row: LessonRow) -> Dict[str, str | int]:
+    """Урок в виде словаря.
+
+    :arg row: Урок
+    :return: Колонка -> значение
+    """
+    return dict(zip(LESSON_COLUMNS, row, strict=True))
+
+
+def write_jsonl(rows: Iterable[LessonRow], dst_path: Path):
+    """Выгрузка в JSON Lines.
+
+    :arg rows: Уроки
+    :arg dst_path: Путь к целевому файлу
+    """
+    with Path.open(dst_path, 'w', encoding='utf-8') as file:
+        for row in rows:
+            file.write(json.dumps(row_to_dict(row), ensure_ascii=False))
+            file.write('\n')
+
+
+def write_csv(rows: Iterable[LessonRow], dst_path: Path):
+    """Выгрузка в CSV.
+
+    :arg rows: Уроки
+    :arg dst_path: Путь к целевому файлу
+    """
+    with Path.open(dst_path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(LESSON_COLUMNS)
+        writer.writerows(rows)
+
+
+def rows_to_columns(rows: Iterable[LessonRow]) -> Dict[str, List[object]]:
+    """Преобразование строк в колонки.
+
+    :arg rows: Уроки
+    :return: Колонка -> значения
+    """
+    columns: List[List[object]] = [[] for _ in LESSON_COLUMNS]
+    for row in rows:
+        for column, value in zip(columns, row, strict=True):
+            column.append(value)
+    return dict(zip(LESSON_COLUMNS, columns, strict=True))
+
+
+def write_columns(rows: Iterable[LessonRow], dst_path: Path):
+    """Выгрузка в JSON по колонкам.
+
+    :arg rows: Уроки
+    :arg dst_path: Путь к целевому файлу
+    """
+    with Path.open(dst_path, 'w', encoding='utf-8') as file:
+        json.dump(rows_to_columns(rows), file, ensure_ascii=False)
+
+
+def write_parquet(rows: Iterable[LessonRow], dst_path: Path):
+    """Выгрузка в Parquet.
+
+    :arg rows: Уроки
+    :arg dst_path: Путь к целевому файлу
+    """
+    message = missing_requirement(ExportFormat.PARQUET)
+    if message is not None:
+        raise Exception(message)
+    import pyarrow
+    import pyarrow.parquet
+
+    table = pyarrow.table(rows_to_columns(rows))
+    pyarrow.parquet.write_table(table, dst_path)
+
+
+def export_rows(
+    rows: Iterable[LessonRow],
+    export_format: ExportFormat,
+    dst_path: Path,
+):
+    """Выгрузка уроков в плоском формате.
+
+    :arg rows: Уроки
+    :arg export_format: Формат выгрузки
+    :arg dst_path: Путь к целевому файлу
+    """
+    if export_format == ExportFormat.JSONL:
+        write_jsonl(rows, dst_path)
+    elif export_format == ExportFormat.CSV:
+        write_csv(rows, dst_path)
+    elif export_format == ExportFormat.COLUMNS:
+        write_columns(rows, dst_path)
+    elif export_format == ExportFormat.PARQUET:
+        write_parquet(rows, dst_path)
+    else:
+        raise Exception(f'Формат {export_format} не является плоским')
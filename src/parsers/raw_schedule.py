@@ -0,0 +1,55 @@
+"""Разбор XML-файла расписания без pydantic_xml."""
+
+from io import BytesIO
+from typing import List
+from xml.etree import ElementTree
+
+import src.parsers.tags as tags
+from src.parsers.exporter import LessonRow
+
+
+def parse_schedule_rows_fast(xml: bytes | str) -> List[LessonRow]:
+    """Потоковый разбор расписания в плоскую таблицу уроков.
+
+    Схема не проверяется: нужны только атрибуты уроков и вложенность
+    Преподаватель / день недели / смена.
+
+    :arg xml: Текст файла
+    :return: Уроки в порядке документа
+    """
+    if isinstance(xml, str):
+        xml = xml.encode('utf-8')
+    rows: List[LessonRow] = []
+    teacher_name = ''
+    day = ''
+    part = ''
+    # pydantic_xml разбирает тем же ElementTree, риски не меняются
+    events = ElementTree.iterparse(BytesIO(xml), ('start', 'end'))  # noqa: S314
+    try:
+        for event, elem in events:
+            tag = elem.tag
+            if event == 'start':
+                if tag == tags.TEACHER:
+                    teacher_name = elem.attrib[tags.TEACHER_NAME]
+                elif tag in tags.DAYS:
+                    day = tag
+                elif tag in tags.PARTS:
+                    part = tag
+                continue
+            if tag == tags.LESSON:
+                attrib = elem.attrib
+                rows.append(
+                    (
+                        teacher_name,
+                        attrib[tags.LESSON_GROUP],
+                        attrib[tags.LESSON_SUBJECT],
+                        day,
+                        part,
+                        int(attrib[tags.LESSON_NPP]),
+                    ),
+                )
+            # Разобранный элемент больше не нужен
+            elem.clear()
+    except (ElementTree.ParseError, KeyError, ValueError) as err:
+        raise Exception('Файл расписания имеет неверный формат') from err
+    return rows
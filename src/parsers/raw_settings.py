@@ -0,0 +1,185 @@
+"""Разбор входного XML-файла без pydantic_xml."""
+
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import TYPE_CHECKING, List, Literal, Optional
+from xml.etree import ElementTree
+
+if TYPE_CHECKING:
+    from src.parsers.settings import Settings
+
+# Да/Нет
+type YesNo = Literal['Да', 'Нет']
+
+
+def yesno_to_bool(yesno: (YesNo | None)) -> bool:
+    """Преобразование в логический тип.
+
+    :arg yesno: Значение Да/Нет
+    :return bool: True/False
+    """
+    return yesno == 'Да'
+
+
+def bool_to_yesno(logical_value: bool) -> YesNo:
+    """Преобразование в Да/Нет.
+
+    :arg logical_value: True/False
+    :return YesNo: Значение Да/Нет
+    """
+    return 'Да' if logical_value else 'Нет'
+
+
+def parse_yesno(value: str) -> YesNo:
+    """Проверка значения Да/Нет из файла.
+
+    :arg value: Значение атрибута
+    :return YesNo: Значение Да/Нет
+    """
+    if value == 'Да':
+        return 'Да'
+    if value == 'Нет':
+        return 'Нет'
+    raise ValueError(value)
+
+
+@dataclass(slots=True)
+class RawSubject:
+    """Предмет без проверки схемы (поля как у Subject)."""
+
+    name: str
+    no_split: YesNo
+    one_group: YesNo
+
+
+@dataclass(slots=True)
+class RawCurriculum:
+    """Учебный план без проверки схемы (поля как у Curriculum)."""
+
+    name: str
+    hours: int
+    days_of_week: str
+
+
+@dataclass(slots=True)
+class RawCombination:
+    """Расстановка без проверки схемы (поля как у Combination)."""
+
+    day_plan: str
+
+
+@dataclass(slots=True)
+class RawGrade:
+    """Класс без проверки схемы (поля как у Grade)."""
+
+    name: str
+    curriculum: List[RawCurriculum] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class RawOccupation:
+    """Связь Учитель/Предмет без проверки схемы (поля как у Occupation)."""
+
+    name: str
+    any_groups: Optional[YesNo]
+    group_list: Optional[str]
+
+
+@dataclass(slots=True)
+class RawTeacher:
+    """Учитель без проверки схемы (поля как у Teacher)."""
+
+    name: str
+    morning: Optional[str] = None
+    afternoon: Optional[str] = None
+    occupations: List[RawOccupation] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class RawSettings:
+    """Настройки без проверки схемы (поля как у Settings)."""
+
+    subjects: List[RawSubject] = field(default_factory=list)
+    combinations: List[RawCombination] = field(default_factory=list)
+    grades: List[RawGrade] = field(default_factory=list)
+    teachers: List[RawTeacher] = field(default_factory=list)
+
+
+# Настройки, пригодные для заполнения данных генератора
+type AnySettings = Settings | RawSettings
+
+
+def parse_settings_fast(xml: str | bytes) -> RawSettings:
+    """Потоковый разбор без проверки схемы pydantic_xml.
+
+    Проверяется только то, без чего не обойдется генератор: корневой
+    узел, наличие обязательных атрибутов, значения Да/Нет и числовое
+    количество часов.
+
+    :arg xml: Текст файла
+    :return RawSettings: Распознанные данные
+    """
+    if isinstance(xml, str):
+        xml = xml.encode('utf-8')
+    result = RawSettings()
+    path: List[str] = []
+    grade = RawGrade(name='')
+    teacher = RawTeacher(name='')
+    # pydantic_xml разбирает тем же ElementTree, риски не меняются
+    events = ElementTree.iterparse(BytesIO(xml), ('start', 'end'))  # noqa: S314
+    try:
+        for event, elem in events:
+            tag = elem.tag
+            if event == 'start':
+                if not path and tag != 'Настройки':
+                    raise ValueError(tag)
+                path.append(tag)
+                if tag == 'Класс':
+                    grade = RawGrade(name=elem.attrib['Номер'])
+                    result.grades.append(grade)
+                elif tag == 'Преподаватель':
+                    teacher = RawTeacher(name=elem.attrib['ФИО'])
+                    result.teachers.append(teacher)
+                continue
+            path.pop()
+            parent = path[-1] if path else ''
+            if tag == 'Предмет':
+                attrib = elem.attrib
+                if parent == 'Предметы':
+                    result.subjects.append(
+                        RawSubject(
+                            name=attrib['Название'],
+                            no_split=parse_yesno(attrib['НеРазделятьПоДням']),
+                            one_group=parse_yesno(attrib['ОднаГруппаЗаСмену']),
+                        ),
+                    )
+                elif parent == 'Класс':
+                    grade.curriculum.append(
+                        RawCurriculum(
+                            name=attrib['Название'],
+                            hours=int(attrib['ЧасовВНеделю']),
+                            days_of_week=attrib['ДниНедели'],
+                        ),
+                    )
+                elif parent == 'Преподаватель':
+                    any_groups = attrib.get('ЛюбыеГруппы')
+                    teacher.occupations.append(
+                        RawOccupation(
+                            name=attrib['Название'],
+                            any_groups=(
+                                None if any_groups is None else parse_yesno(any_groups)
+                            ),
+                            group_list=elem.text,
+                        ),
+                    )
+            elif tag == 'Расстановка':
+                result.combinations.append(RawCombination(day_plan=elem.text or ''))
+            elif tag == 'ГруппыУтро':
+                teacher.morning = elem.text
+            elif tag == 'ГруппыВечер':
+                teacher.afternoon = elem.text
+            # Разобранный элемент больше не нужен
+            elem.clear()
+    except (ElementTree.ParseError, KeyError, ValueError) as err:
+        raise Exception('Исходный файл имеет неверный формат') from err
+    return result
@@ -1,8 +1,21 @@
 """Структура выходного xml-файла."""
 
-from typing import List, Optional
+from enum import IntEnum
+from typing import Dict, Iterator, List, Optional
 
 from pydantic_xml import BaseXmlModel, attr, element
+from pydantic_xml.typedefs import EntityLocation
+
+import src.parsers.tags as tags
+from src.parsers.exporter import LessonRow
+
+
+class NodeType(IntEnum):
+    """Field data location."""
+
+    ELEMENT = EntityLocation.ELEMENT
+    ATTRIBUTE = EntityLocation.ATTRIBUTE
+    WRAPPED = EntityLocation.WRAPPED
 
 
 class ScheduleBaseModel(BaseXmlModel):
@@ -11,46 +24,90 @@ class ScheduleBaseModel(BaseXmlModel):
     pass
 
 
-class Lesson(ScheduleBaseModel, tag='Урок'):
+class Lesson(ScheduleBaseModel, tag=tags.LESSON):
     """Урок."""
 
-    npp: int = attr('Номер')
-    subject: str = attr('Предмет')
-    group: str = attr('Группа')
+    npp: int = attr(tags.LESSON_NPP)
+    subject: str = attr(tags.LESSON_SUBJECT)
+    group: str = attr(tags.LESSON_GROUP)
 
 
 class PartOfDay(ScheduleBaseModel):
     """Уроки в одной смене."""
 
-    lessons: List[Lesson] = element(tag='Урок')
+    lessons: List[Lesson] = element(tag=tags.LESSON)
 
 
 class DayOfWeek(ScheduleBaseModel):
     """День с двумя сменами."""
 
-    morning: Optional[PartOfDay] = element(tag='Утро', default=None)
-    afternoon: Optional[PartOfDay] = element(tag='Вечер', default=None)
+    morning: Optional[PartOfDay] = element(tag=tags.MORNING, default=None)
+    afternoon: Optional[PartOfDay] = element(tag=tags.AFTERNOON, default=None)
 
 
-class Teacher(ScheduleBaseModel, tag='Преподаватель'):
+class Teacher(ScheduleBaseModel, tag=tags.TEACHER):
     """Расписание учителя."""
 
-    name: str = attr('ФИО')
-    monday: DayOfWeek = element(tag='Понедельник', default=None)
-    tuesday: DayOfWeek = element(tag='Вторник', default=None)
-    wednesday: DayOfWeek = element(tag='Среда', default=None)
-    thursday: DayOfWeek = element(tag='Четверг', default=None)
-    friday: DayOfWeek = element(tag='Пятница', default=None)
-    saturday: DayOfWeek = element(tag='Суббота', default=None)
-    sunday: DayOfWeek = element(tag='Воскресенье', default=None)
+    name: str = attr(tags.TEACHER_NAME)
+    monday: DayOfWeek = element(tag=tags.MONDAY, default=None)
+    tuesday: DayOfWeek = element(tag=tags.TUESDAY, default=None)
+    wednesday: DayOfWeek = element(tag=tags.WEDNESDAY, default=None)
+    thursday: DayOfWeek = element(tag=tags.THURSDAY, default=None)
+    friday: DayOfWeek = element(tag=tags.FRIDAY, default=None)
+    saturday: DayOfWeek = element(tag=tags.SATURDAY, default=None)
+    sunday: DayOfWeek = element(tag=tags.SUNDAY, default=None)
 
 
-class Schedule(ScheduleBaseModel, tag='Расписание', skip_empty=True):
+class Schedule(ScheduleBaseModel, tag=tags.SCHEDULE, skip_empty=True):
     """Расписание учителей."""
 
-    teachers: List[Teacher] = element(tag='Преподаватель')
+    teachers: List[Teacher] = element(tag=tags.TEACHER)
+
+
+# Поля дней недели расписания учителя -> тег
+DAY_FIELDS: Dict[str, str] = {
+    'monday': tags.MONDAY,
+    'tuesday': tags.TUESDAY,
+    'wednesday': tags.WEDNESDAY,
+    'thursday': tags.THURSDAY,
+    'friday': tags.FRIDAY,
+    'saturday': tags.SATURDAY,
+    'sunday': tags.SUNDAY,
+}
+
+# Поля смен -> тег
+PART_FIELDS: Dict[str, str] = {
+    'morning': tags.MORNING,
+    'afternoon': tags.AFTERNOON,
+}
 
 
 def parse_schedule(xml: str) -> Schedule:
     """Разбор XML-файла."""
     return Schedule.from_xml(xml)
+
+
+def schedule_rows(src_data: Schedule) -> Iterator[LessonRow]:
+    """Уроки расписания в виде плоской таблицы.
+
+    :arg src_data: Расписание
+    :return: Уроки в порядке документа
+    """
+    for teacher in src_data.teachers:
+        for day_field, day_tag in DAY_FIELDS.items():
+            day_data = getattr(teacher, day_field)
+            if day_data is None:
+                continue
+            for part_field, part_tag in PART_FIELDS.items():
+                part_data = getattr(day_data, part_field)
+                if part_data is None:
+                    continue
+                for lesson in part_data.lessons:
+                    yield (
+                        teacher.name,
+                        lesson.group,
+                        lesson.subject,
+                        day_tag,
+                        part_tag,
+                        lesson.npp,
+                    )
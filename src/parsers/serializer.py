@@ -1,13 +1,155 @@
 """Сериализация XML в нужном виде."""
 
+from typing import TYPE_CHECKING, BinaryIO, Iterable, List, Tuple
 from xml.etree import ElementTree
 
-from pydantic_xml import BaseXmlModel
+import src.parsers.tags as tags
+from src.parsers.exporter import LessonRow
 
+if TYPE_CHECKING:
+    from pydantic_xml import BaseXmlModel
 
-def seralizer(model: BaseXmlModel) -> bytes:
+
+def seralizer(model: 'BaseXmlModel') -> bytes:
     """Сериализация XML в нужном виде."""
     # Если использовать to_xml, то вместо кириллицы будут коды Unicode
     dst_tree = model.to_xml_tree(skip_empty=True, exclude_none=True, exclude_unset=True)
 
     return ElementTree.tostring(dst_tree, encoding='utf-8')
+
+
+# Экранирование значений атрибутов (как в ElementTree)
+_ATTRIB_ESCAPES = str.maketrans(
+    {
+        '&': '&amp;',
+        '<': '&lt;',
+        '>': '&gt;',
+        '"': '&quot;',
+        '\r': '&#13;',
+        '\n': '&#10;',
+        '\t': '&#09;',
+    },
+)
+
+# Атрибуты элемента: (имя, значение)
+type XmlAttributes = Iterable[Tuple[str, str]]
+
+
+class XmlStreamWriter:
+    """Потоковая запись XML без построения дерева.
+
+    Разметка накапливается в буфере и сбрасывается в поток частями,
+    поэтому писать можно как в файл, так и в сокет.
+    """
+
+    def __init__(self, stream: BinaryIO, buffer_size: int = 65536):
+        """Инициализация.
+
+        :arg stream: Двоичный поток для записи
+        :arg buffer_size: Размер буфера в символах
+        """
+        self.__stream = stream
+        self.__buffer_size = buffer_size
+        self.__buffer: List[str] = []
+        self.__buffered = 0
+
+    def start(self, tag: str, attrs: XmlAttributes = ()):
+        """Открывающий тег.
+
+        :arg tag: Тег
+        :arg attrs: Атрибуты
+        """
+        self.__write(f'<{tag}{self.__attributes(attrs)}>')
+
+    def end(self, tag: str):
+        """Закрывающий тег.
+
+        :arg tag: Тег
+        """
+        self.__write(f'</{tag}>')
+
+    def empty(self, tag: str, attrs: XmlAttributes = ()):
+        """Пустой элемент.
+
+        :arg tag: Тег
+        :arg attrs: Атрибуты
+        """
+        self.__write(f'<{tag}{self.__attributes(attrs)} />')
+
+    def flush(self):
+        """Сброс буфера в поток."""
+        if self.__buffer:
+            self.__stream.write(''.join(self.__buffer).encode('utf-8'))
+            self.__buffer.clear()
+            self.__buffered = 0
+
+    @staticmethod
+    def __attributes(attrs: XmlAttributes) -> str:
+        """Текст атрибутов.
+
+        :arg attrs: Атрибуты
+        :return: Атрибуты в виде текста
+        """
+        return ''.join(
+            f' {name}="{value.translate(_ATTRIB_ESCAPES)}"' for name, value in attrs
+        )
+
+    def __write(self, text: str):
+        """Запись в буфер.
+
+        :arg text: Разметка
+        """
+        self.__buffer.append(text)
+        self.__buffered += len(text)
+        if self.__buffered >= self.__buffer_size:
+            self.flush()
+
+
+def write_rows_xml(rows: Iterable[LessonRow], stream: BinaryIO):
+    """Потоковая запись плоской таблицы уроков в XML расписания.
+
+    Уроки должны идти по учителю, дню недели, смене и номеру урока.
+
+    :arg rows: Уроки
+    :arg stream: Двоичный поток (файл, сокет)
+    """
+    writer = XmlStreamWriter(stream)
+    writer.start(tags.SCHEDULE)
+    teacher = day_tag = part_tag = ''
+    for teacher_name, group, subject, new_day_tag, new_part_tag, npp in rows:
+        if teacher_name != teacher:
+            if part_tag:
+                writer.end(part_tag)
+                writer.end(day_tag)
+            if teacher:
+                writer.end(tags.TEACHER)
+            teacher = teacher_name
+            day_tag = part_tag = ''
+            writer.start(tags.TEACHER, ((tags.TEACHER_NAME, teacher),))
+        if new_day_tag != day_tag:
+            if part_tag:
+                writer.end(part_tag)
+                writer.end(day_tag)
+            day_tag = new_day_tag
+            part_tag = ''
+            writer.start(day_tag)
+        if new_part_tag != part_tag:
+            if part_tag:
+                writer.end(part_tag)
+            part_tag = new_part_tag
+            writer.start(part_tag)
+        writer.empty(
+            tags.LESSON,
+            (
+                (tags.LESSON_NPP, str(npp)),
+                (tags.LESSON_SUBJECT, subject),
+                (tags.LESSON_GROUP, group),
+            ),
+        )
+    if part_tag:
+        writer.end(part_tag)
+        writer.end(day_tag)
+    if teacher:
+        writer.end(tags.TEACHER)
+    writer.end(tags.SCHEDULE)
+    writer.flush()
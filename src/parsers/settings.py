@@ -1,29 +1,18 @@
 """Структура входного XML-файла."""
 
-from typing import List, Literal, Optional
+from typing import List, Optional
 
 from pydantic_xml import BaseXmlModel, attr, element, wrapped
 
-# Да/Нет
-type YesNo = Literal['Да', 'Нет']
-
-
-def yesno_to_bool(yesno: (YesNo | None)) -> bool:
-    """Преобразование в логический тип.
-
-    :arg yesno: Значение Да/Нет
-    :return bool: True/False
-    """
-    return yesno == 'Да'
-
-
-def bool_to_yesno(logical_value: bool) -> YesNo:
-    """Преобразование в Да/Нет.
-
-    :arg logical_value: True/False
-    :return YesNo: Значение Да/Нет
-    """
-    return 'Да' if logical_value else 'Нет'
+# Без pydantic_xml: потоковый разбор и общие преобразования
+from src.parsers.raw_settings import (  # noqa: F401
+    AnySettings,
+    RawSettings,
+    YesNo,
+    bool_to_yesno,
+    parse_settings_fast,
+    yesno_to_bool,
+)
 
 
 class Subject(BaseXmlModel, tag='Предмет'):
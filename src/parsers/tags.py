@@ -0,0 +1,32 @@
+"""Теги и атрибуты выходного XML-файла."""
+
+from typing import Final, Tuple
+
+SCHEDULE: Final[str] = 'Расписание'
+TEACHER: Final[str] = 'Преподаватель'
+TEACHER_NAME: Final[str] = 'ФИО'
+MONDAY: Final[str] = 'Понедельник'
+TUESDAY: Final[str] = 'Вторник'
+WEDNESDAY: Final[str] = 'Среда'
+THURSDAY: Final[str] = 'Четверг'
+FRIDAY: Final[str] = 'Пятница'
+SATURDAY: Final[str] = 'Суббота'
+SUNDAY: Final[str] = 'Воскресенье'
+MORNING: Final[str] = 'Утро'
+AFTERNOON: Final[str] = 'Вечер'
+LESSON: Final[str] = 'Урок'
+LESSON_NPP: Final[str] = 'Номер'
+LESSON_SUBJECT: Final[str] = 'Предмет'
+LESSON_GROUP: Final[str] = 'Группа'
+
+# Дни недели и смены в порядке вывода
+DAYS: Final[Tuple[str, ...]] = (
+    MONDAY,
+    TUESDAY,
+    WEDNESDAY,
+    THURSDAY,
+    FRIDAY,
+    SATURDAY,
+    SUNDAY,
+)
+PARTS: Final[Tuple[str, ...]] = (MORNING, AFTERNOON)
@@ -2,55 +2,91 @@
 
 import json
 from calendar import Day, day_name
-from dataclasses import dataclass
 from pathlib import Path
-from typing import Set
+from typing import Final, List, Set, Tuple
 
 import src.parsers.schedule as schedule
+from src.common.repository import Repository, repository
+from src.common.timing import PhaseTimer, measure
 
+# Занятое время урока: группа, день, смена, номер урока
+# (номер урока в файле не ограничен, поэтому не упаковывается в slots)
+type LessonTime = Tuple[str, int, int, int]
 
-@dataclass(frozen=True)
-class LessonTime:
-    """Занятое время урока."""
-
-    day_of_week: Day
-    group: str
-    npp: int
+# Смены: поле модели и название в сообщении
+PARTS: Final[Tuple[Tuple[str, str], ...]] = (
+    ('morning', 'утро'),
+    ('afternoon', 'вечер'),
+)
 
 
 class Checker:
     """Алгоритм проверки."""
 
-    def __init__(self):
+    def __init__(self) -> None:
         """Инициализация."""
         self.src_data = schedule.Schedule(teachers=[])
-        self.errors = []
+        self.errors: List[str] = []
 
-    def process(self, src_path: Path) -> str:
+    def process(self, src_path: Path, timer: PhaseTimer | None = None) -> str:
         """Точка входа в алгоритм проверки.
 
         :arg src_path: Путь к проверяемому файлу
+        :arg timer: Замер времени этапов (необязательно)
         """
-        # Читаем XML с расписанием
-        with Path.open(src_path, 'r', encoding='utf-8') as file:
-            src_xml = file.read()
-        # Парсим через pydantic_xml
+        with measure(timer, 'parse'):
+            # Читаем XML с расписанием
+            with Path.open(src_path, 'r', encoding='utf-8') as file:
+                src_xml = file.read()
+            # Парсим через pydantic_xml
 
-        self.src_data = schedule.parse_schedule(src_xml)
+            self.src_data = schedule.parse_schedule(src_xml)
         if not self.src_data:
             Exception('Исходный файл имеет неверный формат')
 
-        self.check_schedule()
+        with measure(timer, 'compute'):
+            self.check_schedule()
+
+        with measure(timer, 'render'):
+            if self.errors:
+                return json.dumps({'Ошибки': self.errors})
+            else:
+                return json.dumps({'Статус': 'ОК'})
+
+    def process_stored(
+        self,
+        schedule_id: int,
+        timer: PhaseTimer | None = None,
+        repo: Repository = repository,
+    ) -> str:
+        """Проверка сохраненного расписания по индексам хранилища.
+
+        XML не разбирается: пересечения ищет запрос к таблице уроков.
+
+        :arg schedule_id: Идентификатор расписания
+        :arg timer: Замер времени этапов (необязательно)
+        :arg repo: Хранилище
+        """
+        with measure(timer, 'compute'):
+            if not repo.schedule_exists(schedule_id):
+                raise Exception(f'Расписание {schedule_id} не найдено')
+            for group, day, part, npp in repo.group_conflicts(schedule_id):
+                part_name = PARTS[part][1]
+                self.errors.append(
+                    f'Пересечение: группа {group},'
+                    f'{day_name[day]}, {part_name}, урок {npp}'
+                )
 
-        if self.errors:
-            return json.dumps({'Ошибки': self.errors})
-        else:
-            return json.dumps({'Статус': 'ОК'})
+        with measure(timer, 'render'):
+            if self.errors:
+                return json.dumps({'Ошибки': self.errors})
+            else:
+                return json.dumps({'Статус': 'ОК'})
 
-    def check_schedule(self):
+    def check_schedule(self) -> None:
         """Проверка расписания на пересечения."""
-        morning: Set[LessonTime] = set()
-        afternoon: Set[LessonTime] = set()
+        # Занятое время групп: (группа, время урока)
+        occupied: Set[LessonTime] = set()
         for teacher in self.src_data.teachers:
             for day_code in Day:
                 attr_name = day_code.name.lower()
@@ -58,28 +94,15 @@ class Checker:
                     continue
                 day_data = getattr(teacher, attr_name)
 
-                if hasattr(day_data, 'morning') and day_data.morning:
-                    for lesson in day_data.morning.lessons:
-                        if (
-                            LessonTime(
-                                day_of_week=day_code, group=lesson.group, npp=lesson.npp
-                            )
-                            in morning
-                        ):
-                            self.errors.append(
-                                f'Пересечение: группа {lesson.group},'
-                                f'{day_name[day_code]}, утро, урок {lesson.npp}'
-                            )
-                if hasattr(day_data, 'afternoon') and day_data.afternoon:
-                    for lesson in day_data.afternoon.lessons:
-                        if (
-                            LessonTime(
-                                day_of_week=day_code, group=lesson.group, npp=lesson.npp
-                            )
-                            in afternoon
-                        ):
+                for part, (part_attr, part_name) in enumerate(PARTS):
+                    part_data = getattr(day_data, part_attr, None)
+                    if not part_data:
+                        continue
+                    for lesson in part_data.lessons:
+                        lesson_time = (lesson.group, day_code, part, lesson.npp)
+                        if lesson_time in occupied:
                             self.errors.append(
                                 f'Пересечение: группа {lesson.group},'
-                                f'{day_name[day_code]}, вечер, '
-                                f'урок {lesson.npp}'
+                                f'{day_name[day_code]}, {part_name}, урок {lesson.npp}'
                             )
+                        occupied.add(lesson_time)
@@ -0,0 +1,143 @@
+"""Сравнение двух файлов расписания."""
+
+import json
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Tuple
+
+import src.parsers.schedule as schedule
+from src.common.timing import PhaseTimer, measure
+from src.parsers.exporter import LessonRow, row_to_dict
+
+# Урок без учета времени: (учитель, группа, предмет)
+type LessonIdentity = Tuple[str, str, str]
+
+# Разделы отчета
+ADDED = 'Добавлено'
+REMOVED = 'Удалено'
+MOVED = 'Перенесено'
+
+
+def count_rows(rows: Iterable[LessonRow]) -> Counter[LessonRow]:
+    """Уроки расписания с количеством повторов.
+
+    У учителя в одно время может быть несколько групп, поэтому
+    уроки сравниваются целиком, а не по времени урока учителя.
+
+    :arg rows: Уроки
+    :return: Урок -> количество (в порядке первого появления)
+    """
+    return Counter(rows)
+
+
+@dataclass
+class ScheduleDiff:
+    """Изменения расписания."""
+
+    added: List[LessonRow] = field(default_factory=list)  # Новые уроки
+    removed: List[LessonRow] = field(default_factory=list)  # Отмененные уроки
+    # Уроки, перенесенные на другое время: (было, стало)
+    moved: List[Tuple[LessonRow, LessonRow]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        """Есть изменения."""
+        return bool(self.added or self.removed or self.moved)
+
+    def to_dict(self) -> Dict[str, Dict[str, Dict[str, List[object]]]]:
+        """Изменения по преподавателям и по группам.
+
+        :return: Раздел -> преподаватель (группа) -> вид изменения -> уроки
+        """
+        by_teacher: Dict[str, Dict[str, List[object]]] = {}
+        by_group: Dict[str, Dict[str, List[object]]] = {}
+
+        def add(kind: str, row: LessonRow, item: object) -> None:
+            for section, key in ((by_teacher, row[0]), (by_group, row[1])):
+                changes = section.setdefault(key, {ADDED: [], REMOVED: [], MOVED: []})
+                changes[kind].append(item)
+
+        for row in self.added:
+            add(ADDED, row, row_to_dict(row))
+        for row in self.removed:
+            add(REMOVED, row, row_to_dict(row))
+        for old_row, new_row in self.moved:
+            add(
+                MOVED,
+                new_row,
+                {'Было': row_to_dict(old_row), 'Стало': row_to_dict(new_row)},
+            )
+        return {'Преподаватели': by_teacher, 'Группы': by_group}
+
+
+def diff_rows(
+    old_rows: Iterable[LessonRow], new_rows: Iterable[LessonRow]
+) -> ScheduleDiff:
+    """Сравнение уроков двух расписаний за линейное время.
+
+    Расписания сравниваются как наборы уроков (с повторами), порядок
+    уроков в файле не важен. Урок, который исчез в одном времени
+    и появился в другом у того же учителя с той же группой
+    и предметом, считается перенесенным. Смена учителя у урока -
+    удаление и добавление.
+
+    :arg old_rows: Уроки прежнего расписания (можно передать поток)
+    :arg new_rows: Уроки нового расписания (можно передать поток)
+    :return: Изменения
+    """
+    old_counts = count_rows(old_rows)
+    new_counts = count_rows(new_rows)
+
+    # Исчезнувшие уроки - кандидаты на перенос
+    removed: Dict[LessonIdentity, Deque[LessonRow]] = {}
+    for row, count in (old_counts - new_counts).items():
+        removed.setdefault((row[0], row[1], row[2]), deque()).extend([row] * count)
+
+    result = ScheduleDiff()
+    for row, count in (new_counts - old_counts).items():
+        for _ in range(count):
+            candidates = removed.get((row[0], row[1], row[2]))
+            if candidates:
+                result.moved.append((candidates.popleft(), row))
+            else:
+                result.added.append(row)
+    for candidates in removed.values():
+        result.removed.extend(candidates)
+    return result
+
+
+def diff_schedules(old: schedule.Schedule, new: schedule.Schedule) -> ScheduleDiff:
+    """Сравнение двух расписаний.
+
+    :arg old: Прежнее расписание
+    :arg new: Новое расписание
+    :return: Изменения
+    """
+    return diff_rows(schedule.schedule_rows(old), schedule.schedule_rows(new))
+
+
+class Differ:
+    """Сравнение файлов расписания."""
+
+    def process(
+        self,
+        old_path: Path,
+        new_path: Path,
+        timer: PhaseTimer | None = None,
+    ) -> str:
+        """Точка входа в алгоритм сравнения.
+
+        :arg old_path: Путь к прежнему расписанию
+        :arg new_path: Путь к новому расписанию
+        :arg timer: Замер времени этапов (необязательно)
+        :return: Изменения в формате JSON
+        """
+        with measure(timer, 'parse'):
+            old = schedule.parse_schedule(old_path.read_text(encoding='utf-8'))
+            new = schedule.parse_schedule(new_path.read_text(encoding='utf-8'))
+
+        with measure(timer, 'compute'):
+            changes = diff_schedules(old, new)
+
+        with measure(timer, 'render'):
+            return json.dumps(changes.to_dict())
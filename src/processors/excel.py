@@ -1,121 +1,357 @@
 """Алгоритм преобразования выходного файла в Excel."""
 
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+from io import BytesIO
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Tuple, cast
 
-from openpyxl import load_workbook
-from openpyxl.workbook.defined_name import DefinedName
+from openpyxl import Workbook, load_workbook
+from openpyxl.utils.cell import range_boundaries
+from openpyxl.workbook.defined_name import DefinedName, DefinedNameDict
 from openpyxl.worksheet.worksheet import Worksheet
+from pydantic_xml.fields import XmlEntityInfo
 
 import src.parsers.schedule as schedule
-from src.parsers import NodeType
+from src.common.constants import DEFAULT_TEMPLATE_PATH, TEMPLATE_CACHE_SIZE
+from src.common.repository import Repository, repository
+from src.common.timing import PhaseTimer, measure
+from src.parsers.serializer import write_rows_xml
+
+# Ячейка листа (строка, столбец)
+type CellRef = Tuple[int, int]
+
+# Позиция урока: (поле дня недели, поле смены, номер урока, столбец)
+type LessonSlot = Tuple[str, str, int, int]
+
+
+def xml_fields(model: type[schedule.ScheduleBaseModel]) -> Dict[str, XmlEntityInfo]:
+    """Поля модели pydantic_xml с путями XML.
+
+    :arg model: Модель расписания
+    :return: Поля модели
+    """
+    return cast(Dict[str, XmlEntityInfo], model.model_fields)
+
+
+# Столбцы диапазона урока
+GROUP_COLUMN = 1
+SUBJECT_COLUMN = 2
+
+
+class ExcelLayout:
+    """Скомпилированная разметка шаблона.
+
+    Именованные диапазоны шаблона разрешаются один раз, после чего лист
+    каждого учителя заполняется прямой записью в ячейки.
+    """
+
+    def __init__(self, defined_names: DefinedNameDict):
+        """Компиляция разметки.
+
+        :arg defined_names: Именованные диапазоны книги-шаблона
+        """
+        # Атрибут учителя -> ячейки
+        self.attributes: Dict[str, List[CellRef]] = {}
+        # Позиция урока -> ячейки
+        self.lessons: Dict[LessonSlot, List[CellRef]] = {}
+        # Поля дней недели, для которых в шаблоне есть уроки
+        self.day_fields: List[str] = []
+        # Поля смен
+        self.part_fields: List[str] = list(schedule.DayOfWeek.model_fields)
+        # Имена для копирования на лист учителя
+        self.names: List[Tuple[str, str]] = [
+            (gn, gn_data.attr_text) for gn, gn_data in defined_names.items()
+        ]
+
+        teacher_fields = xml_fields(schedule.Teacher)
+        day_fields = xml_fields(schedule.DayOfWeek)
+        lesson_path = xml_fields(schedule.PartOfDay)['lessons'].path or ''
+        for field_name, field_info in teacher_fields.items():
+            field_path = field_info.path or ''
+            if field_info.location == schedule.NodeType.ATTRIBUTE:
+                if field_path not in defined_names:
+                    continue
+                # Атрибут пишется в левую верхнюю ячейку диапазона
+                self.attributes[field_name] = [
+                    (min_row, min_col)
+                    for min_col, min_row, _, _ in self.__boundaries(
+                        defined_names[field_path],
+                    )
+                ]
+                continue
+            for part_name, part_info in day_fields.items():
+                name = field_path + (part_info.path or '') + lesson_path
+                if name not in defined_names:
+                    continue
+                if field_name not in self.day_fields:
+                    self.day_fields.append(field_name)
+                for boundaries in self.__boundaries(defined_names[name]):
+                    min_col, min_row, max_col, max_row = boundaries
+                    for row in range(min_row, max_row + 1):
+                        for col in range(min_col, max_col + 1):
+                            self.lessons.setdefault(
+                                (
+                                    field_name,
+                                    part_name,
+                                    row - min_row + 1,
+                                    col - min_col + 1,
+                                ),
+                                [],
+                            ).append((row, col))
+
+    @staticmethod
+    def __boundaries(defined_name: DefinedName) -> List[Tuple[int, int, int, int]]:
+        """Границы диапазонов имени.
+
+        :arg defined_name: Именованный диапазон
+        :return: Список (мин. столбец, мин. строка, макс. столбец, макс. строка)
+        """
+        return [range_boundaries(r) for _, r in defined_name.destinations]
+
+
+class ExcelTemplate:
+    """Разобранный шаблон с разметкой."""
+
+    def __init__(self, content: bytes):
+        """Разбор шаблона.
+
+        :arg content: Содержимое файла XLSX
+        """
+        wb = load_workbook(BytesIO(content))
+        # Хэш содержимого: входит в ETag ответа API
+        self.digest = hashlib.sha256(content).hexdigest()
+        self.layout = ExcelLayout(wb.defined_names)
+        # Снимок книги: восстановление в разы быстрее повторного разбора
+        self.__snapshot = pickle.dumps(wb)
+
+    def workbook(self) -> Workbook:
+        """Свежая копия книги-шаблона.
+
+        :return: Книга, которую можно изменять
+        """
+        # Снимок создан этим же процессом из разобранного шаблона
+        return pickle.loads(self.__snapshot)  # noqa: S301
+
+
+class TemplateCache:
+    """Кэш разобранных шаблонов по хэшу содержимого (LRU)."""
+
+    def __init__(self, maxsize: int = TEMPLATE_CACHE_SIZE):
+        """Инициализация.
+
+        :arg maxsize: Максимальное количество шаблонов в кэше
+        """
+        self.__maxsize = maxsize
+        self.__items: OrderedDict[str, ExcelTemplate] = OrderedDict()
+        self.__default: ExcelTemplate | None = None
+        self.__lock = threading.Lock()
+
+    def get(self, content: bytes) -> ExcelTemplate:
+        """Шаблон по содержимому файла.
+
+        :arg content: Содержимое файла XLSX
+        :return: Разобранный шаблон
+        """
+        key = hashlib.sha256(content).hexdigest()
+        with self.__lock:
+            template = self.__items.get(key)
+            if template is not None:
+                self.__items.move_to_end(key)
+                return template
+        template = ExcelTemplate(content)
+        with self.__lock:
+            self.__items[key] = template
+            self.__items.move_to_end(key)
+            while len(self.__items) > self.__maxsize:
+                self.__items.popitem(last=False)
+        return template
+
+    def load(self, template_path: Path) -> ExcelTemplate:
+        """Шаблон из файла.
+
+        :arg template_path: Путь к шаблону
+        :return: Разобранный шаблон
+        """
+        with Path.open(template_path, 'rb') as file:
+            return self.get(file.read())
+
+    def register_default(self, template_path: Path) -> ExcelTemplate:
+        """Регистрация шаблона по умолчанию (не вытесняется из кэша).
+
+        :arg template_path: Путь к шаблону
+        :return: Разобранный шаблон
+        """
+        with Path.open(template_path, 'rb') as file:
+            template = ExcelTemplate(file.read())
+        with self.__lock:
+            self.__default = template
+        return template
+
+    def default(self) -> ExcelTemplate:
+        """Шаблон по умолчанию.
+
+        :return: Разобранный шаблон
+        """
+        template = self.__default
+        if template is None:
+            template = self.register_default(DEFAULT_TEMPLATE_PATH)
+        return template
+
+    def clear(self):
+        """Очистка кэша."""
+        with self.__lock:
+            self.__items.clear()
+
+
+# Общий кэш шаблонов процесса
+template_cache = TemplateCache()
 
 
 class Excel:
     """Преобразователь в Excel."""
 
-    def process(self, template_path: Path, src_path: Path, dst_path: Path):
+    def process(self, template_path: Path | None, src_path: Path, dst_path: Path):
         """Преобразование файла.
 
-        :arg template_path: Путь к шаблону
+        :arg template_path: Путь к шаблону (None - шаблон по умолчанию)
         :arg src_path: Путь к преобразуемому файлу
         :arg dst_path: Путь для сохранения результата
         """
-        # Читаем XML с расписанием
-        with Path.open(src_path, 'r', encoding='utf-8') as file:
-            src_xml = file.read()
-        s: schedule.Schedule = schedule.parse_schedule(src_xml)
+        if template_path is None:
+            template = template_cache.default()
+        else:
+            template = template_cache.load(template_path)
+        self.process_template(template=template, src_path=src_path, dst_path=dst_path)
+
+    def process_template(
+        self,
+        template: ExcelTemplate,
+        src_path: Path,
+        dst_path: Path,
+        timer: PhaseTimer | None = None,
+    ):
+        """Преобразование файла по разобранному шаблону.
+
+        :arg template: Шаблон
+        :arg src_path: Путь к преобразуемому файлу
+        :arg dst_path: Путь для сохранения результата
+        :arg timer: Замер времени этапов (необязательно)
+        """
+        with measure(timer, 'parse'):
+            # Читаем XML с расписанием
+            with Path.open(src_path, 'r', encoding='utf-8') as file:
+                src_xml = file.read()
+            s: schedule.Schedule = schedule.parse_schedule(src_xml)
 
         if not s:
             Exception('Исходный файл имеет неверный формат')
 
-        wb = load_workbook(template_path)  # Чтение книги из файла
-        global_names = wb.defined_names  # Диспетчер имен
-        wsp = wb['Шаблон']  # Обращение к листу
-        for teacher in s.teachers:
-            wst = wb.copy_worksheet(wsp)  # Копирование листа
-            wst.title = teacher.name  # Переименование листа
-            for gn, gn_data in global_names.items():
-                # Замена ссылки на лист в формуле для именованного диапазона
-                gn_ref = gn_data.attr_text.replace('Шаблон', f"'{teacher.name}'", 1)
-                # Создаем имя из новой ссылки
-                loc_name = DefinedName(gn, attr_text=gn_ref)
-                # Добавляем имя на новый лист
-                wst.defined_names.add(loc_name)
-
-            self.__model_to_sheet(ws=wst, model=teacher)
-
-        wb.remove(wsp)
-        wb.save(dst_path)
-
-    def __fill_range(
+        self.__render(template, s, dst_path, timer)
+
+    def process_stored(
         self,
-        ws: Worksheet,
-        name: str,
-        value: str,
-        row: int = 1,
-        col: int = 1,
+        template: ExcelTemplate,
+        schedule_id: int,
+        dst_path: Path,
+        timer: PhaseTimer | None = None,
+        repo: Repository = repository,
     ):
-        """Заполнение именованного диапазона ячеек значением.
+        """Преобразование сохраненного расписания.
 
-        :arg ws: Лист
-        :arg name: Имя диапазона
-        :arg value: Записываемое значение
-        :arg row: Строка внутри диапазона
-        :arg col: Столбец внутри диапазона
+        Книга сохраняется в хранилище и для того же шаблона
+        больше не строится.
+
+        :arg template: Шаблон
+        :arg schedule_id: Идентификатор расписания
+        :arg dst_path: Путь для сохранения результата
+        :arg timer: Замер времени этапов (необязательно)
+        :arg repo: Хранилище
         """
-        dest = ws.defined_names[name].destinations
-        for _, r in dest:
-            wr = ws[r]
-            if not isinstance(wr, tuple):
-                ws[r] = value
-            else:
-                wr_row = wr[row - 1]
-                wr_row[col - 1].value = value
-
-    def __model_to_sheet(
+        content = repo.workbook(schedule_id, template.digest)
+        if content is None:
+            with measure(timer, 'parse'):
+                if not repo.schedule_exists(schedule_id):
+                    raise Exception(f'Расписание {schedule_id} не найдено')
+                stream = BytesIO()
+                write_rows_xml(repo.lessons(schedule_id), stream)
+                s = schedule.parse_schedule(stream.getvalue().decode('utf-8'))
+            self.__render(template, s, dst_path, timer)
+            repo.save_workbook(schedule_id, template.digest, dst_path.read_bytes())
+        else:
+            with measure(timer, 'write'):
+                dst_path.write_bytes(content)
+
+    def __render(
+        self,
+        template: ExcelTemplate,
+        s: schedule.Schedule,
+        dst_path: Path,
+        timer: PhaseTimer | None,
+    ):
+        """Вывод расписания по шаблону и запись книги.
+
+        :arg template: Шаблон
+        :arg s: Расписание
+        :arg dst_path: Путь для сохранения результата
+        :arg timer: Замер времени этапов
+        """
+        with measure(timer, 'render'):
+            wb = template.workbook()  # Копия книги-шаблона
+            layout = template.layout  # Разметка шаблона
+            wsp = wb['Шаблон']  # Обращение к листу
+            for teacher in s.teachers:
+                wst = wb.copy_worksheet(wsp)  # Копирование листа
+                wst.title = teacher.name  # Переименование листа
+                for gn, gn_text in layout.names:
+                    # Замена ссылки на лист в формуле для именованного диапазона
+                    gn_ref = gn_text.replace('Шаблон', f"'{teacher.name}'", 1)
+                    # Создаем имя из новой ссылки
+                    loc_name = DefinedName(gn, attr_text=gn_ref)
+                    # Добавляем имя на новый лист
+                    wst.defined_names.add(loc_name)
+
+                self.__teacher_to_sheet(ws=wst, layout=layout, teacher=teacher)
+
+            wb.remove(wsp)
+        with measure(timer, 'write'):
+            wb.save(dst_path)
+
+    def __teacher_to_sheet(
         self,
         /,
         ws: Worksheet,
-        model: schedule.ScheduleBaseModel | List,
-        parent_descr: str = '',
+        layout: ExcelLayout,
+        teacher: schedule.Teacher,
     ):
-        """Рекурсивный вывод модели на лист.
+        """Вывод расписания учителя на лист.
 
         :arg ws: Лист
-        :arg model: Модель
-        :arg parent_descr: Имя узла модели верхнего уровня
+        :arg layout: Разметка шаблона
+        :arg teacher: Расписание учителя
         """
-        if isinstance(model, list):
-            for lesson in model:
-                self.__fill_range(
-                    ws=ws,
-                    name=parent_descr,
-                    value=lesson.group,
-                    row=lesson.npp,
-                    col=1,
-                )
-                self.__fill_range(
-                    ws=ws,
-                    name=parent_descr,
-                    value=lesson.subject,
-                    row=lesson.npp,
-                    col=2,
-                )
-        if not isinstance(model, schedule.ScheduleBaseModel):
-            return
-        schedule_model: schedule.ScheduleBaseModel = model
-        for model_fields_name in schedule_model.model_fields_set:
-            descr = parent_descr + schedule_model.model_fields[model_fields_name].path
-            if (
-                schedule_model.model_fields[model_fields_name].location
-                == NodeType.ATTRIBUTE
-            ):
-                self.__fill_range(
-                    ws=ws,
-                    name=descr,
-                    value=getattr(schedule_model, model_fields_name),
-                )
-            else:
-                child_model = getattr(schedule_model, model_fields_name)
-                self.__model_to_sheet(ws=ws, model=child_model, parent_descr=descr)
+        for field_name, cells in layout.attributes.items():
+            value = getattr(teacher, field_name)
+            for row, col in cells:
+                ws.cell(row=row, column=col, value=value)
+
+        lessons = layout.lessons
+        for day_field in layout.day_fields:
+            day_data = getattr(teacher, day_field)
+            if day_data is None:
+                continue
+            for part_field in layout.part_fields:
+                part_data = getattr(day_data, part_field)
+                if part_data is None:
+                    continue
+                for lesson in part_data.lessons:
+                    for row, col in lessons.get(
+                        (day_field, part_field, lesson.npp, GROUP_COLUMN), ()
+                    ):
+                        ws.cell(row=row, column=col, value=lesson.group)
+                    for row, col in lessons.get(
+                        (day_field, part_field, lesson.npp, SUBJECT_COLUMN), ()
+                    ):
+                        ws.cell(row=row, column=col, value=lesson.subject)
@@ -1,51 +1,264 @@
 """Алгоритм генерации расписания."""
 
+import logging
 import math
 import operator
+import time
 from collections import Counter
 from copy import copy
 from functools import reduce
 from pathlib import Path
-from random import choice, shuffle
-from typing import Dict, List
+from random import random, shuffle
+from typing import Dict, Iterable, Iterator, List, Set
 
-import src.parsers.serializer as serializer
-import src.parsers.settings as settings
+import src.parsers.exporter as export
+import src.processors.generator.snapshot as snapshot
 import src.processors.generator.structures as struct
+from src.common.constants import DAY_PLAN_CACHE_SIZE, DAY_PLAN_SHUFFLES
+from src.common.slots import MAX_NPP, day_slots, make_slot, slot_day, slot_shift
+from src.common.timing import measure
+from src.parsers.raw_schedule import parse_schedule_rows_fast
+from src.processors.generator.nogood import NogoodCache
+from src.processors.generator.stats import GroupStats, Phase, Rejection, SolverStats
+
+logger = logging.getLogger(__name__)
+
+
+def read_schedule_rows(path: Path, strict: bool = False) -> List[export.LessonRow]:
+    """Уроки расписания XML в виде плоской таблицы.
+
+    :arg path: Путь к файлу расписания
+    :arg strict: Полная проверка через pydantic_xml
+    :return: Уроки
+    """
+    with Path.open(path, 'rb') as file:
+        content = file.read()
+    if not strict:
+        return parse_schedule_rows_fast(content)
+    # Парсим через pydantic_xml (загружается только по требованию)
+    import src.parsers.schedule as schedule
+
+    return list(
+        schedule.schedule_rows(schedule.parse_schedule(content.decode('utf-8')))
+    )
+
+
+def shuffle_pattern(
+    pattern: struct.DayPlan,
+    comb_days: List[Set[struct.DayOfWeek]],
+) -> struct.DayPlan:
+    """Случайная перестановка дней в расстановках группы того же класса.
+
+    С переставленными днями у параллельных групп одни и те же предметы
+    не попадают на одно время. Берется перестановка, в которой каждая
+    расстановка идет в допустимый день; если такой не нашлось - образец.
+
+    :arg pattern: Расстановки по дням
+    :arg comb_days: Дни недели, допустимые для расстановок
+    :return: Расстановки по дням
+    """
+    shuffled = list(pattern)
+    for _ in range(DAY_PLAN_SHUFFLES):
+        shuffle(shuffled)
+        if all(
+            comb_num is None or day in comb_days[comb_num]
+            for day, comb_num in zip(struct.DayOfWeek, shuffled, strict=True)
+        ):
+            return tuple(shuffled)
+    return pattern
 
 
 class Generator:
     """Генератор расписания."""
 
-    def __init__(self):
-        """Инициализация."""
-        self.__data = struct.GeneratorData()
+    def __init__(
+        self,
+        data: struct.GeneratorData | None = None,
+        stats: SolverStats | None = None,
+    ):
+        """Инициализация.
 
-    def process(self, src_path: Path, dst_path: Path):
+        :arg data: Заполненные данные генератора (например, из снимка)
+        :arg stats: Показатели работы (None - не собираются)
+        """
+        self.__data = data if data is not None else struct.GeneratorData()
+        self.stats = stats
+
+    def process(
+        self,
+        src_path: Path,
+        dst_path: Path,
+        export_format: export.ExportFormat = export.ExportFormat.XML,
+        strict: bool = False,
+        base_path: Path | None = None,
+        pin: struct.PinPolicy | None = None,
+    ):
         """Точка входа в алгоритм.
 
-        :arg src_path: Путь к файлу с настройками
+        :arg src_path: Путь к файлу с настройками или к снимку
+        :arg dst_path: Путь к файлу с расписанием
+        :arg export_format: Формат файла с расписанием
+        :arg strict: Полная проверка настроек (и прежнего расписания)
+        :arg base_path: Прежнее расписание XML, уроки которого закрепляются
+        :arg pin: Какие уроки прежнего расписания закрепить (по умолчанию все)
+        """
+        with Path.open(src_path, 'rb') as file:
+            self.__data = snapshot.read_source(file.read(), strict, self.stats)
+
+        if base_path is not None:
+            with measure(self.stats, Phase.PARSE):
+                self.pin_lessons(read_schedule_rows(base_path, strict), pin)
+
+        self.process_data(dst_path, export_format)
+
+    def pin_lessons(
+        self,
+        rows: Iterable[export.LessonRow],
+        pin: struct.PinPolicy | None = None,
+    ) -> int:
+        """Закрепление уроков прежнего расписания до начала расчета.
+
+        Закрепленные уроки сразу занимают время учителей и уменьшают
+        остаток часов группы. Дни группы с закрепленными уроками
+        перебором не заполняются. Уроки, которых нет в настройках
+        (учитель, группа или предмет), и уроки с недопустимым номером
+        пропускаются.
+
+        :arg rows: Уроки прежнего расписания
+        :arg pin: Какие уроки закрепить (по умолчанию все)
+        :return: Количество закрепленных уроков
+        """
+        pin = pin if pin is not None else struct.PinPolicy()
+        days = {info.day_description: day for day, info in struct.days_of_week.items()}
+        parts = {tag: time_of_day for time_of_day, tag in struct.times_of_day.items()}
+        pinned: Dict[struct.GroupId, struct.GroupTimeTable] = {}
+        skipped = 0
+        for teacher_name, group_id, subject_name, day, part, npp in rows:
+            if not pin.pins(teacher_name, group_id):
+                continue
+            teacher_id = self.__data.teachers_names_unique.get(teacher_name)
+            subject_id = self.__data.subjects_names_unique.get(subject_name)
+            if (
+                teacher_id is None
+                or subject_id is None
+                or group_id not in self.__data.groups
+                or day not in days
+                or part not in parts
+                or not 0 <= npp <= MAX_NPP
+            ):
+                skipped += 1
+                continue
+            group_tt = pinned.setdefault(group_id, {})
+            group_tt[make_slot(days[day], parts[part], npp)] = (
+                struct.GroupTimeTableInfo(subject_id=subject_id, teacher_id=teacher_id)
+            )
+        if skipped:
+            logger.warning(
+                'Не закреплено уроков (нет в настройках или неверный номер): %s',
+                skipped,
+            )
+        for group_id, group_tt in pinned.items():
+            self.__data.groups[group_id].time_table.update(group_tt)
+            self.map_to_teachers_tt(group_id, group_tt)
+        return sum(len(group_tt) for group_tt in pinned.values())
+
+    def process_data(
+        self,
+        dst_path: Path,
+        export_format: export.ExportFormat = export.ExportFormat.XML,
+    ):
+        """Расчет по уже заполненным данным.
+
+        :arg dst_path: Путь к файлу с расписанием
+        :arg export_format: Формат файла с расписанием
+        """
+        with measure(self.stats, Phase.SOLVE):
+            self.make_time_table()
+
+        self.write(dst_path, export_format)
+
+    def write(
+        self,
+        dst_path: Path,
+        export_format: export.ExportFormat = export.ExportFormat.XML,
+    ):
+        """Запись рассчитанного расписания.
+
         :arg dst_path: Путь к файлу с расписанием
+        :arg export_format: Формат файла с расписанием
         """
-        # Читаем XML с настройками
-        with Path.open(src_path, 'r', encoding='utf-8') as file:
-            src_content = file.read()
-        # Парсим через pydantic_xml
-        src_data = settings.parse_settings(src_content)
-        if not src_data:
-            raise Exception('Исходный файл имеет неверный формат')
+        with measure(self.stats, Phase.SERIALIZE):
+            if export_format != export.ExportFormat.XML:
+                export.export_rows(self.__data.lesson_rows(), export_format, dst_path)
+            else:
+                with Path.open(dst_path, 'wb') as file:
+                    self.__data.write_xml(file)
 
-        self.__data.fill_from_source(src_data)
+        if self.stats is not None:
+            logger.info('Показатели генератора: %s', self.stats.summary())
 
-        self.make_time_table()
+    def lesson_rows(self) -> Iterator[export.LessonRow]:
+        """Рассчитанное расписание в виде плоской таблицы.
+
+        :return: Уроки
+        """
+        return self.__data.lesson_rows()
+
+    def snapshot(self) -> bytes:
+        """Снимок данных генератора (для расчета в другом процессе).
+
+        :return: Снимок
+        """
+        return snapshot.dump_snapshot(self.__data)
 
-        dst_data = self.__data.write_to_destination()
+    def assignments(self) -> List[struct.Assignment]:
+        """Рассчитанное расписание групп в компактном виде.
 
-        dst_content = serializer.seralizer(dst_data)
-        with Path.open(dst_path, 'wb') as file:
-            file.write(dst_content)
+        :return: Назначенные уроки
+        """
+        return [
+            (group_id, tt_key, tt_info.subject_id, tt_info.teacher_id)
+            for group_id, group_info in self.__data.groups.items()
+            for tt_key, tt_info in group_info.time_table.items()
+        ]
+
+    def apply_assignments(self, assignments: Iterable[struct.Assignment]):
+        """Перенос расписания, рассчитанного в другом процессе.
+
+        :arg assignments: Назначенные уроки
+        """
+        for group_id, tt_key, subject_id, teacher_id in assignments:
+            self.__data.groups[group_id].time_table[tt_key] = struct.GroupTimeTableInfo(
+                subject_id=subject_id, teacher_id=teacher_id
+            )
+        for group_id, group_info in self.__data.groups.items():
+            if group_info.time_table:
+                self.map_to_teachers_tt(group_id, group_info.time_table)
+
+    def group_curriculum(
+        self,
+        group_info: struct.GroupInfo,
+    ) -> Dict[struct.SubjectId, struct.CurriculumInfo]:
+        """Остаток учебного плана группы.
+
+        Из плана класса вычитаются часы уроков, уже стоящих
+        в расписании группы (закрепленных).
+
+        :arg group_info: Данные группы
+        :return: Предмет -> часы и дни недели (копии)
+        """
+        curriculum = {
+            ck.subject: copy(cd)
+            for ck, cd in (self.__data.curriculum.items())
+            if ck.grade == group_info.grade
+        }
+        for tt_info in group_info.time_table.values():
+            info = curriculum.get(tt_info.subject_id)
+            if info is not None and info.hours > 0:
+                info.hours -= 1
+        return curriculum
 
-    def make_time_table(self):
+    def make_time_table(self) -> None:
         """Расчет расписания."""
         # Обход групп в случайном порядке
         group_keys = list(self.__data.groups.keys())
@@ -58,12 +271,18 @@ class Generator:
         group_id: struct.GroupId,
         group_info: struct.GroupInfo,
         comb_nums: List[int],
+        nogoods: NogoodCache | None = None,
+        pattern: struct.DayPlan | None = None,
+        plan: List[int | None] | None = None,
     ) -> bool:
         """Составление расписания для группы - попытка.
 
         :arg group_id: Номер группы
         :arg group_info: Данные группы
         :arg comb_nums: Индекс для перебора комбинаций
+        :arg nogoods: Тупики, найденные прошлыми попытками для этой группы
+        :arg pattern: Расстановки по дням, проверяется только занятость учителей
+        :arg plan: Список для записи выбранных расстановок по дням
         :return: Попытка успешная
         """
 
@@ -74,6 +293,10 @@ class Generator:
             """
             # В комбинации есть лишние предметы
             if set(comb_counter.keys()) - set(curriculum.keys()):
+                if stats is not None:
+                    stats.rejections[Rejection.EXTRA_SUBJECTS] += 1
+                if nogoods is not None:
+                    nogoods.reject(_day_num, comb_num)
                 return False
 
             # Часов в комбинации больше, чем нужно
@@ -81,11 +304,54 @@ class Generator:
                 operator.add,
                 [comb_counter[k] > curriculum[k].hours for k in comb_counter],
             ):
+                if stats is not None:
+                    stats.rejections[Rejection.EXTRA_HOURS] += 1
+                return False
+
+            # НеРазделятьПоДням: все часы предмета ставятся в один день.
+            # Остаток часов такого предмета - либо весь план, либо ноль
+            # (отсечено выше), поэтому отказ не зависит от попытки
+            if no_split and any(
+                comb_counter[k] != curriculum[k].hours
+                for k in comb_counter
+                if k in no_split
+            ):
+                if stats is not None:
+                    stats.rejections[Rejection.NO_SPLIT] += 1
+                if nogoods is not None:
+                    nogoods.reject(_day_num, comb_num)
                 return False
 
             # Проверка по дням недели
             days_set_list = [curriculum[k].days_of_week for k in comb_counter]
-            return _day_num in set.union(*days_set_list)
+            if _day_num in set.union(*days_set_list):
+                return True
+            if stats is not None:
+                stats.rejections[Rejection.WRONG_DAY] += 1
+            if nogoods is not None:
+                nogoods.reject(_day_num, comb_num)
+            return False
+
+        def other_group_in_shift(
+            teacher_id: struct.TeacherId,
+            subject_id: struct.SubjectId,
+        ) -> bool:
+            """Учитель уже ведет предмет ОднаГруппаЗаСмену у другой группы.
+
+            :arg teacher_id: Учитель
+            :arg subject_id: Предмет
+            :return: Смена занята другой группой
+            """
+            if subject_id not in one_group:
+                return False
+            occupant = self.__data.shift_subject_groups.get(
+                struct.ShiftSubjectKey(
+                    teacher=teacher_id,
+                    shift=shift_slot,
+                    subject=subject_id,
+                ),
+            )
+            return occupant is not None and occupant != group_id
 
         def teachers_vacant(tutors_list) -> bool:
             """Проверка занятости учителя.
@@ -95,12 +361,14 @@ class Generator:
             for npp, lesson_info in tutors_list.items():
                 if not lesson_info.teacher_id:
                     continue
-                tt_key = struct.TimeTableKey(
-                    day=_day_num,
-                    time_of_day=group_info.time_of_day,
-                    npp=npp,
-                )
+                tt_key = shift_slot + npp
                 if tt_key in self.__data.teachers[lesson_info.teacher_id].time_table:
+                    if stats is not None:
+                        stats.rejections[Rejection.TEACHER_BUSY] += 1
+                    return False
+                if other_group_in_shift(lesson_info.teacher_id, lesson_info.subject_id):
+                    if stats is not None:
+                        stats.rejections[Rejection.ONE_GROUP] += 1
                     return False
             return True
 
@@ -116,46 +384,51 @@ class Generator:
                     subject_map.setdefault(lesson_info.subject_id, []).append(npp)
             if not subject_map:
                 return True
+            # Выбор учителя с наименьшей стоимостью. Предметы комбинации не
+            # конкурируют за учителей (у одного учителя несколько предметов
+            # идут разными уроками), поэтому подбор идет по каждому предмету,
+            # а часы, уже выбранные в этой комбинации, входят в нагрузку
+            pending: Counter[struct.TeacherId] = Counter()
             all_teachers_found = True
-            for subject in subject_map:
+            for subject, npps in subject_map.items():
                 selected_teacher = 0
-                vacant_teachers = []
+                best_cost = None
+                ties = 0
                 for teacher_id in self.__data.unassigned_teachers[subject]:
-                    vacant_flag = True
+                    teacher_tt = self.__data.teachers[teacher_id].time_table
                     # Проверим, свободен ли учитель в этот момент
-                    for npp in subject_map[subject]:
-                        tt_key = struct.TimeTableKey(
-                            day=_day_num,
-                            time_of_day=group_info.time_of_day,
-                            npp=npp,
-                        )
-                        if tt_key in self.__data.teachers[teacher_id].time_table:
-                            vacant_flag = False
-                    if not vacant_flag:
+                    if any(shift_slot + npp in teacher_tt for npp in npps):
                         continue
-                    vacant_teachers.append(teacher_id)
-                    # Проверим, есть ли у него другие занятия в этот день
-                    # Если есть - это преимущество
-                    for tt_key in self.__data.teachers[teacher_id].time_table:
-                        if tt_key.day == _day_num:
+                    # В смене у учителя уже другая группа по этому предмету
+                    if other_group_in_shift(teacher_id, subject):
+                        continue
+                    # Сначала - учителя, у которых уже есть уроки в этот день,
+                    # среди них - наименее загруженные
+                    cost = (
+                        not any(tt_key in day_range for tt_key in teacher_tt),
+                        len(teacher_tt) + pending[teacher_id],
+                    )
+                    if best_cost is None or cost < best_cost:
+                        best_cost, selected_teacher, ties = cost, teacher_id, 1
+                    elif cost == best_cost:
+                        # Равноценные учителя выбираются случайно
+                        ties += 1
+                        if random() * ties < 1:
                             selected_teacher = teacher_id
-                            for npp in subject_map[subject]:
-                                tutors_list[npp].teacher_id = teacher_id
-                            # Эту фичу оставил на будущее
-                            # она нужна, если предмет идет в разные дни
-                            # Но значения нужно удалять при каждой попытке
-                            # self.__data.subject_assignment[
-                            #     struct.SubjectAssignmentKey(
-                            #         group=group_id,
-                            #         subject=subject)] = teacher_id
-
-                # С преимуществом никого не нашли
-                if not selected_teacher and vacant_teachers:
-                    shuffle(vacant_teachers)
-                    selected_teacher = choice(vacant_teachers)
-                    for npp in subject_map[subject]:
+                if selected_teacher:
+                    pending[selected_teacher] += len(npps)
+                    for npp in npps:
                         tutors_list[npp].teacher_id = selected_teacher
+                    # Эту фичу оставил на будущее
+                    # она нужна, если предмет идет в разные дни
+                    # Но значения нужно удалять при каждой попытке
+                    # self.__data.subject_assignment[
+                    #     struct.SubjectAssignmentKey(
+                    #         group=group_id,
+                    #         subject=subject)] = selected_teacher
                 all_teachers_found = all_teachers_found and bool(selected_teacher > 0)
+            if not all_teachers_found and stats is not None:
+                stats.rejections[Rejection.NO_VACANT_TEACHER] += 1
             return all_teachers_found
 
         def apply_combination(tutors_list):
@@ -165,32 +438,60 @@ class Generator:
                 curriculum[k].hours -= comb_counter[k]
             # Добавляем расписание для группы
             for sbj_npp, sbj_info in tutors_list.items():
-                group_info.time_table[
-                    struct.TimeTableKey(
-                        day=_day_num,
-                        time_of_day=group_info.time_of_day,
-                        npp=sbj_npp,
-                    )
-                ] = struct.GroupTimeTableInfo(
+                group_info.time_table[shift_slot + sbj_npp] = struct.GroupTimeTableInfo(
                     subject_id=sbj_info.subject_id,
                     teacher_id=sbj_info.teacher_id,
                 )
 
-        # Перечень предметов
-        curriculum = {
-            ck.subject: copy(cd)
-            for ck, cd in (self.__data.curriculum.items())
-            if ck.grade == group_info.grade
-        }
-
-        combs_used = set()
+        stats = self.stats
+        # Перечень предметов (без часов закрепленных уроков)
+        curriculum = self.group_curriculum(group_info)
+        # Дни с закрепленными уроками не заполняются
+        pinned_days = {slot_day(tt_key) for tt_key in group_info.time_table}
+        # Предметы с ограничениями НеРазделятьПоДням и ОднаГруппаЗаСмену
+        no_split = set()
+        one_group = set()
+        for k in curriculum:
+            subject_info = self.__data.subjects.get(k)
+            if subject_info is None:
+                continue
+            if subject_info.no_split:
+                no_split.add(k)
+            if subject_info.one_group:
+                one_group.add(k)
+
+        combs_used: Set[int] = set()
+        # Использованные комбинации перед каждым днем - для разбора неудачи
+        path = []
         # По дням недели
-        for _day_num in struct.DayOfWeek:
+        for day_index, _day_num in enumerate(struct.DayOfWeek):
+            # Время урока в смене группы: shift_slot + номер урока
+            shift_slot = make_slot(_day_num, group_info.time_of_day, 0)
+            day_range = day_slots(_day_num)
+            used_before = frozenset(combs_used)
+            path.append(used_before)
+            if _day_num in pinned_days:
+                candidates = []
+            elif pattern is None:
+                candidates = comb_nums
+            else:
+                # Свободный день образца остается свободным
+                planned = pattern[day_index]
+                candidates = [] if planned is None else [planned]
+            chosen = None
             # Подберем комбинацию предметов на этот день
-            for comb_num in comb_nums:
+            for comb_num in candidates:
                 # Каждая комбинация предметов уникальна в рамках группы
                 if comb_num in combs_used:
                     continue
+                # Тупики прошлых попыток не проверяются повторно
+                if nogoods is not None and (
+                    nogoods.rejected(_day_num, comb_num)
+                    or nogoods.is_dead(_day_num + 1, used_before | {comb_num})
+                ):
+                    if stats is not None:
+                        stats.rejections[Rejection.NOGOOD] += 1
+                    continue
                 combination = self.__data.combinations[comb_num]
                 # Количество часов по предметам в комбинации
                 comb_counter = Counter(combination)
@@ -210,17 +511,31 @@ class Generator:
                 }
                 # Проверка занятости педагогов
                 if not teachers_vacant(tutors):
+                    if nogoods is not None:
+                        nogoods.reject(_day_num, comb_num)
                     continue
                 # Подбор непривязанных педагогов
                 if not unmounted_vacant(tutors):
+                    if nogoods is not None:
+                        nogoods.reject(_day_num, comb_num)
                     continue
                 # Комбинация одобрена
                 apply_combination(tutors)
                 combs_used.add(comb_num)
+                chosen = comb_num
                 break
+            # Расстановка образца не подошла: часы плана уже не распределить
+            if pattern is not None and chosen != pattern[day_index]:
+                return False
+            if plan is not None:
+                plan.append(chosen)
 
         # Все часы удалось распределить
-        return reduce(operator.add, [v.hours for v in curriculum.values()]) == 0
+        success = reduce(operator.add, [v.hours for v in curriculum.values()]) == 0
+        if not success and nogoods is not None:
+            path.append(frozenset(combs_used))
+            nogoods.learn(path)
+        return success
 
     def map_to_teachers_tt(
         self,
@@ -234,16 +549,42 @@ class Generator:
         """
         for gtt_key, gtt_info in group_tt.items():
             if gtt_info.teacher_id:
-                tt_key = struct.TimeTableKey(
-                    day=gtt_key.day,
-                    time_of_day=gtt_key.time_of_day,
-                    npp=gtt_key.npp,
-                )
                 tt_info = struct.TimeTableInfo(
                     subject_id=gtt_info.subject_id,
                     group=group_id,
                 )
-                self.__data.teachers[gtt_info.teacher_id].time_table[tt_key] = tt_info
+                self.__data.teachers[gtt_info.teacher_id].time_table[gtt_key] = tt_info
+                # Смена учителя по предмету ОднаГруппаЗаСмену занята группой
+                subject_info = self.__data.subjects.get(gtt_info.subject_id)
+                if subject_info is not None and subject_info.one_group:
+                    self.__data.shift_subject_groups[
+                        struct.ShiftSubjectKey(
+                            teacher=gtt_info.teacher_id,
+                            shift=slot_shift(gtt_key),
+                            subject=gtt_info.subject_id,
+                        )
+                    ] = group_id
+
+    def combination_days(self, grade: struct.GradeId) -> List[Set[struct.DayOfWeek]]:
+        """Дни недели, в которые расстановка может идти у класса.
+
+        Те же условия, что при проверке комбинации: день подходит,
+        если в него проводится хотя бы один предмет расстановки.
+
+        :arg grade: Класс
+        :return: Дни недели по номеру расстановки
+        """
+        result = []
+        for combination in self.__data.combinations:
+            days: Set[struct.DayOfWeek] = set()
+            for subject in set(combination):
+                info = self.__data.curriculum.get(
+                    struct.CurriculumKey(grade=grade, subject=subject)
+                )
+                if info is not None:
+                    days |= info.days_of_week
+            result.append(days)
+        return result
 
     def make_tt_for_group(self, group_id: struct.GroupId, group_info: struct.GroupInfo):
         """Составление расписания для группы.
@@ -258,12 +599,70 @@ class Generator:
         # Максимальная сложность перебора - факториальная
         # (число сочетаний)
         efforts_count = math.comb(combs_count, 3)
-        for _ in range(efforts_count):
+        # Закрепленные уроки остаются в расписании после неудачных попыток
+        pinned = dict(group_info.time_table)
+        curriculum = self.group_curriculum(group_info)
+        # Тупики нужны только на время подбора расписания этой группы
+        nogoods = NogoodCache(curriculum, self.__data.combinations)
+        started = time.perf_counter()
+        efforts = 0
+        # Закрепленные уроки покрывают весь учебный план
+        solved = bool(pinned) and not any(cd.hours for cd in curriculum.values())
+        # Сначала - расстановки, подошедшие группам того же класса и смены:
+        # учебный план тот же, проверяется только занятость учителей.
+        # Расстановки на всю неделю не годятся группе с закрепленными уроками
+        patterns = (
+            []
+            if pinned
+            else self.__data.day_plans.setdefault(
+                struct.DayPlanKey(
+                    grade=group_info.grade, time_of_day=group_info.time_of_day
+                ),
+                [],
+            )
+        )
+        comb_days = self.combination_days(group_info.grade) if patterns else []
+        for pattern in patterns:
+            efforts += 1
+            if self.make_tt_for_group_effort(
+                group_id,
+                group_info,
+                comb_nums,
+                nogoods,
+                pattern=shuffle_pattern(pattern, comb_days),
+            ):
+                solved = True
+                # Удачный образец проверяется первым
+                patterns.remove(pattern)
+                patterns.insert(0, pattern)
+                break
+            group_info.time_table.clear()
+        plan: List[int | None] | None = None if pinned else []
+        for _ in range(0 if solved else efforts_count):
+            efforts += 1
             # Перебор комбинаций в случайном порядке
             shuffle(comb_nums)
-            if self.make_tt_for_group_effort(group_id, group_info, comb_nums):
+            if plan is not None:
+                plan.clear()
+            if self.make_tt_for_group_effort(
+                group_id, group_info, comb_nums, nogoods, plan=plan
+            ):
+                solved = True
+                if plan is not None:
+                    patterns.insert(0, tuple(plan))
+                    del patterns[DAY_PLAN_CACHE_SIZE:]
                 break
             group_info.time_table.clear()
+            group_info.time_table.update(pinned)
+            # Тупик с первого дня: остальные попытки тоже будут неудачными
+            if nogoods.is_dead(0, frozenset()):
+                break
+        if self.stats is not None:
+            self.stats.groups[group_id] = GroupStats(
+                efforts=efforts,
+                seconds=time.perf_counter() - started,
+                solved=solved,
+            )
         # Перенос расписания группы на преподавателей
         if group_info.time_table:
             self.map_to_teachers_tt(group_id, group_info.time_table)
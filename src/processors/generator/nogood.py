@@ -0,0 +1,140 @@
+"""Запоминание тупиков перебора в пределах одной группы."""
+
+from collections import Counter
+from typing import Dict, FrozenSet, List, Set, Tuple
+
+import src.processors.generator.structures as struct
+
+# Использованные в попытке расстановки
+type UsedCombinations = FrozenSet[int]
+
+# Состояние попытки: (индекс дня, использованные расстановки)
+type SearchState = Tuple[int, UsedCombinations]
+
+
+class NogoodCache:
+    """Доказанные тупики поиска расписания группы.
+
+    Кэш живет, пока подбирается расписание одной группы: занятость
+    учителей в это время не меняется, поэтому отказ расстановки
+    по занятости учителя в заданный день повторится в любой попытке.
+
+    Хранится два вида тупиков:
+
+    - (день, расстановка) - расстановка не подходит в этот день
+      независимо от остатка часов (лишние предметы, не тот день недели,
+      занятый учитель, некого подобрать из ЛюбыеГруппы);
+    - (индекс дня, использованные расстановки) - из такого состояния
+      часы учебного плана распределить нельзя. Остаток часов однозначно
+      определяется набором использованных расстановок.
+    """
+
+    def __init__(
+        self,
+        curriculum: Dict[struct.SubjectId, struct.CurriculumInfo],
+        combinations: struct.CombinationList,
+    ):
+        """Инициализация.
+
+        :arg curriculum: Учебный план группы (часы до начала перебора)
+        :arg combinations: Все расстановки
+        """
+        self.__hours = {subject: info.hours for subject, info in curriculum.items()}
+        self.__days = {
+            subject: info.days_of_week for subject, info in curriculum.items()
+        }
+        self.__counters = [Counter(combination) for combination in combinations]
+        self.__rejected: Set[Tuple[struct.DayOfWeek, int]] = set()
+        self.__dead: Set[SearchState] = set()
+
+    def reject(self, day: struct.DayOfWeek, comb_num: int):
+        """Расстановка не подходит в этот день ни при каком остатке часов.
+
+        :arg day: День недели
+        :arg comb_num: Номер расстановки
+        """
+        self.__rejected.add((day, comb_num))
+
+    def rejected(self, day: struct.DayOfWeek, comb_num: int) -> bool:
+        """Расстановка уже отвергнута в этот день.
+
+        :arg day: День недели
+        :arg comb_num: Номер расстановки
+        :return: Проверять расстановку не нужно
+        """
+        return (day, comb_num) in self.__rejected
+
+    def is_dead(self, day_index: int, used: UsedCombinations) -> bool:
+        """Из состояния нельзя распределить все часы.
+
+        :arg day_index: Индекс дня, с которого продолжится перебор
+        :arg used: Использованные расстановки
+        :return: Состояние - доказанный тупик
+        """
+        return (day_index, used) in self.__dead
+
+    def learn(self, path: List[UsedCombinations]):
+        """Разбор неудачной попытки: тупики от конца недели к началу.
+
+        Конечное состояние неудачной попытки - тупик. Состояние дня
+        становится тупиком, если тупик - следующий день без расстановки
+        (в этот день попытка может ничего не поставить) и все подходящие
+        по часам расстановки тоже ведут в тупики. Не проверенные
+        на занятость учителей расстановки считаются подходящими, поэтому
+        тупики всегда доказаны.
+
+        :arg path: Использованные расстановки перед каждым днем и в конце
+        """
+        days = list(struct.DayOfWeek)
+        self.__dead.add((len(days), path[-1]))
+        for day_index in range(len(days) - 1, -1, -1):
+            used = path[day_index]
+            remaining = self.__remaining(used)
+            fitting = [
+                comb_num
+                for comb_num in range(len(self.__counters))
+                if comb_num not in used
+                and self.__fits(days[day_index], comb_num, remaining)
+            ]
+            dead = (day_index + 1, used) in self.__dead and all(
+                (day_index + 1, used | {comb_num}) in self.__dead
+                for comb_num in fitting
+            )
+            if not dead:
+                # Раньше этого дня тупик уже не доказать
+                return
+            self.__dead.add((day_index, used))
+
+    def __remaining(self, used: UsedCombinations) -> Dict[struct.SubjectId, int]:
+        """Остаток часов после использованных расстановок.
+
+        :arg used: Использованные расстановки
+        :return: Предмет -> часов осталось
+        """
+        remaining = dict(self.__hours)
+        for comb_num in used:
+            for subject, hours in self.__counters[comb_num].items():
+                remaining[subject] -= hours
+        return remaining
+
+    def __fits(
+        self,
+        day: struct.DayOfWeek,
+        comb_num: int,
+        remaining: Dict[struct.SubjectId, int],
+    ) -> bool:
+        """Расстановка может подойти (те же условия, что в попытке).
+
+        :arg day: День недели
+        :arg comb_num: Номер расстановки
+        :arg remaining: Остаток часов
+        :return: Расстановка не отвергнута
+        """
+        if (day, comb_num) in self.__rejected:
+            return False
+        counter = self.__counters[comb_num]
+        if any(subject not in remaining for subject in counter):
+            return False
+        if any(hours > remaining[subject] for subject, hours in counter.items()):
+            return False
+        return any(day in self.__days[subject] for subject in counter)
@@ -0,0 +1,248 @@
+"""Пул прогретых процессов генератора с данными задачи в общей памяти.
+
+Данные задачи передаются процессам снимком в блоке общей памяти:
+процесс подключается к блоку по имени, без копирования через очередь.
+Обратно возвращаются только назначенные уроки (кортежи чисел).
+"""
+
+import hashlib
+import random
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, List, Tuple
+
+import src.processors.generator.structures as struct
+from src.common.constants import GENERATOR_WORKERS, SNAPSHOT_CACHE_SIZE
+from src.common.timing import measure
+
+if TYPE_CHECKING:
+    from src.processors.generator.generator import Generator
+    from src.processors.generator.stats import SolverStats
+
+# Результат одного запуска: уроки групп и показатели (None - не собирались)
+type StartResult = Tuple[List[struct.Assignment], 'SolverStats | None']
+
+
+def warm_up() -> None:
+    """Загрузка модулей генератора при старте процесса пула."""
+    import src.processors.generator.generator  # noqa: F401
+    import src.processors.generator.snapshot  # noqa: F401
+
+
+def ready() -> bool:
+    """Пустое задание: дождаться запуска процесса пула.
+
+    :return: Процесс готов
+    """
+    return True
+
+
+def attach(name: str) -> SharedMemory:
+    """Подключение к существующему блоку общей памяти.
+
+    :arg name: Имя блока
+    :return: Блок
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    # До Python 3.13 подключение регистрирует блок в resource_tracker;
+    # процессы пула (spawn) работают с resource_tracker сервера, поэтому
+    # повторная регистрация ничего не меняет, а блок удаляет только сервер
+    return SharedMemory(name=name)
+
+
+def block_buffer(block: SharedMemory) -> memoryview:
+    """Содержимое блока общей памяти.
+
+    :arg block: Блок
+    :return: Буфер блока
+    """
+    buffer = block.buf
+    if buffer is None:
+        raise Exception('Блок общей памяти закрыт')
+    return buffer
+
+
+def solve_shared(name: str, size: int, seed: int, collect_stats: bool) -> StartResult:
+    """Расчет расписания в процессе пула по снимку из общей памяти.
+
+    :arg name: Имя блока общей памяти
+    :arg size: Длина снимка
+    :arg seed: Начальное значение случайного перебора
+    :arg collect_stats: Собирать показатели генератора
+    :return: Назначенные уроки и показатели
+    """
+    from src.processors.generator.generator import Generator
+    from src.processors.generator.snapshot import load_snapshot
+    from src.processors.generator.stats import Phase, SolverStats
+
+    block = attach(name)
+    try:
+        view = block_buffer(block)[:size]
+        try:
+            data = load_snapshot(view)
+        finally:
+            view.release()
+    finally:
+        block.close()
+    stats = SolverStats() if collect_stats else None
+    random.seed(seed)
+    gen = Generator(data, stats)
+    with measure(stats, Phase.SOLVE):
+        gen.make_time_table()
+    return gen.assignments(), stats
+
+
+def solved_groups(assignments: List[struct.Assignment]) -> int:
+    """Количество групп с расписанием.
+
+    :arg assignments: Назначенные уроки
+    :return: Количество групп
+    """
+    return len({assignment[0] for assignment in assignments})
+
+
+@dataclass
+class SharedSnapshot:
+    """Снимок в общей памяти."""
+
+    block: SharedMemory  # Блок общей памяти
+    size: int  # Длина снимка
+    users: int = 0  # Выполняемые запросы по снимку
+
+
+class GeneratorPool:
+    """Долгоживущий пул процессов генератора.
+
+    Снимки данных задачи держатся в общей памяти (LRU по хэшу снимка):
+    повторная генерация по тем же настройкам не копирует данные заново.
+    """
+
+    def __init__(self, workers: int, maxsize: int = SNAPSHOT_CACHE_SIZE):
+        """Инициализация (процессы запускаются в start).
+
+        :arg workers: Количество процессов
+        :arg maxsize: Максимальное количество снимков в общей памяти
+        """
+        self.workers = workers
+        self.__maxsize = maxsize
+        self.__executor: ProcessPoolExecutor | None = None
+        self.__blocks: OrderedDict[str, SharedSnapshot] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Пул запущен."""
+        return self.__executor is not None
+
+    def start(self) -> None:
+        """Запуск процессов и ожидание их готовности."""
+        if self.running or self.workers <= 0:
+            return
+        # spawn: процессы не наследуют потоки и состояние сервера
+        self.__executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=get_context('spawn'),
+            initializer=warm_up,
+        )
+        futures = [self.__executor.submit(ready) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self) -> None:
+        """Остановка процессов и освобождение общей памяти."""
+        if self.__executor is not None:
+            self.__executor.shutdown(cancel_futures=True)
+            self.__executor = None
+        with self.__lock:
+            while self.__blocks:
+                _, shared = self.__blocks.popitem()
+                self.release(shared.block)
+
+    @staticmethod
+    def release(block: SharedMemory) -> None:
+        """Закрытие и удаление блока общей памяти.
+
+        :arg block: Блок
+        """
+        block.close()
+        block.unlink()
+
+    def acquire(self, snapshot: bytes) -> Tuple[str, SharedSnapshot]:
+        """Размещение снимка в общей памяти (повторный снимок не копируется).
+
+        :arg snapshot: Снимок данных генератора
+        :return: Хэш снимка и блок с ним
+        """
+        key = hashlib.sha256(snapshot).hexdigest()
+        with self.__lock:
+            shared = self.__blocks.get(key)
+            if shared is None:
+                block = SharedMemory(create=True, size=len(snapshot))
+                block_buffer(block)[: len(snapshot)] = snapshot
+                shared = SharedSnapshot(block=block, size=len(snapshot))
+                self.__blocks[key] = shared
+            self.__blocks.move_to_end(key)
+            shared.users += 1
+            return key, shared
+
+    def free(self, key: str) -> None:
+        """Снимок больше не нужен запросу; лишние снимки удаляются.
+
+        :arg key: Хэш снимка
+        """
+        with self.__lock:
+            self.__blocks[key].users -= 1
+            # Удаляются самые давние снимки, по которым не идет расчет
+            excess = len(self.__blocks) - self.__maxsize
+            for old_key in [k for k, v in self.__blocks.items() if not v.users]:
+                if excess <= 0:
+                    break
+                self.release(self.__blocks.pop(old_key).block)
+                excess -= 1
+
+    def solve(self, gen: 'Generator', starts: int = 1) -> None:
+        """Расчет расписания в пуле: лучший из нескольких запусков.
+
+        Запуски отличаются начальным значением случайного перебора,
+        выбирается расписание с наибольшим числом групп. Результат
+        переносится в генератор, как после make_time_table.
+
+        :arg gen: Генератор с заполненными данными
+        :arg starts: Количество запусков
+        """
+        from src.processors.generator.stats import Phase
+
+        if self.__executor is None:
+            raise Exception('Пул генератора не запущен')
+        key, shared = self.acquire(gen.snapshot())
+        collect_stats = gen.stats is not None
+        try:
+            futures = [
+                self.__executor.submit(
+                    solve_shared,
+                    shared.block.name,
+                    shared.size,
+                    random.getrandbits(64),
+                    collect_stats,
+                )
+                for _ in range(max(starts, 1))
+            ]
+            with measure(gen.stats, Phase.SOLVE):
+                results = [future.result() for future in futures]
+        finally:
+            self.free(key)
+        assignments, stats = max(results, key=lambda r: solved_groups(r[0]))
+        gen.apply_assignments(assignments)
+        if gen.stats is not None and stats is not None:
+            gen.stats.groups.update(stats.groups)
+            gen.stats.rejections.update(stats.rejections)
+
+
+# Пул процессов сервера (запускается при старте приложения)
+generator_pool = GeneratorPool(GENERATOR_WORKERS)
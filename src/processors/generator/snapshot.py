@@ -0,0 +1,245 @@
+"""Скомпилированный снимок данных генератора."""
+
+import hashlib
+import json
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Final, Tuple
+
+import src.parsers.raw_settings as raw_settings
+import src.processors.generator.structures as struct
+from src.common.constants import SNAPSHOT_CACHE_SIZE
+from src.common.timing import measure
+from src.processors.generator.stats import Phase, SolverStats
+
+# Сигнатура файла снимка
+SNAPSHOT_MAGIC: Final[bytes] = b'ASSGEN'
+# Версия формата снимка
+SNAPSHOT_VERSION: Final[int] = 1
+# Длина заголовка: сигнатура + версия (2 байта)
+_HEADER_SIZE: Final[int] = len(SNAPSHOT_MAGIC) + 2
+
+
+def is_snapshot(content: bytes | memoryview) -> bool:
+    """Проверка, что содержимое - снимок.
+
+    :arg content: Содержимое файла (или блок общей памяти)
+    :return: Это снимок
+    """
+    return bytes(content[: len(SNAPSHOT_MAGIC)]) == SNAPSHOT_MAGIC
+
+
+def compile_settings(
+    content: bytes,
+    strict: bool = False,
+    stats: SolverStats | None = None,
+) -> struct.GeneratorData:
+    """Разбор XML с настройками и заполнение данных генератора.
+
+    :arg content: Содержимое файла с настройками
+    :arg strict: Полная проверка настроек через pydantic_xml
+    :arg stats: Показатели для замера этапов (необязательно)
+    :return: Данные генератора
+    """
+    src_data: raw_settings.AnySettings | None
+    with measure(stats, Phase.PARSE):
+        if strict:
+            # Парсим через pydantic_xml (загружается только по требованию)
+            import src.parsers.settings as settings
+
+            src_data = settings.parse_settings(content.decode('utf-8'))
+        else:
+            # Потоковый разбор без построения моделей
+            src_data = raw_settings.parse_settings_fast(content)
+    if not src_data:
+        raise Exception('Исходный файл имеет неверный формат')
+    data = struct.GeneratorData()
+    with measure(stats, Phase.FILL):
+        data.fill_from_source(src_data)
+    return data
+
+
+def dump_snapshot(data: struct.GeneratorData) -> bytes:
+    """Сохранение данных генератора в снимок.
+
+    В снимок попадают только исходные данные, расписание не сохраняется.
+    Содержимое - сжатый JSON, поэтому загрузка не исполняет код.
+
+    :arg data: Заполненные данные генератора
+    :return: Снимок
+    """
+    payload = {
+        'subjects': [
+            [subject_id, info.subject_name, info.no_split, info.one_group]
+            for subject_id, info in data.subjects.items()
+        ],
+        'combinations': data.combinations,
+        'curriculum': [
+            [key.grade, key.subject, info.hours, sorted(info.days_of_week)]
+            for key, info in data.curriculum.items()
+        ],
+        'groups': [
+            [group_id, info.grade, info.time_of_day, info.class_master]
+            for group_id, info in data.groups.items()
+        ],
+        'teachers': [
+            [
+                teacher_id,
+                info.teacher_name,
+                [
+                    [subject_id, subject.autoselect_groups, sorted(subject.groups)]
+                    for subject_id, subject in info.subjects.items()
+                ],
+            ]
+            for teacher_id, info in data.teachers.items()
+        ],
+        'subject_assignment': [
+            [key.group, key.subject, teacher_id]
+            for key, teacher_id in data.subject_assignment.items()
+        ],
+        'unassigned_teachers': [
+            [subject_id, teachers]
+            for subject_id, teachers in data.unassigned_teachers.items()
+        ],
+    }
+    body = zlib.compress(
+        json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+    )
+    return SNAPSHOT_MAGIC + SNAPSHOT_VERSION.to_bytes(2, 'little') + body
+
+
+def load_snapshot(content: bytes | memoryview) -> struct.GeneratorData:
+    """Загрузка данных генератора из снимка.
+
+    :arg content: Снимок (или блок общей памяти)
+    :return: Данные генератора
+    """
+    if not is_snapshot(content):
+        raise Exception('Файл не является снимком настроек')
+    version = int.from_bytes(content[len(SNAPSHOT_MAGIC) : _HEADER_SIZE], 'little')
+    if version != SNAPSHOT_VERSION:
+        raise Exception(
+            f'Версия снимка {version} не поддерживается (ожидается {SNAPSHOT_VERSION})'
+        )
+    try:
+        payload = json.loads(zlib.decompress(content[_HEADER_SIZE:]))
+        data = struct.GeneratorData()
+        for subject_id, name, no_split, one_group in payload['subjects']:
+            data.subjects[subject_id] = struct.SubjectInfo(
+                subject_name=name,
+                no_split=no_split,
+                one_group=one_group,
+            )
+            data.subjects_names_unique[name] = subject_id
+        data.combinations = payload['combinations']
+        for grade, subject_id, hours, days in payload['curriculum']:
+            data.curriculum[struct.CurriculumKey(grade=grade, subject=subject_id)] = (
+                struct.CurriculumInfo(
+                    hours=hours,
+                    days_of_week={struct.DayOfWeek(day) for day in days},
+                )
+            )
+        for group_id, grade, time_of_day, class_master in payload['groups']:
+            data.groups[group_id] = struct.GroupInfo(
+                grade=grade,
+                time_of_day=struct.TimeOfDay(time_of_day),
+                class_master=class_master,
+                processed=False,
+                time_table={},
+            )
+        for teacher_id, name, subjects in payload['teachers']:
+            data.teachers[teacher_id] = struct.TeacherInfo(
+                teacher_name=name,
+                subjects={
+                    subject_id: struct.TeacherSubjectInfo(
+                        autoselect_groups=autoselect,
+                        groups=set(groups),
+                    )
+                    for subject_id, autoselect, groups in subjects
+                },
+                time_table={},
+            )
+            data.teachers_names_unique[name] = teacher_id
+        for group_id, subject_id, teacher_id in payload['subject_assignment']:
+            data.subject_assignment[
+                struct.SubjectAssignmentKey(group=group_id, subject=subject_id)
+            ] = teacher_id
+        for subject_id, teachers in payload['unassigned_teachers']:
+            data.unassigned_teachers[subject_id] = teachers
+    except (zlib.error, ValueError, TypeError, KeyError) as err:
+        raise Exception('Снимок настроек поврежден') from err
+    return data
+
+
+def read_source(
+    content: bytes,
+    strict: bool = False,
+    stats: SolverStats | None = None,
+) -> struct.GeneratorData:
+    """Данные генератора из снимка или XML с настройками.
+
+    :arg content: Содержимое файла
+    :arg strict: Полная проверка настроек через pydantic_xml
+    :arg stats: Показатели для замера этапов (необязательно)
+    :return: Данные генератора
+    """
+    if is_snapshot(content):
+        with measure(stats, Phase.PARSE):
+            return load_snapshot(content)
+    return compile_settings(content, strict, stats)
+
+
+class SnapshotCache:
+    """Кэш снимков по хэшу содержимого настроек (LRU)."""
+
+    def __init__(self, maxsize: int = SNAPSHOT_CACHE_SIZE):
+        """Инициализация.
+
+        :arg maxsize: Максимальное количество снимков в кэше
+        """
+        self.__maxsize = maxsize
+        self.__items: OrderedDict[Tuple[str, bool], bytes] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(
+        self,
+        content: bytes,
+        strict: bool = False,
+        stats: SolverStats | None = None,
+    ) -> struct.GeneratorData:
+        """Свежие данные генератора для содержимого файла.
+
+        :arg content: Содержимое файла (XML или снимок)
+        :arg strict: Полная проверка настроек через pydantic_xml
+        :arg stats: Показатели для замера этапов (необязательно)
+        :return: Данные генератора
+        """
+        if is_snapshot(content):
+            with measure(stats, Phase.PARSE):
+                return load_snapshot(content)
+        key = (hashlib.sha256(content).hexdigest(), strict)
+        with self.__lock:
+            snapshot = self.__items.get(key)
+            if snapshot is not None:
+                self.__items.move_to_end(key)
+        if snapshot is not None:
+            with measure(stats, Phase.PARSE):
+                return load_snapshot(snapshot)
+        data = compile_settings(content, strict, stats)
+        snapshot = dump_snapshot(data)
+        with self.__lock:
+            self.__items[key] = snapshot
+            self.__items.move_to_end(key)
+            while len(self.__items) > self.__maxsize:
+                self.__items.popitem(last=False)
+        return data
+
+    def clear(self):
+        """Очистка кэша."""
+        with self.__lock:
+            self.__items.clear()
+
+
+# Общий кэш снимков процесса
+snapshot_cache = SnapshotCache()
@@ -0,0 +1,90 @@
+"""Счетчики и замеры времени генератора."""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Dict, List
+
+from src.common.timing import PhaseTimer
+
+
+class Phase(StrEnum):
+    """Этап обработки."""
+
+    PARSE = 'parse'  # Разбор файла настроек или снимка
+    FILL = 'fill'  # Заполнение данных генератора
+    SOLVE = 'solve'  # Расчет расписания
+    SERIALIZE = 'serialize'  # Запись результата
+
+
+class Rejection(StrEnum):
+    """Причина отказа от расстановки в попытке."""
+
+    EXTRA_SUBJECTS = 'extra_subjects'  # Предметы вне учебного плана
+    EXTRA_HOURS = 'extra_hours'  # Часов больше, чем осталось по плану
+    WRONG_DAY = 'wrong_day'  # Предметы не проводятся в этот день
+    NO_SPLIT = 'no_split'  # Часы предмета НеРазделятьПоДням не в один день
+    ONE_GROUP = 'one_group'  # У учителя уже другая группа в смене
+    TEACHER_BUSY = 'teacher_busy'  # Закрепленный преподаватель занят
+    NO_VACANT_TEACHER = 'no_vacant_teacher'  # Некого подобрать из ЛюбыеГруппы
+    NOGOOD = 'nogood'  # Пропущено по кэшу тупиков без проверки
+
+
+@dataclass(slots=True)
+class GroupStats:
+    """Показатели расчета одной группы."""
+
+    efforts: int = 0  # Попыток
+    seconds: float = 0.0  # Время расчета
+    solved: bool = False  # Все часы распределены
+
+
+@dataclass
+class SolverStats(PhaseTimer):
+    """Показатели работы генератора.
+
+    Собираются, только если объект передан генератору: без него
+    в переборе остается одна проверка на None.
+    """
+
+    groups: Dict[str, GroupStats] = field(default_factory=dict)  # По группам
+    rejections: Counter[str] = field(default_factory=Counter)  # Причина -> количество
+
+    @property
+    def efforts(self) -> int:
+        """Всего попыток по всем группам."""
+        return sum(g.efforts for g in self.groups.values())
+
+    @property
+    def unsolved(self) -> List[str]:
+        """Группы, для которых расписание не составлено."""
+        return sorted(k for k, g in self.groups.items() if not g.solved)
+
+    def summary(self) -> Dict[str, object]:
+        """Краткая сводка (без разбивки по группам).
+
+        :return: Показатель -> значение
+        """
+        return {
+            'phases': {k: round(v, 6) for k, v in self.phases.items()},
+            'groups': len(self.groups),
+            'efforts': self.efforts,
+            'rejections': dict(self.rejections),
+            'unsolved': self.unsolved,
+        }
+
+    def to_dict(self) -> Dict[str, object]:
+        """Полные показатели.
+
+        :return: Показатель -> значение
+        """
+        result = self.summary()
+        result['by_group'] = {
+            group_id: {
+                'efforts': g.efforts,
+                'seconds': round(g.seconds, 6),
+                'solved': g.solved,
+            }
+            for group_id, g in sorted(self.groups.items())
+        }
+        return result
@@ -1,12 +1,28 @@
 """Структуры данных для генерации расписания."""
 
 from calendar import Day
-from dataclasses import dataclass
-from enum import IntEnum
-from typing import Dict, List, Set
-
-import src.parsers.schedule as dst
-import src.parsers.settings as src
+from dataclasses import dataclass, field
+from enum import IntEnum, StrEnum
+from typing import (
+    TYPE_CHECKING,
+    BinaryIO,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Set,
+    Tuple,
+    cast,
+)
+
+import src.parsers.exporter as export
+import src.parsers.raw_settings as src
+import src.parsers.serializer as serializer
+import src.parsers.tags as tags
+from src.common.slots import MAX_NPP, Slot, unpack_slot
+
+if TYPE_CHECKING:
+    import src.parsers.schedule as dst
 
 # Номер группы (может включать букву)
 type GroupId = str
@@ -34,13 +50,19 @@ class DayOfWeekInfo:
 
 # Справочник дней недели
 days_of_week: Dict[DayOfWeek, DayOfWeekInfo] = {
-    DayOfWeek.MONDAY: DayOfWeekInfo(day_name='monday', day_description='Понедельник'),
-    DayOfWeek.TUESDAY: DayOfWeekInfo(day_name='tuesday', day_description='Вторник'),
-    DayOfWeek.WEDNESDAY: DayOfWeekInfo(day_name='wednesday', day_description='Среда'),
-    DayOfWeek.THURSDAY: DayOfWeekInfo(day_name='thursday', day_description='Четверг'),
-    DayOfWeek.FRIDAY: DayOfWeekInfo(day_name='friday', day_description='Пятница'),
-    DayOfWeek.SATURDAY: DayOfWeekInfo(day_name='saturday', day_description='Суббота'),
-    DayOfWeek.SUNDAY: DayOfWeekInfo(day_name='sunday', day_description='Воскресенье'),
+    DayOfWeek.MONDAY: DayOfWeekInfo(day_name='monday', day_description=tags.MONDAY),
+    DayOfWeek.TUESDAY: DayOfWeekInfo(day_name='tuesday', day_description=tags.TUESDAY),
+    DayOfWeek.WEDNESDAY: DayOfWeekInfo(
+        day_name='wednesday', day_description=tags.WEDNESDAY
+    ),
+    DayOfWeek.THURSDAY: DayOfWeekInfo(
+        day_name='thursday', day_description=tags.THURSDAY
+    ),
+    DayOfWeek.FRIDAY: DayOfWeekInfo(day_name='friday', day_description=tags.FRIDAY),
+    DayOfWeek.SATURDAY: DayOfWeekInfo(
+        day_name='saturday', day_description=tags.SATURDAY
+    ),
+    DayOfWeek.SUNDAY: DayOfWeekInfo(day_name='sunday', day_description=tags.SUNDAY),
 }
 
 
@@ -52,16 +74,26 @@ class TimeOfDay(IntEnum):
     AFTERNOON = 2  # Вторая смена (вечер)
 
 
-@dataclass(frozen=True)
-class TimeTableKey:
-    """Ключ для расписания."""
+# Справочник смен
+times_of_day: Dict[TimeOfDay, str] = {
+    TimeOfDay.MORNING: tags.MORNING,
+    TimeOfDay.AFTERNOON: tags.AFTERNOON,
+}
 
-    day: DayOfWeek  # День недели
-    time_of_day: TimeOfDay  # Смена
-    npp: int  # Номер урока
 
+def lesson_time(slot: Slot) -> Tuple[DayOfWeek, TimeOfDay, int]:
+    """Распаковка времени урока в день недели и смену справочников.
 
-@dataclass
+    Значения не преобразуются в перечисления: IntEnum совпадает с int
+    при поиске в словаре, а уроков в расписании много.
+
+    :arg slot: Время урока
+    :return: День недели, смена, номер урока
+    """
+    return cast(Tuple[DayOfWeek, TimeOfDay, int], unpack_slot(slot))
+
+
+@dataclass(slots=True)
 class TimeTableInfo:
     """Урок(предмет/группа)."""
 
@@ -69,7 +101,7 @@ class TimeTableInfo:
     group: GroupId  # Группа
 
 
-@dataclass
+@dataclass(slots=True)
 class GroupTimeTableInfo:
     """Урок(предмет/группа)."""
 
@@ -77,14 +109,17 @@ class GroupTimeTableInfo:
     teacher_id: TeacherId  # Учитель
 
 
-# Расписание на день
-type TimeTable = dict[TimeTableKey, TimeTableInfo]
+# Расписание учителя: время урока (slots.make_slot) -> урок
+type TimeTable = dict[Slot, TimeTableInfo]
 
-# Расписание для групп
-type GroupTimeTable = dict[TimeTableKey, GroupTimeTableInfo]
+# Расписание группы: время урока (slots.make_slot) -> урок
+type GroupTimeTable = dict[Slot, GroupTimeTableInfo]
 
+# Урок группы для передачи между процессами: (группа, время, предмет, учитель)
+type Assignment = Tuple[GroupId, Slot, SubjectId, TeacherId]
 
-@dataclass
+
+@dataclass(slots=True)
 class SubjectInfo:
     """Настройки предметов."""
 
@@ -93,7 +128,7 @@ class SubjectInfo:
     one_group: bool  # Одна группа за смену у преподавателя
 
 
-@dataclass
+@dataclass(slots=True)
 class GroupInfo:
     """Параметры группы."""
 
@@ -104,15 +139,14 @@ class GroupInfo:
     time_table: GroupTimeTable  # Расписание
 
 
-@dataclass(frozen=True)
-class CurriculumKey:
+class CurriculumKey(NamedTuple):
     """Ключевые поля программы."""
 
     grade: GradeId  # Класс
     subject: SubjectId  # Предмет
 
 
-@dataclass
+@dataclass(slots=True)
 class CurriculumInfo:
     """Программа."""
 
@@ -120,7 +154,7 @@ class CurriculumInfo:
     days_of_week: set[DayOfWeek]  # Дни недели
 
 
-@dataclass
+@dataclass(slots=True)
 class TeacherSubjectInfo:
     """Предметы, которые ведет учитель."""
 
@@ -128,7 +162,7 @@ class TeacherSubjectInfo:
     groups: set[GroupId]  # Список групп
 
 
-@dataclass
+@dataclass(slots=True)
 class TeacherInfo:
     """Данные учителя."""
 
@@ -137,14 +171,57 @@ class TeacherInfo:
     time_table: TimeTable  # Расписание
 
 
-@dataclass(frozen=True)
-class SubjectAssignmentKey:
+class SubjectAssignmentKey(NamedTuple):
     """Ключ для закрепления учителя за предметом."""
 
     group: GroupId  # Группа
     subject: SubjectId  # Предмет
 
 
+class DayPlanKey(NamedTuple):
+    """Ключ для расстановок, подошедших группам класса в смене."""
+
+    grade: GradeId  # Класс
+    time_of_day: TimeOfDay  # Смена
+
+
+class ShiftSubjectKey(NamedTuple):
+    """Ключ для предмета учителя в смене (ОднаГруппаЗаСмену)."""
+
+    teacher: TeacherId  # Учитель
+    shift: Slot  # День недели и смена (время с нулевым номером урока)
+    subject: SubjectId  # Предмет
+
+
+class PinMode(StrEnum):
+    """Какие уроки прежнего расписания закрепляются."""
+
+    ALL = 'all'  # Все уроки
+    TEACHERS = 'teachers'  # Уроки выбранных преподавателей
+    GROUPS = 'groups'  # Уроки выбранных групп
+
+
+@dataclass
+class PinPolicy:
+    """Закрепление уроков прежнего расписания."""
+
+    mode: PinMode = PinMode.ALL  # Какие уроки закрепляются
+    names: Set[str] = field(default_factory=set)  # ФИО преподавателей или группы
+
+    def pins(self, teacher_name: str, group: GroupId) -> bool:
+        """Урок закрепляется.
+
+        :arg teacher_name: ФИО преподавателя
+        :arg group: Группа
+        :return: Урок остается на своем месте
+        """
+        if self.mode == PinMode.TEACHERS:
+            return teacher_name in self.names
+        if self.mode == PinMode.GROUPS:
+            return group in self.names
+        return True
+
+
 # Предметы
 type Subjects = dict[SubjectId, SubjectInfo]
 # Группы
@@ -156,6 +233,12 @@ type Teachers = dict[TeacherId, TeacherInfo]
 # Закрепление учителя за предметом
 type SubjectAssignment = dict[SubjectAssignmentKey, TeacherId]
 type UnassignedTeachers = dict[SubjectId, List[TeacherId]]
+# Группа, занявшая предмет учителя в смене
+type ShiftSubjectGroups = dict[ShiftSubjectKey, GroupId]
+# Номер расстановки по дням недели (None - в этот день уроков нет)
+type DayPlan = Tuple[int | None, ...]
+# Расстановки по дням, с которыми составлено расписание групп (последние - первыми)
+type DayPlans = dict[DayPlanKey, List[DayPlan]]
 # Допустимый порядок уроков в смене
 type Combination = list[SubjectId]
 type CombinationList = list[Combination]
@@ -198,12 +281,15 @@ class GeneratorData:
         self.subject_assignment: SubjectAssignment = {}  # Закрепление учителя
         self.unassigned_teachers: UnassignedTeachers = {}  # Свободные учителя
         self.combinations: CombinationList = []  # Порядок уроков в смене
+        # Заполняются по мере расчета групп
+        self.shift_subject_groups: ShiftSubjectGroups = {}
+        self.day_plans: DayPlans = {}
 
         # Поиск идентификаторов по имени
         self.subjects_names_unique: Dict[str, SubjectId] = {}
         self.teachers_names_unique: Dict[str, TeacherId] = {}
 
-    def fill_from_source(self, source: src.Settings):
+    def fill_from_source(self, source: src.AnySettings):
         """Заполнение из файла.
 
         :arg source: Данные из файла
@@ -220,7 +306,7 @@ class GeneratorData:
         # Учителя
         self.fill_teachers(source)
 
-    def fill_subjects(self, source: src.Settings):
+    def fill_subjects(self, source: src.AnySettings):
         """Заполнение предметов из файла.
 
         :arg source: Данные из файла
@@ -238,20 +324,23 @@ class GeneratorData:
                 one_group=src.yesno_to_bool(subject.one_group),
             )
 
-    def fill_combinations(self, source: src.Settings):
+    def fill_combinations(self, source: src.AnySettings):
         """Заполнение примерных планов смены.
 
         :arg source: Данные из файла
         """
         for src_combination in source.combinations:
-            self.combinations.append(
-                [
-                    self.subjects_names_unique[comb.strip()]
-                    for comb in src_combination.day_plan.split(',')
-                ],
-            )
+            combination = [
+                self.subjects_names_unique[comb.strip()]
+                for comb in src_combination.day_plan.split(',')
+            ]
+            if len(combination) > MAX_NPP:
+                raise Exception(
+                    f'В плане смены больше {MAX_NPP} уроков: {src_combination.day_plan}'
+                )
+            self.combinations.append(combination)
 
-    def fill_curriculum(self, source: src.Settings):
+    def fill_curriculum(self, source: src.AnySettings):
         """Заполнение учебного плана из файла.
 
         :arg source: Данные из файла
@@ -268,7 +357,7 @@ class GeneratorData:
                     days_of_week=split_days_of_week(src_curriculum.days_of_week),
                 )
 
-    def fill_teachers(self, source: src.Settings):
+    def fill_teachers(self, source: src.AnySettings):
         """Заполнение учителей из файла.
 
         :arg source: Данные из файла
@@ -335,26 +424,29 @@ class GeneratorData:
             fill_occupation()
             self.teachers[teacher_id] = teacher_info
 
-    def write_to_destination(self) -> dst.Schedule:
+    def write_to_destination(self) -> 'dst.Schedule':
         """Сохранение расписания в целевую структуру.
 
         :return dst.Schedule: Целевая структура
         """
+        import src.parsers.schedule as dst
+
         destination = dst.Schedule(teachers=[])
         for _, teacher in self.teachers.items():
             dst_teacher = dst.Teacher(name=teacher.teacher_name)
             for time_table_key, time_table_value in teacher.time_table.items():
+                day, time_of_day, npp = lesson_time(time_table_key)
                 subject_name = self.subjects[time_table_value.subject_id].subject_name
                 lesson = dst.Lesson(
-                    npp=time_table_key.npp,
+                    npp=npp,
                     subject=subject_name,
                     group=time_table_value.group,
                 )
-                day_name = days_of_week[time_table_key.day].day_name
-                if not hasattr(lesson, day_name):
+                day_name = days_of_week[day].day_name
+                if getattr(dst_teacher, day_name) is None:
                     setattr(dst_teacher, day_name, dst.DayOfWeek())
                 dst_day = getattr(dst_teacher, day_name)
-                if time_table_key.time_of_day == TimeOfDay.MORNING:
+                if time_of_day == TimeOfDay.MORNING:
                     if dst_day.morning is None:
                         dst_day.morning = dst.PartOfDay(lessons=[])
                     dst_day.morning.lessons.append(lesson)
@@ -364,3 +456,79 @@ class GeneratorData:
                     dst_day.afternoon.lessons.append(lesson)
             destination.teachers.append(dst_teacher)
         return destination
+
+    def write_xml(self, stream: BinaryIO):
+        """Потоковая запись расписания в XML.
+
+        Схема совпадает с dst.Schedule, уроки упорядочены. Промежуточные
+        модели не создаются.
+
+        :arg stream: Двоичный поток (файл, сокет)
+        """
+        writer = serializer.XmlStreamWriter(stream)
+        writer.start(tags.SCHEDULE)
+        for teacher in self.teachers.values():
+            teacher_attrs = ((tags.TEACHER_NAME, teacher.teacher_name),)
+            time_table = teacher.time_table
+            if not time_table:
+                writer.empty(tags.TEACHER, teacher_attrs)
+                continue
+            writer.start(tags.TEACHER, teacher_attrs)
+            day_tag = ''
+            part_tag = ''
+            # Порядок ключей - день недели, смена, номер урока
+            for tt_key in sorted(time_table):
+                tt_info = time_table[tt_key]
+                day, time_of_day, npp = lesson_time(tt_key)
+                new_day_tag = days_of_week[day].day_description
+                new_part_tag = times_of_day[time_of_day]
+                if new_day_tag != day_tag:
+                    if part_tag:
+                        writer.end(part_tag)
+                    if day_tag:
+                        writer.end(day_tag)
+                    day_tag = new_day_tag
+                    part_tag = ''
+                    writer.start(day_tag)
+                if new_part_tag != part_tag:
+                    if part_tag:
+                        writer.end(part_tag)
+                    part_tag = new_part_tag
+                    writer.start(part_tag)
+                writer.empty(
+                    tags.LESSON,
+                    (
+                        (tags.LESSON_NPP, str(npp)),
+                        (
+                            tags.LESSON_SUBJECT,
+                            self.subjects[tt_info.subject_id].subject_name,
+                        ),
+                        (tags.LESSON_GROUP, tt_info.group),
+                    ),
+                )
+            writer.end(part_tag)
+            writer.end(day_tag)
+            writer.end(tags.TEACHER)
+        writer.end(tags.SCHEDULE)
+        writer.flush()
+
+    def lesson_rows(self) -> Iterator[export.LessonRow]:
+        """Расписание в виде плоской таблицы.
+
+        Уроки упорядочены по учителю, дню недели, смене и номеру урока.
+
+        :return: Уроки
+        """
+        for teacher in self.teachers.values():
+            time_table = teacher.time_table
+            for tt_key in sorted(time_table):
+                tt_info = time_table[tt_key]
+                day, time_of_day, npp = lesson_time(tt_key)
+                yield (
+                    teacher.teacher_name,
+                    tt_info.group,
+                    self.subjects[tt_info.subject_id].subject_name,
+                    days_of_week[day].day_description,
+                    times_of_day[time_of_day],
+                    npp,
+                )
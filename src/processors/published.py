@@ -0,0 +1,145 @@
+"""Опубликованные расписания: индексы для запросов из памяти."""
+
+import hashlib
+import json
+import threading
+from enum import StrEnum
+from typing import Dict, Iterable, List, Tuple
+
+import src.parsers.tags as tags
+from src.parsers.exporter import LessonRow, row_to_dict
+
+# pydantic_xml загружается при первой публикации, а не при запуске сервера
+
+# Порядок дней недели и смен в ответе
+DAY_ORDER: Dict[str, int] = {tag: n for n, tag in enumerate(tags.DAYS)}
+PART_ORDER: Dict[str, int] = {tag: n for n, tag in enumerate(tags.PARTS)}
+
+
+class QueryKind(StrEnum):
+    """Разрез расписания."""
+
+    TEACHER = 'teacher'  # По преподавателю
+    GROUP = 'group'  # По группе
+
+
+# Уроки по дням: день недели -> уроки (по смене и номеру урока)
+type DayLessons = Dict[str, List[LessonRow]]
+
+# Готовый ответ: (тело JSON, ETag)
+type RenderedAnswer = Tuple[bytes, str]
+
+
+def lesson_order(row: LessonRow) -> Tuple[int, int, int]:
+    """Порядок уроков: день недели, смена, номер урока.
+
+    :arg row: Урок
+    :return: Ключ сортировки
+    """
+    return DAY_ORDER[row[3]], PART_ORDER[row[4]], row[5]
+
+
+class ScheduleIndex:
+    """Расписание, разложенное по преподавателям и группам.
+
+    Индекс не меняется после построения, поэтому готовые ответы
+    хранятся вместе с ним и исчезают при замене расписания.
+    """
+
+    def __init__(self, rows: Iterable[LessonRow], version: str):
+        """Инициализация.
+
+        :arg rows: Уроки
+        :arg version: Версия расписания (хэш содержимого)
+        """
+        self.version = version
+        self.lessons: Dict[QueryKind, Dict[str, DayLessons]] = {
+            QueryKind.TEACHER: {},
+            QueryKind.GROUP: {},
+        }
+        for row in sorted(rows, key=lesson_order):
+            for kind, key in ((QueryKind.TEACHER, row[0]), (QueryKind.GROUP, row[1])):
+                self.lessons[kind].setdefault(key, {}).setdefault(row[3], []).append(
+                    row
+                )
+        self.__rendered: Dict[Tuple[QueryKind, str, str | None], RenderedAnswer] = {}
+
+    def render(
+        self,
+        kind: QueryKind,
+        key: str,
+        day: str | None = None,
+    ) -> RenderedAnswer | None:
+        """Уроки преподавателя или группы в формате JSON.
+
+        :arg kind: Разрез расписания
+        :arg key: ФИО преподавателя или группа
+        :arg day: День недели (None - вся неделя)
+        :return: Ответ (None - преподавателя или группы нет в расписании)
+        """
+        cache_key = (kind, key, day)
+        answer = self.__rendered.get(cache_key)
+        if answer is not None:
+            return answer
+        days = self.lessons[kind].get(key)
+        if days is None:
+            return None
+        if day is None:
+            rows = [row for day_rows in days.values() for row in day_rows]
+        else:
+            rows = days.get(day, [])
+        body = json.dumps(
+            [row_to_dict(row) for row in rows], ensure_ascii=False
+        ).encode('utf-8')
+        etag = f'"{self.version}-{hashlib.sha256(body).hexdigest()[:16]}"'
+        answer = (body, etag)
+        # Гонка потоков безопасна: оба посчитают одинаковый ответ
+        self.__rendered[cache_key] = answer
+        return answer
+
+
+class PublishedSchedules:
+    """Опубликованные расписания процесса."""
+
+    def __init__(self):
+        """Инициализация."""
+        self.__indexes: Dict[str, ScheduleIndex] = {}
+        self.__lock = threading.Lock()
+
+    def publish(self, schedule_id: str, content: bytes) -> ScheduleIndex:
+        """Публикация (или замена) расписания.
+
+        Индекс строится до замены: запросы видят либо прежнее,
+        либо новое расписание целиком.
+
+        :arg schedule_id: Идентификатор расписания
+        :arg content: Файл расписания XML
+        :return: Индекс
+        """
+        import src.parsers.schedule as schedule
+
+        src_data = schedule.parse_schedule(content.decode('utf-8'))
+        index = ScheduleIndex(
+            schedule.schedule_rows(src_data),
+            hashlib.sha256(content).hexdigest()[:16],
+        )
+        with self.__lock:
+            self.__indexes[schedule_id] = index
+        return index
+
+    def get(self, schedule_id: str) -> ScheduleIndex | None:
+        """Индекс опубликованного расписания.
+
+        :arg schedule_id: Идентификатор расписания
+        :return: Индекс (None - не опубликовано)
+        """
+        return self.__indexes.get(schedule_id)
+
+    def clear(self):
+        """Удаление всех расписаний."""
+        with self.__lock:
+            self.__indexes.clear()
+
+
+# Расписания, опубликованные в этом процессе
+published_schedules = PublishedSchedules()
@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.api.admission import AdmissionLimiter
+
+
+@pytest.mark.asyncio
+async def test_limiter_rejects_when_queue_full():
+    limiter = AdmissionLimiter('test', concurrency=1, queue_size=1)
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot():
+            started.set()
+            await release.wait()
+
+    running = asyncio.create_task(hold())
+    await started.wait()
+    queued = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    assert limiter.stats()['waiting'] == 1
+    with pytest.raises(HTTPException) as err:
+        async with limiter.slot():
+            pass
+    assert err.value.status_code == 429
+    assert int(err.value.headers['Retry-After']) >= 1
+    release.set()
+    await asyncio.gather(running, queued)
+    assert limiter.stats()['admitted'] == 2
+    assert limiter.stats()['rejected'] == 1
@@ -1,10 +1,22 @@
+import asyncio
+import gzip
+import json
+
 import pytest
 
-from httpx import AsyncClient, ASGITransport
+from httpx import AsyncClient, ASGITransport, Request
+from starlette.responses import PlainTextResponse
 
-from src.main import app
+import src.common.constants as constants
+from src.api.compression import DecompressRequestMiddleware
+import src.parsers.exporter as exporter
+from src.main import app, lifespan
 from src.common.constants import (TESTFILE_PATH, XLSX_MIME_TYPE,
-                                  FILE_MIME_TYPE,FILE_EXTENSION)
+                                  FILE_MIME_TYPE,FILE_EXTENSION,
+                                  SNAPSHOT_EXTENSION, SNAPSHOT_MIME_TYPE)
+from src.processors.generator.generator import Generator
+from src.processors.generator.pool import generator_pool
+from src.processors.generator.snapshot import compile_settings, dump_snapshot
 
 
 @pytest.mark.integration_test
@@ -18,6 +30,45 @@ async def test_api_generate_status_ok():
                             base_url='http://test')) as ac:
         response= await ac.post(url='/api/v1/generate/',files=files_to_upload)
     assert response.status_code == 200
+    assert 'X-Generator-Stats' not in response.headers
+
+@pytest.mark.integration_test
+@pytest.mark.asyncio
+async def test_api_generate_stats_on_request():
+    files_to_upload = [
+        ('files', ('source' + FILE_EXTENSION, open(TESTFILE_PATH.joinpath(
+            'settings' + FILE_EXTENSION), 'rb'), FILE_MIME_TYPE)),
+    ]
+    async with (AsyncClient(transport=ASGITransport(app=app),
+                            base_url='http://test')) as ac:
+        response= await ac.post(url='/api/v1/generate/',
+                                params={'stats': True},
+                                files=files_to_upload)
+    assert response.status_code == 200
+    assert json.loads(response.headers['X-Generator-Stats'])['groups']
+
+@pytest.mark.integration_test
+@pytest.mark.asyncio
+async def test_api_generate_in_process_pool(monkeypatch):
+    # Расчет в потоке сервера в этом тесте не допускается
+    monkeypatch.setattr(Generator, 'process_data', None)
+    # Пул процессов запускается только при старте приложения (lifespan)
+    async with lifespan(app):
+        assert generator_pool.running
+        files_to_upload = [
+            ('files', ('source' + FILE_EXTENSION, open(TESTFILE_PATH.joinpath(
+                'settings' + FILE_EXTENSION), 'rb'), FILE_MIME_TYPE)),
+        ]
+        async with (AsyncClient(transport=ASGITransport(app=app),
+                                base_url='http://test')) as ac:
+            response= await ac.post(url='/api/v1/generate/',
+                                    params={'starts': 2, 'stats': True},
+                                    files=files_to_upload)
+    assert not generator_pool.running
+    assert response.status_code == 200
+    assert response.content
+    stats = json.loads(response.headers['X-Generator-Stats'])
+    assert stats['groups'] and not stats['unsolved']
 
 @pytest.mark.integration_test
 @pytest.mark.asyncio
@@ -45,3 +96,246 @@ async def test_api_excel_status_ok():
         response= await ac.post(url='/api/v1/excel/',files=files_to_upload)
     assert response.status_code == 200
 
+
+@pytest.mark.integration_test
+@pytest.mark.asyncio
+async def test_api_excel_default_template_status_ok():
+    files_to_upload = [
+        ('files', ('source' + FILE_EXTENSION, open(TESTFILE_PATH.joinpath(
+            'schedule' + FILE_EXTENSION), 'rb'), FILE_MIME_TYPE)),
+    ]
+    async with (AsyncClient(transport=ASGITransport(app=app),
+                            base_url='http://test')) as ac:
+        response= await ac.post(url='/api/v1/excel/',files=files_to_upload)
+    assert response.status_code == 200
+
+@pytest.mark.integration_test
+@pytest.mark.asyncio
+@pytest.mark.parametrize('export_format', ['jsonl', 'csv', 'columns'])
+async def test_api_generate_flat_format_status_ok(export_format):
+    files_to_upload = [
+        ('files', ('source' + FILE_EXTENSION, open(TESTFILE_PATH.joinpath(
+            'settings' + FILE_EXTENSION), 'rb'), FILE_MIME_TYPE)),
+    ]
+    async with (AsyncClient(transport=ASGITransport(app=app),
+                            base_url='http://test')) as ac:
+        response= await ac.post(url='/api/v1/generate/',
+                                params={'format': export_format},
+                                files=files_to_upload)
+    assert response.status_code == 200
+    assert response.content
+
+@pytest.mark.integration_test
+@pytest.mark.asyncio
+async def test_api_generate_parquet_without_pyarrow(monkeypatch):
+    monkeypatch.setattr(exporter, 'find_spec', lambda name: None)
+    files_to_upload = [
+        ('files', ('source' + FILE_EXTENSION, open(TESTFILE_PATH.joinpath(
+            'settings' + FILE_EXTENSION), 'rb'), FILE_MIME_TYPE)),
+    ]
+    async with (AsyncClient(transport=ASGITransport(app=app),
+                            base_url='http://test')) as ac:
+        response= await ac.post(url='/api/v1/generate/',
+                                params={'format': 'parquet'},
+                                files=files_to_upload)
+    assert response.status_code == 400
+    assert 'pyarrow' in response.json()['detail']
+
+@pytest.mark.integration_test
+@pytest.mark.asyncio
+async def test_api_generate_from_snapshot_status_ok():
+    data = compile_settings(TESTFILE_PATH.joinpath(
+        'settings' + FILE_EXTENSION).read_bytes())
+    files_to_upload = [
+        ('files', ('source' + SNAPSHOT_EXTENSION, dump_snapshot(data),
+                   SNAPSHOT_MIME_TYPE)),
+    ]
+    async with (AsyncClient(transport=ASGITransport(app=app),
+                            base_url='http://test')) as ac:
+        response= await ac.post(url='/api/v1/generate/',files=files_to_upload)
+    assert response.status_code == 200
+
+
+@pytest.mark.integration_test
+@pytest.mark.asyncio
+async def test_api_generate_gzip_and_not_modified():
+    files_to_upload = [
+        ('files', ('source' + FILE_EXTENSION, open(TESTFILE_PATH.joinpath(
+            'settings' + FILE_EXTENSION), 'rb'), FILE_MIME_TYPE)),
+    ]
+    # Сжатое тело запроса
+    request = Request('POST', 'http://test/api/v1/generate/',
+                      files=files_to_upload)
+    body = gzip.compress(request.read())
+    headers = {'Content-Type': request.headers['Content-Type'],
+               'Content-Encoding': 'gzip', 'Accept-Encoding': 'gzip'}
+    async with (AsyncClient(transport=ASGITransport(app=app),
+                            base_url='http://test')) as ac:
+        response = await ac.post(url='/api/v1/generate/', content=body,
+                                 headers=headers)
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        etag = response.headers['ETag']
+        response = await ac.post(url='/api/v1/generate/', content=body,
+                                 headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        response = await ac.post(url='/api/v1/generate/', content=body,
+                                 headers={**headers, 'If-None-Match': '*'})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_decompress_request_limits_inflated_size():
+    async def echo(scope, receive, send):
+        body = (await receive())['body']
+        await PlainTextResponse(str(len(body)))(scope, receive, send)
+
+    limited = DecompressRequestMiddleware(echo, max_size=1000)
+    headers = {'Content-Encoding': 'gzip'}
+    async with (AsyncClient(transport=ASGITransport(app=limited),
+                            base_url='http://test')) as ac:
+        response = await ac.post(url='/', content=gzip.compress(b'0' * 1000),
+                                 headers=headers)
+        assert response.text == '1000'
+        response = await ac.post(url='/', content=gzip.compress(b'0' * 10**7),
+                                 headers=headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.integration_test
+@pytest.mark.asyncio
+async def test_api_metrics_and_server_timing():
+    files_to_upload = [
+        ('files', ('source' + FILE_EXTENSION, open(TESTFILE_PATH.joinpath(
+            'schedule' + FILE_EXTENSION), 'rb'), FILE_MIME_TYPE)),
+    ]
+    async with (AsyncClient(transport=ASGITransport(app=app),
+                            base_url='http://test')) as ac:
+        response = await ac.post(url='/api/v1/check/', files=files_to_upload)
+        assert 'compute;dur=' in response.headers['Server-Timing']
+        response = await ac.get(url='/metrics')
+    assert response.status_code == 200
+    assert ('http_request_duration_seconds_count'
+            '{endpoint="/api/v1/check/",method="POST"}') in response.text
+
+
+@pytest.mark.integration_test
+@pytest.mark.asyncio
+async def test_api_check_profile(monkeypatch, tmp_path):
+    monkeypatch.setattr(constants, 'PROFILE_TOKEN', 'secret')
+    monkeypatch.setattr(constants, 'PROFILE_DIR', tmp_path)
+    files_to_upload = [
+        ('files', ('source' + FILE_EXTENSION, open(TESTFILE_PATH.joinpath(
+            'schedule' + FILE_EXTENSION), 'rb'), FILE_MIME_TYPE)),
+    ]
+    async with (AsyncClient(transport=ASGITransport(app=app),
+                            base_url='http://test')) as ac:
+        response = await ac.post(url='/api/v1/check/?profile=true',
+                                 files=files_to_upload)
+        assert response.status_code == 403
+        headers = {'X-Profile': '1', 'X-Profile-Token': 'secret'}
+        response = await ac.post(url='/api/v1/check/', files=files_to_upload,
+                                 headers=headers)
+        assert response.status_code == 200
+        profile_id = response.headers['X-Profile-Id']
+        response = await ac.get(url=f'/api/v1/profile/{profile_id}',
+                                headers=headers)
+    assert response.status_code == 200
+    assert response.content
+
+
+@pytest.mark.integration_test
+@pytest.mark.asyncio
+async def test_api_concurrent_profiles(monkeypatch, tmp_path):
+    monkeypatch.setattr(constants, 'PROFILE_TOKEN', 'secret')
+    monkeypatch.setattr(constants, 'PROFILE_DIR', tmp_path)
+    content = TESTFILE_PATH.joinpath('settings' + FILE_EXTENSION).read_bytes()
+    headers = {'X-Profile': '1', 'X-Profile-Token': 'secret'}
+    async with (AsyncClient(transport=ASGITransport(app=app),
+                            base_url='http://test')) as ac:
+        responses = await asyncio.gather(*(
+            ac.post(url='/api/v1/generate/', headers=headers,
+                    files=[('files', ('source' + FILE_EXTENSION, content,
+                                      FILE_MIME_TYPE))])
+            for _ in range(4)
+        ))
+    assert [r.status_code for r in responses] == [200] * 4
+    assert len({r.headers['X-Profile-Id'] for r in responses}) == 4
+
+
+@pytest.mark.integration_test
+@pytest.mark.asyncio
+async def test_api_diff_same_schedule_is_empty():
+    schedule_path = TESTFILE_PATH.joinpath('schedule' + FILE_EXTENSION)
+    files_to_upload = [
+        ('files', ('base' + FILE_EXTENSION, open(schedule_path, 'rb'),
+                   FILE_MIME_TYPE)),
+        ('files', ('source' + FILE_EXTENSION, open(schedule_path, 'rb'),
+                   FILE_MIME_TYPE)),
+    ]
+    async with (AsyncClient(transport=ASGITransport(app=app),
+                            base_url='http://test')) as ac:
+        response = await ac.post(url='/api/v1/diff/', files=files_to_upload)
+    assert response.status_code == 200
+    assert json.loads(response.json()) == {'Преподаватели': {}, 'Группы': {}}
+
+
+@pytest.mark.integration_test
+@pytest.mark.asyncio
+async def test_api_published_schedule_queries():
+    files_to_upload = [
+        ('files', ('source' + FILE_EXTENSION, open(TESTFILE_PATH.joinpath(
+            'schedule' + FILE_EXTENSION), 'rb'), FILE_MIME_TYPE)),
+    ]
+    async with (AsyncClient(transport=ASGITransport(app=app),
+                            base_url='http://test')) as ac:
+        response = await ac.put(url='/api/v1/schedule/test', files=files_to_upload)
+        assert response.status_code == 200
+        response = await ac.get(url='/api/v1/schedule/test/group/22',
+                                params={'day': 'Понедельник'})
+        assert response.status_code == 200
+        lessons = response.json()
+        assert lessons and {x['День'] for x in lessons} == {'Понедельник'}
+        assert [x['Номер'] for x in lessons] == sorted(x['Номер'] for x in lessons)
+        response = await ac.get(url='/api/v1/schedule/test/group/22',
+                                params={'day': 'Понедельник'},
+                                headers={'If-None-Match': response.headers['ETag']})
+        assert response.status_code == 304
+        response = await ac.get(url='/api/v1/schedule/test/teacher/Первый А.Б.')
+        assert response.status_code == 200
+        assert {x['Преподаватель'] for x in response.json()} == {'Первый А.Б.'}
+        response = await ac.get(url='/api/v1/schedule/unknown/group/22')
+    assert response.status_code == 404
+
+
+@pytest.mark.integration_test
+@pytest.mark.asyncio
+async def test_api_stored_schedule(monkeypatch, tmp_path):
+    from src.common.repository import repository
+    monkeypatch.setattr(repository, 'path', tmp_path.joinpath('schedule.sqlite3'))
+    files_to_upload = [
+        ('files', ('source' + FILE_EXTENSION, open(TESTFILE_PATH.joinpath(
+            'settings' + FILE_EXTENSION), 'rb'), FILE_MIME_TYPE)),
+    ]
+    async with (AsyncClient(transport=ASGITransport(app=app),
+                            base_url='http://test')) as ac:
+        response = await ac.post(url='/api/v1/generate/',
+                                 params={'store': 'true'}, files=files_to_upload)
+        assert response.status_code == 200
+        schedule_id = response.headers['X-Schedule-Id']
+        response = await ac.get(
+            url=f'/api/v1/stored/schedules/{schedule_id}/lessons',
+            params={'day': 'Понедельник'})
+        assert response.status_code == 200
+        assert {x['День'] for x in response.json()} == {'Понедельник'}
+        response = await ac.get(url=f'/api/v1/stored/schedules/{schedule_id}/check')
+        assert json.loads(response.json()) == {'Статус': 'ОК'}
+        for _ in range(2):
+            response = await ac.get(
+                url=f'/api/v1/stored/schedules/{schedule_id}/excel')
+            assert response.status_code == 200
+        from src.processors.excel import template_cache
+        assert repository.workbook(int(schedule_id),
+                                   template_cache.default().digest) == response.content
+        response = await ac.get(url='/api/v1/stored/schedules/999/check')
+    assert response.status_code == 404
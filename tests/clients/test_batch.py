@@ -0,0 +1,26 @@
+import shutil
+import sys
+from pathlib import Path
+
+import src.clients.batch as batch
+from src.cli import check_arguments, local_client, parse_arguments
+from src.common.constants import TESTFILE_PATH
+
+
+def test_batch_generate_collects_failures(tmp_path: Path, monkeypatch):
+    src_dir = tmp_path.joinpath('in')
+    src_dir.mkdir()
+    shutil.copy(TESTFILE_PATH.joinpath('settings.xml'), src_dir.joinpath('a.xml'))
+    src_dir.joinpath('b.xml').write_text('<Настройки>', encoding='utf-8')
+    monkeypatch.setattr(sys, 'argv', [
+        'cli', '-n', '-l', '-g', '-f', 'csv',
+        '-s', str(src_dir), '-d', str(tmp_path.joinpath('out'))])
+    arg_val = parse_arguments()
+    check_arguments(arg_val)
+
+    results = batch.run_batch(local_client, arg_val)
+
+    assert [r.status for r in results] == [batch.STATUS_OK, batch.STATUS_FAILED]
+    assert tmp_path.joinpath('out', 'a.csv').exists()
+    batch.write_report(results, tmp_path.joinpath('report.json'))
+    assert '"failures"' in tmp_path.joinpath('report.json').read_text(encoding='utf-8')
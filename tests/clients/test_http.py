@@ -0,0 +1,38 @@
+import pytest
+import requests
+
+from src.clients.http import HttpClient, UploadPart
+from src.common.constants import FILE_MIME_TYPE, TESTFILE_PATH
+
+
+def failing_client(monkeypatch, error: Exception) -> tuple[HttpClient, list]:
+    client = HttpClient(retries=3, backoff=0)
+    calls = []
+
+    def fail(*args, **kwargs):
+        calls.append(args)
+        raise error
+
+    monkeypatch.setattr(client.session, 'post', fail)
+    monkeypatch.setattr(client.session, 'get', fail)
+    return client, calls
+
+
+def test_post_not_repeated_after_read_timeout(monkeypatch):
+    parts = [UploadPart('source.xml', TESTFILE_PATH.joinpath('settings.xml'),
+                        FILE_MIME_TYPE)]
+    client, calls = failing_client(monkeypatch, requests.ReadTimeout())
+    with pytest.raises(requests.ReadTimeout):
+        client.post_files('http://test/api/v1/generate/', parts)
+    # Расчет мог уже идти на сервере: повтора нет
+    assert len(calls) == 1
+
+    client, calls = failing_client(monkeypatch, requests.ConnectTimeout())
+    with pytest.raises(requests.ConnectTimeout):
+        client.post_files('http://test/api/v1/generate/', parts)
+    assert len(calls) == 4
+
+    client, calls = failing_client(monkeypatch, requests.ReadTimeout())
+    with pytest.raises(requests.ReadTimeout):
+        client.get('http://test/api/v1/stored/schedules/1/check')
+    assert len(calls) == 4
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from src.common.constants import FILE_EXTENSION
+from src.common.slots import MAX_NPP, make_slot
+from src.processors.checker import Checker
+
+SCHEDULE = """<Расписание>
+	<Преподаватель ФИО="Первый А.Б.">
+		<Понедельник>
+			<Утро>
+				<Урок Номер="{morning}" Предмет="Живопись" Группа="22"/>
+			</Утро>
+			<Вечер>
+				<Урок Номер="0" Предмет="Рисунок" Группа="22"/>
+			</Вечер>
+		</Понедельник>
+	</Преподаватель>
+	<Преподаватель ФИО="Второй В.Г.">
+		<Понедельник>
+			<Утро>
+				<Урок Номер="1" Предмет="Рисунок" Группа="22"/>
+			</Утро>
+		</Понедельник>
+	</Преподаватель>
+</Расписание>
+"""
+
+
+def check(tmp_path, morning):
+    src_path = tmp_path.joinpath('schedule' + FILE_EXTENSION)
+    src_path.write_text(SCHEDULE.format(morning=morning), encoding='utf-8')
+    return json.loads(Checker().process(src_path))
+
+
+def test_large_lesson_number_does_not_overlap_next_part(tmp_path):
+    # Урок 64 утром не совпадает с уроком 0 вечером
+    assert check(tmp_path, MAX_NPP + 1) == {'Статус': 'ОК'}
+    assert check(tmp_path, -1) == {'Статус': 'ОК'}
+    assert len(check(tmp_path, 1)['Ошибки']) == 1
+
+
+def test_make_slot_rejects_out_of_range():
+    for day, part, npp in ((0, 0, MAX_NPP + 1), (0, 0, -1), (0, 4, 0), (7, 0, 0)):
+        with pytest.raises(Exception, match='вне диапазона'):
+            make_slot(day, part, npp)
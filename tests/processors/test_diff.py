@@ -0,0 +1,45 @@
+import json
+
+from src.common.constants import TESTFILE_PATH, FILE_EXTENSION
+from src.parsers.schedule import Lesson, parse_schedule
+from src.parsers.serializer import seralizer
+from src.processors.diff import Differ, diff_rows, diff_schedules
+
+
+def test_diff_finds_added_removed_and_moved_lessons(tmp_path):
+    old_path = TESTFILE_PATH.joinpath('schedule' + FILE_EXTENSION)
+    old = parse_schedule(old_path.read_text(encoding='utf-8'))
+    new = old.model_copy(deep=True)
+    morning = new.teachers[0].monday.morning.lessons
+    morning[0].npp = 7  # Перенос урока
+    removed = morning.pop(1)  # Отмена урока
+    morning.append(Lesson(npp=8, subject='Рисунок', group='99'))
+
+    changes = diff_schedules(old, new)
+    assert [row[5] for row in changes.removed] == [removed.npp]
+    assert [row[1:] for row in changes.added] == [
+        ('99', 'Рисунок', 'Понедельник', 'Утро', 8)]
+    assert [(was[5], now[5]) for was, now in changes.moved] == [(1, 7)]
+    assert not diff_schedules(old, old)
+
+    new_path = tmp_path.joinpath('new' + FILE_EXTENSION)
+    new_path.write_bytes(seralizer(new))
+    report = json.loads(Differ().process(old_path, new_path))
+    teacher = report['Преподаватели'][new.teachers[0].name]
+    assert len(teacher['Перенесено']) == 1
+    assert report['Группы']['99']['Добавлено'][0]['Номер'] == 8
+
+
+def test_diff_keeps_teacher_groups_in_one_slot():
+    lesson_a = ('Первый А.Б.', '1А', 'Рисунок', 'Понедельник', 'Утро', 1)
+    lesson_b = ('Первый А.Б.', '1Б', 'Рисунок', 'Понедельник', 'Утро', 1)
+    # Вторая группа в то же время у того же учителя
+    changes = diff_rows([lesson_a], [lesson_a, lesson_b])
+    assert changes.added == [lesson_b]
+    assert not changes.removed and not changes.moved
+    # Отмена одного из двух уроков
+    changes = diff_rows([lesson_a, lesson_b], [lesson_b])
+    assert changes.removed == [lesson_a]
+    assert not changes.added and not changes.moved
+    # Порядок уроков в файле не важен
+    assert not diff_rows([lesson_b, lesson_a], [lesson_a, lesson_b])
@@ -0,0 +1,191 @@
+from io import BytesIO
+
+import pytest
+
+from src.common.constants import TESTFILE_PATH, FILE_EXTENSION
+from src.common.slots import make_slot, slot_day, slot_shift
+from src.parsers.schedule import parse_schedule
+from src.parsers.settings import parse_settings, parse_settings_fast
+import src.processors.generator.structures as struct
+from src.processors.generator.generator import Generator, shuffle_pattern
+from src.processors.generator.nogood import NogoodCache
+from src.processors.generator.snapshot import dump_snapshot, load_snapshot
+from src.processors.generator.stats import Phase, SolverStats
+
+
+def filled_data() -> struct.GeneratorData:
+    data = struct.GeneratorData()
+    data.fill_from_source(parse_settings(TESTFILE_PATH.joinpath(
+        'settings' + FILE_EXTENSION).read_text(encoding='utf-8')))
+    return data
+
+
+def test_write_xml_keeps_all_lessons_sorted():
+    data = filled_data()
+    time_table = data.teachers[1].time_table
+    for day, time_of_day, npp in [(struct.DayOfWeek.TUESDAY, struct.TimeOfDay.MORNING, 2),
+                                  (struct.DayOfWeek.MONDAY, struct.TimeOfDay.AFTERNOON, 1),
+                                  (struct.DayOfWeek.TUESDAY, struct.TimeOfDay.MORNING, 1),
+                                  (struct.DayOfWeek.MONDAY, struct.TimeOfDay.MORNING, 3)]:
+        time_table[make_slot(day, time_of_day, npp)] = struct.TimeTableInfo(
+            subject_id=1, group='1"А')
+    stream = BytesIO()
+    data.write_xml(stream)
+
+    teacher = parse_schedule(stream.getvalue().decode('utf-8')).teachers[0]
+    assert teacher.name == data.teachers[1].teacher_name
+    assert [x.npp for x in teacher.monday.morning.lessons] == [3]
+    assert [x.npp for x in teacher.monday.afternoon.lessons] == [1]
+    assert [x.npp for x in teacher.tuesday.morning.lessons] == [1, 2]
+    assert teacher.tuesday.afternoon is None
+    assert teacher.tuesday.morning.lessons[0].group == '1"А'
+    assert teacher.wednesday is None
+    assert list(data.lesson_rows())[0][3:] == ('Понедельник', 'Утро', 3)
+
+
+def test_fast_settings_fill_matches_strict():
+    content = TESTFILE_PATH.joinpath('settings' + FILE_EXTENSION).read_bytes()
+    fast = struct.GeneratorData()
+    fast.fill_from_source(parse_settings_fast(content))
+    assert vars(fast) == vars(filled_data())
+
+
+def test_fast_settings_rejects_other_root():
+    content = TESTFILE_PATH.joinpath('schedule' + FILE_EXTENSION).read_bytes()
+    with pytest.raises(Exception, match='неверный формат'):
+        parse_settings_fast(content)
+
+
+def test_snapshot_roundtrip():
+    data = filled_data()
+    restored = load_snapshot(dump_snapshot(data))
+    assert vars(restored) == vars(data)
+
+
+def test_generator_collects_stats(tmp_path):
+    stats = SolverStats()
+    gen = Generator(stats=stats)
+    gen.process(TESTFILE_PATH.joinpath('settings' + FILE_EXTENSION),
+                tmp_path.joinpath('schedule' + FILE_EXTENSION))
+    assert set(stats.phases) == set(Phase)
+    assert set(stats.groups) == set(filled_data().groups)
+    assert stats.efforts >= len(stats.groups)
+
+
+def test_nogood_cache_proves_group_infeasible():
+    all_days = set(struct.DayOfWeek)
+    nogoods = NogoodCache({1: struct.CurriculumInfo(hours=10, days_of_week=all_days)},
+                          [[1, 1]])
+    used = frozenset({0})
+    nogoods.learn([frozenset()] + [used] * len(all_days))
+    # Пустой понедельник еще не проверен
+    assert not nogoods.is_dead(0, frozenset())
+    # Следующая попытка пропускает расстановку во все дни
+    nogoods.learn([frozenset()] * (len(all_days) + 1))
+    assert nogoods.is_dead(0, frozenset())
+
+
+def test_nogood_cache_keeps_empty_day_open():
+    days = {struct.DayOfWeek.MONDAY, struct.DayOfWeek.TUESDAY}
+    nogoods = NogoodCache({1: struct.CurriculumInfo(hours=2, days_of_week=days)},
+                          [[1], [1, 1], [2], [2, 2], [2, 2, 2], [2, 1, 2]])
+    # Учитель занят в понедельник на втором уроке
+    nogoods.reject(struct.DayOfWeek.MONDAY, 1)
+    # Один час в понедельник: во вторник второй час не поставить
+    used = frozenset({0})
+    nogoods.learn([frozenset(), used] + [used] * (len(struct.DayOfWeek) - 1))
+    assert nogoods.is_dead(1, used)
+    # Пустой понедельник и два часа во вторник - решение
+    assert not nogoods.is_dead(0, frozenset())
+
+
+def test_generator_keeps_no_split_and_one_group(tmp_path):
+    data = filled_data()
+    Generator(data).process_data(tmp_path.joinpath('schedule' + FILE_EXTENSION))
+    for group in data.groups.values():
+        days = {}
+        for key, info in group.time_table.items():
+            days.setdefault(info.subject_id, set()).add(slot_day(key))
+        for subject_id, subject_days in days.items():
+            if data.subjects[subject_id].no_split:
+                assert len(subject_days) == 1
+    for teacher in data.teachers.values():
+        shift_groups = {}
+        for key, info in teacher.time_table.items():
+            if data.subjects[info.subject_id].one_group:
+                shift_groups.setdefault(
+                    (slot_shift(key), info.subject_id), set()).add(info.group)
+        assert all(len(groups) == 1 for groups in shift_groups.values())
+
+
+def test_pool_applies_best_start():
+    from src.processors.generator.pool import GeneratorPool
+
+    stats = SolverStats()
+    gen = Generator(filled_data(), stats)
+    pool = GeneratorPool(2)
+    pool.start()
+    try:
+        pool.solve(gen, starts=3)
+        # Повторный запрос берет снимок из общей памяти
+        again = Generator(filled_data())
+        pool.solve(again, starts=1)
+    finally:
+        pool.shutdown()
+    assert not stats.unsolved
+    assert Phase.SOLVE in stats.phases
+    rows = list(gen.lesson_rows())
+    assert rows and len(rows) == len(gen.assignments())
+    assert list(again.lesson_rows())
+
+
+def test_day_plans_reused_for_parallel_groups():
+    data = filled_data()
+    stats = SolverStats()
+    gen = Generator(data, stats)
+    gen.make_time_table()
+    assert data.day_plans
+    for key, patterns in data.day_plans.items():
+        comb_days = gen.combination_days(key.grade)
+        for pattern in patterns:
+            assert len(pattern) == len(struct.DayOfWeek)
+            shuffled = shuffle_pattern(pattern, comb_days)
+            assert sorted(shuffled, key=str) == sorted(pattern, key=str)
+            assert all(c is None or day in comb_days[c]
+                       for day, c in zip(struct.DayOfWeek, shuffled))
+
+
+def test_warm_start_keeps_pinned_lessons(tmp_path):
+    settings_path = TESTFILE_PATH.joinpath('settings' + FILE_EXTENSION)
+    base_path = tmp_path.joinpath('base' + FILE_EXTENSION)
+    base_stats = SolverStats()
+    base = Generator(stats=base_stats)
+    base.process(settings_path, base_path)
+    stats = SolverStats()
+    pinned = Generator(stats=stats)
+    pinned.process(settings_path, tmp_path.joinpath('pinned' + FILE_EXTENSION),
+                   base_path=base_path)
+    # Все уроки закреплены: для групп, решенных в прежнем расписании,
+    # перебора нет (нерешенные группы подбираются заново)
+    for group, group_stats in stats.groups.items():
+        if group not in base_stats.unsolved:
+            assert group_stats.efforts == 0
+    assert set(base.lesson_rows()) <= set(pinned.lesson_rows())
+
+    group = next(iter(base.lesson_rows()))[1]
+    gen = Generator()
+    gen.process(settings_path, tmp_path.joinpath('group' + FILE_EXTENSION),
+                base_path=base_path,
+                pin=struct.PinPolicy(struct.PinMode.GROUPS, {group}))
+    assert ({r for r in gen.lesson_rows() if r[1] == group}
+            == {r for r in base.lesson_rows() if r[1] == group})
+
+
+def test_fast_schedule_rows_match_strict():
+    from src.parsers.schedule import schedule_rows
+    from src.parsers.raw_schedule import parse_schedule_rows_fast
+
+    content = TESTFILE_PATH.joinpath('schedule' + FILE_EXTENSION).read_text(
+        encoding='utf-8')
+    assert parse_schedule_rows_fast(content) == list(
+        schedule_rows(parse_schedule(content)))
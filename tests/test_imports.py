@@ -0,0 +1,14 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[1].joinpath('benchmarks')))
+
+from bench_import import ENTRY_POINTS, import_time
+
+
+@pytest.mark.parametrize('module', list(ENTRY_POINTS))
+def test_entry_point_loads_only_its_dependencies(module):
+    _, loaded = import_time(module)
+    assert loaded == []